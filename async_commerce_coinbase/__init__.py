@@ -1,20 +1,33 @@
-from . import exceptions, webhook
+from . import circuit, exceptions, ratelimit, retry, watermark, webhook
 from .__about__ import __version__
+from .circuit import CircuitBreaker
 from .client import Coinbase
 from .exceptions import (
+    CircuitOpenError,
     CoinbaseException,
     CoinbaseHTTPError,
     CoinbaseHTTPStatusError,
     SignatureVerificationError,
 )
+from .ratelimit import RateLimiter, TokenBucket
+from .retry import RetryPolicy
 
 __all__ = [
     "__version__",
+    "CircuitBreaker",
+    "CircuitOpenError",
     "Coinbase",
     "CoinbaseException",
     "CoinbaseHTTPError",
     "CoinbaseHTTPStatusError",
+    "RateLimiter",
+    "RetryPolicy",
     "SignatureVerificationError",
+    "TokenBucket",
+    "circuit",
     "exceptions",
+    "ratelimit",
+    "retry",
+    "watermark",
     "webhook",
 ]
@@ -0,0 +1,86 @@
+"""Command line interface, see ``python -m async_commerce_coinbase --help``."""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import sys
+import typing
+
+from .client import Coinbase
+from .export import FORMATS, Format, export
+from .paginator import CoinbasePaginator
+
+ListFunction = typing.Callable[[Coinbase, int], CoinbasePaginator[typing.Any]]
+RESOURCES: dict[str, ListFunction] = {
+    "charges": lambda coinbase, prefetch: coinbase.list_charges(prefetch=prefetch),
+    "checkouts": lambda coinbase, prefetch: coinbase.list_checkouts(prefetch=prefetch),
+    "invoices": lambda coinbase, prefetch: coinbase.list_invoices(prefetch=prefetch),
+    "events": lambda coinbase, prefetch: coinbase.list_events(prefetch=prefetch),
+}
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m async_commerce_coinbase")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    exporter = commands.add_parser(
+        "export", help="stream all resources of a kind into an ndjson or csv file"
+    )
+    exporter.add_argument("resource", choices=sorted(RESOURCES))
+    exporter.add_argument(
+        "output", help="file to write, compressed with gzip if it ends with .gz"
+    )
+    exporter.add_argument(
+        "--format",
+        choices=FORMATS,
+        help="defaults to csv for .csv and .csv.gz files, ndjson otherwise",
+    )
+    exporter.add_argument(
+        "--columns", help="comma separated csv columns, eg id,code,pricing.local.amount"
+    )
+    exporter.add_argument(
+        "--checkpoint", help="cursor file, resumes an interrupted export if it exists"
+    )
+    exporter.add_argument(
+        "--prefetch", type=int, default=1, help="pages to fetch ahead (default: 1)"
+    )
+    exporter.add_argument(
+        "--api-key",
+        default=os.environ.get("COINBASE_API_KEY"),
+        help="defaults to the COINBASE_API_KEY environment variable",
+    )
+    return parser
+
+
+async def run_export(args: argparse.Namespace) -> int:
+    format: Format = args.format
+    if format is None:
+        is_csv = args.output.removesuffix(".gz").endswith(".csv")
+        format = "csv" if is_csv else "ndjson"
+    columns = args.columns.split(",") if args.columns else None
+    async with Coinbase(args.api_key) as coinbase:
+        paginator = RESOURCES[args.resource](coinbase, args.prefetch)
+        return await export(
+            paginator,
+            args.output,
+            format=format,
+            columns=columns,
+            checkpoint=args.checkpoint,
+        )
+
+
+def main(argv: typing.Sequence[str] | None = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if not args.api_key:
+        parser.error("--api-key or COINBASE_API_KEY is required")
+
+    count = asyncio.run(run_export(args))
+    print(f"exported {count} {args.resource} to {args.output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
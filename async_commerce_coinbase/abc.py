@@ -1,3 +1,5 @@
+from __future__ import annotations
+
 import typing
 from abc import ABC
 
@@ -8,5 +10,15 @@ class AbstractRequestBase(ABC):
     async def request(self, request: httpx.Request) -> typing.Any:
         raise NotImplementedError  # pragma: no cover
 
+    async def call(
+        self,
+        method: str,
+        path: str,
+        *,
+        params: typing.Mapping[str, typing.Any] | None = None,
+        json: typing.Any = None,
+    ) -> typing.Any:
+        raise NotImplementedError  # pragma: no cover
+
     def assert_code(self, code: str) -> None:
         raise NotImplementedError  # pragma: no cover
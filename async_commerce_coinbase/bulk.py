@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import asyncio
+import typing
+
+__all__ = ["fetch_many", "fetch_as_completed"]
+
+K = typing.TypeVar("K")
+R = typing.TypeVar("R")
+Fetch = typing.Callable[[K], typing.Awaitable[R]]
+
+
+async def fetch_many(
+    fetch: Fetch[K, R], keys: typing.Iterable[K], *, concurrency: int = 10
+) -> list[R | Exception]:
+    """Call ``fetch`` for every key with at most ``concurrency`` calls at once.
+
+    Results are returned in the order of ``keys``. A failing call does not
+    abort the others, its exception is returned in place of the result.
+    """
+    _check_concurrency(concurrency)
+    pending = list(keys)
+    results: dict[int, R | Exception] = {}
+
+    async def collect(index: int, result: R | Exception) -> None:
+        results[index] = result
+
+    await _run(fetch, enumerate(pending), concurrency, collect)
+    return [results[index] for index in range(len(pending))]
+
+
+async def fetch_as_completed(
+    fetch: Fetch[K, R], keys: typing.Iterable[K], *, concurrency: int = 10
+) -> typing.AsyncGenerator[tuple[K, R | Exception], None]:
+    """Like `fetch_many`, but yield ``(key, result)`` as soon as a call is done."""
+    _check_concurrency(concurrency)
+    done: asyncio.Queue[tuple[K, R | Exception]] = asyncio.Queue(concurrency)
+    pending = list(keys)
+
+    async def collect(index: int, result: R | Exception) -> None:
+        await done.put((pending[index], result))
+
+    runner = asyncio.create_task(_run(fetch, enumerate(pending), concurrency, collect))
+    try:
+        for _ in pending:
+            yield await done.get()
+    finally:
+        runner.cancel()
+        try:
+            await runner
+        except asyncio.CancelledError:
+            pass
+
+
+async def _run(
+    fetch: Fetch[K, R],
+    keys: typing.Iterator[tuple[int, K]],
+    concurrency: int,
+    collect: typing.Callable[[int, R | Exception], typing.Awaitable[None]],
+) -> None:
+    async def worker() -> None:
+        # all workers share one iterator, so every key is fetched exactly once
+        for index, key in keys:
+            result: R | Exception
+            try:
+                result = await fetch(key)
+            except Exception as e:
+                result = e
+            await collect(index, result)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+
+def _check_concurrency(concurrency: int) -> None:
+    if concurrency < 1:
+        raise ValueError(f"concurrency must be >= 1, got {concurrency!r}")
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import time
+import typing
+from collections import OrderedDict
+
+__all__ = ["TTLCache"]
+
+V = typing.TypeVar("V")
+
+
+class TTLCache(typing.Generic[V]):
+    """LRU cache holding at most ``maxsize`` entries for ``ttl`` seconds each.
+
+    ``hits`` and ``misses`` count lookups, to help sizing the cache.
+    `generation` lets a value fetched while its key was invalidated be
+    dropped instead of stored, see `set`.
+    """
+
+    def __init__(self, *, maxsize: int = 1024, ttl: float = 60.0) -> None:
+        if maxsize < 1:
+            raise ValueError(f"maxsize must be >= 1, got {maxsize!r}")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, tuple[float, V]] = OrderedDict()
+        # last invalidation of the most recently invalidated keys, older
+        # ones count as invalidated when the oldest remembered one was
+        self._invalidated: OrderedDict[str, int] = OrderedDict()
+        self._invalidations = 0
+        self._forgotten = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> V | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def generation(self, key: str) -> int:
+        """Changes every time ``key`` is invalidated."""
+        return self._invalidated.get(key, self._forgotten)
+
+    def set(self, key: str, value: V, *, generation: int | None = None) -> None:
+        """Store ``value``, unless ``key`` was invalidated since `generation`
+        returned ``generation``: it was read before a write then."""
+        if generation is not None and generation != self.generation(key):
+            return
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key: str) -> None:
+        self._entries.pop(key, None)
+        self._invalidations += 1
+        self._invalidated[key] = self._invalidations
+        self._invalidated.move_to_end(key)
+        if len(self._invalidated) > self.maxsize:
+            _, self._forgotten = self._invalidated.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._invalidated.clear()
+        self._invalidations += 1
+        self._forgotten = self._invalidations
@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import time
+import typing
+
+from .exceptions import CircuitOpenError
+
+__all__ = [
+    "CircuitBreaker",
+    "Circuit",
+    "CircuitState",
+    "Permit",
+    "FAILURE_STATUS_CODES",
+]
+
+CircuitState = typing.Literal["closed", "open", "half_open"]
+# 429 means slow down, not that coinbase is degraded, see `RetryPolicy`
+FAILURE_STATUS_CODES = frozenset({500, 502, 503, 504})
+
+
+class Circuit:
+    """State of one endpoint group, created on its first failure."""
+
+    def __init__(self, threshold: int) -> None:
+        self.threshold = threshold
+        self.state: CircuitState = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probing = False
+        # bumped when the circuit opens and when a probe is let through, so
+        # outcomes of older requests cannot close or reopen it
+        self.generation = 0
+
+
+class Permit(typing.NamedTuple):
+    """A request let through by `CircuitBreaker.acquire`."""
+
+    group: str
+    generation: int
+    probe: bool = False
+
+
+class CircuitBreaker:
+    """Fails fast while an endpoint group (eg ``/charges``) keeps failing.
+
+    Transport errors, timeouts included, and responses with one of
+    ``status_codes`` are failures. After ``failure_threshold`` consecutive
+    failures of a group, or its value in ``thresholds``, the circuit opens and
+    requests to the group raise `CircuitOpenError` without being sent. After
+    ``recovery_time`` seconds it is half open: a single probe request is sent,
+    closing the circuit on success and opening it again on failure.
+
+    `acquire` returns a `Permit` to pass to `record` or `release`, only the
+    outcome of the probe holding it closes or reopens a half open circuit.
+    Both return the new state when it changed, so the client can report it to
+    its instrumentation. One breaker can be shared by several clients.
+    """
+
+    def __init__(
+        self,
+        *,
+        failure_threshold: int = 5,
+        recovery_time: float = 30.0,
+        thresholds: typing.Mapping[str, int] | None = None,
+        status_codes: typing.Collection[int] = FAILURE_STATUS_CODES,
+    ) -> None:
+        if failure_threshold < 1:
+            raise ValueError(
+                f"failure_threshold must be >= 1, got {failure_threshold!r}"
+            )
+        self.failure_threshold = failure_threshold
+        self.recovery_time = recovery_time
+        self.thresholds = dict(thresholds or {})
+        self.status_codes = frozenset(status_codes)
+        self.circuits: dict[str, Circuit] = {}
+
+    def state(self, group: str) -> CircuitState:
+        """Current state of ``group``, to shed load before queueing requests."""
+        circuit = self.circuits.get(group)
+        if circuit is None:
+            return "closed"
+        if circuit.state == "open" and self._remaining(circuit) <= 0:
+            return "half_open"
+        return circuit.state
+
+    def acquire(self, group: str) -> tuple[Permit, CircuitState | None]:
+        """Let a request to ``group`` through or raise `CircuitOpenError`."""
+        circuit = self.circuits.get(group)
+        if circuit is None:
+            return Permit(group, 0), None
+        if circuit.state == "closed":
+            return Permit(group, circuit.generation), None
+
+        changed = None
+        if circuit.state == "open":
+            if (remaining := self._remaining(circuit)) > 0:
+                raise CircuitOpenError(
+                    f"circuit of {group} is open, retry in {remaining:.1f}s",
+                    group=group,
+                    retry_after=remaining,
+                )
+            changed = circuit.state = "half_open"
+        if circuit.probing:
+            raise CircuitOpenError(
+                f"circuit of {group} is half open, waiting for its probe",
+                group=group,
+                retry_after=0.0,
+            )
+        circuit.probing = True
+        circuit.generation += 1
+        return Permit(group, circuit.generation, probe=True), changed
+
+    def record(self, permit: Permit, failed: bool) -> CircuitState | None:
+        """Count the outcome of a request let through by `acquire`."""
+        circuit = self.circuits.get(permit.group)
+        if circuit is not None and circuit.generation != permit.generation:
+            # sent before the circuit opened, or a probe was let through
+            return None
+        if not failed:
+            if circuit is None:
+                return None
+            circuit.failures = 0
+            if not permit.probe:
+                return None
+            circuit.probing = False
+            circuit.state = "closed"
+            return circuit.state
+
+        if circuit is None:
+            threshold = self.thresholds.get(permit.group, self.failure_threshold)
+            circuit = self.circuits[permit.group] = Circuit(threshold)
+        circuit.failures += 1
+        if not permit.probe and circuit.failures < circuit.threshold:
+            return None
+        circuit.probing = False
+        circuit.generation += 1
+        circuit.opened_at = time.monotonic()
+        circuit.state = "open"
+        return circuit.state
+
+    def release(self, permit: Permit) -> None:
+        """Forget a request cancelled before its outcome was known."""
+        circuit = self.circuits.get(permit.group)
+        if (
+            permit.probe
+            and circuit is not None
+            and circuit.generation == permit.generation
+        ):
+            circuit.probing = False
+
+    def _remaining(self, circuit: Circuit) -> float:
+        return circuit.opened_at + self.recovery_time - time.monotonic()
@@ -1,17 +1,30 @@
+from __future__ import annotations
+
+import asyncio
+import functools
 import logging
+import time
 import typing
 
 import httpx
 
+from .cache import TTLCache
+from .circuit import CircuitBreaker, CircuitState
+from .endpoints import endpoint_group, endpoint_template
 from .exceptions import CoinbaseHTTPError, CoinbaseHTTPStatusError
+from .instrumentation import Instrumentation
+from .jsonlib import dumps, loads
+from .ratelimit import RateLimiter
 from .resources.charge import CoinbaseChargeResource
 from .resources.checkout import CoinbaseCheckoutResource
 from .resources.event import CoinbaseEventResource
 from .resources.invoice import CoinbaseInvoiceResource
+from .retry import RetryPolicy
 
 logger = logging.getLogger(__name__)
 COINBASE_VERSION = "2018-03-22"
 COINBASE_BASE_URL = "https://api.commerce.coinbase.com"
+JSON_HEADERS = {"Content-Type": "application/json"}
 
 
 class Coinbase(
@@ -20,27 +33,218 @@ class Coinbase(
     CoinbaseInvoiceResource,
     CoinbaseEventResource,
 ):
+    if typing.TYPE_CHECKING:  # pragma: no cover
+        Self = typing.TypeVar("Self", bound="Coinbase")
+
     client: httpx.AsyncClient
 
     def __init__(
-        self, api_key: str, *, client: httpx.AsyncClient | None = None
+        self,
+        api_key: str,
+        *,
+        client: httpx.AsyncClient | None = None,
+        transport: httpx.AsyncBaseTransport | None = None,
+        max_connections: int | None = 100,
+        max_keepalive_connections: int | None = 20,
+        keepalive_expiry: float | None = 30.0,
+        connect_timeout: float | None = 5.0,
+        read_timeout: float | None = 30.0,
+        write_timeout: float | None = 30.0,
+        pool_timeout: float | None = 10.0,
+        http2: bool = False,
+        retry: RetryPolicy | None = None,
+        rate_limiter: RateLimiter | None = None,
+        cache: typing.Mapping[str, TTLCache[bytes]] | None = None,
+        coalesce: bool = False,
+        instrumentation: Instrumentation | None = None,
+        circuit_breaker: CircuitBreaker | None = None,
     ) -> None:
+        """Create a client for the coinbase commerce api.
+
+        The connection pool, timeout, ``http2`` and ``transport`` options only
+        apply to the ``httpx.AsyncClient`` created when ``client`` is not
+        given. ``http2`` requires the ``h2`` package (``pip install
+        httpx[http2]``). ``transport`` can be a `simulator.CoinbaseSimulator`.
+
+        ``retry`` enables retries of idempotent requests, see `RetryPolicy`.
+        ``rate_limiter`` throttles every request (including retries), the same
+        `RateLimiter` can be shared by several clients.
+
+        ``cache`` maps resource collections (eg ``"/checkouts"``) to a
+        `TTLCache` used for single resource lookups like `get_checkout`. An
+        entry is dropped when the resource is changed through this client.
+
+        With ``coalesce`` concurrent identical ``GET`` requests share a single
+        network call, every caller still gets its own copy of the body.
+
+        ``instrumentation`` is called around building, sending and decoding
+        every request, see `instrumentation.MetricsCollector`.
+
+        ``circuit_breaker`` raises `CircuitOpenError` right away for endpoint
+        groups that keep failing instead of waiting for their timeouts, see
+        `circuit.CircuitBreaker`. Its state changes are reported to
+        ``instrumentation``.
+        """
+        self._owns_client = client is None
         if client is None:
-            client = httpx.AsyncClient(base_url=COINBASE_BASE_URL)
+            client = httpx.AsyncClient(
+                base_url=COINBASE_BASE_URL,
+                limits=httpx.Limits(
+                    max_connections=max_connections,
+                    max_keepalive_connections=max_keepalive_connections,
+                    keepalive_expiry=keepalive_expiry,
+                ),
+                timeout=httpx.Timeout(
+                    connect=connect_timeout,
+                    read=read_timeout,
+                    write=write_timeout,
+                    pool=pool_timeout,
+                ),
+                http2=http2,
+                transport=transport,
+            )
 
         client.headers["X-CC-Version"] = COINBASE_VERSION
         client.headers["X-CC-Api-Key"] = api_key
         self.client = client
+        self.retry = retry
+        self.rate_limiter = rate_limiter
+        self.cache = dict(cache or {})
+        self.coalesce = coalesce
+        self.instrumentation = instrumentation
+        self.circuit_breaker = circuit_breaker
+        self._inflight: dict[str, asyncio.Task[tuple[typing.Any, bytes]]] = {}
+
+    async def __aenter__(self: Self) -> Self:
+        return self
+
+    async def __aexit__(self, *exc_info: typing.Any) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Close the underlying client, unless it was passed in by the caller."""
+        if self._owns_client:
+            await self.client.aclose()
+
+    async def call(
+        self,
+        method: str,
+        path: str,
+        *,
+        params: typing.Mapping[str, typing.Any] | None = None,
+        json: typing.Any = None,
+    ) -> typing.Any:
+        """Send a request to the api and return its decoded body.
+
+        The request is built once, merged with the client's base url and
+        headers, and ``json`` is encoded with the fastest json backend.
+        """
+        content = headers = None
+        if json is not None:
+            content = dumps(json)
+            headers = JSON_HEADERS
+        return await self._request(
+            method,
+            path,
+            functools.partial(
+                self.client.build_request,
+                method,
+                path,
+                params=params,
+                content=content,
+                headers=headers,
+            ),
+        )
 
     async def request(self, request: httpx.Request) -> typing.Any:
-        request = self.client.build_request(
+        """Send a request built by the caller, `call` avoids building it twice."""
+        return await self._request(
             request.method,
-            request.url,
-            content=request.content,
-            headers=request.headers,
-            extensions=request.extensions,
+            request.url.path,
+            functools.partial(
+                self.client.build_request,
+                request.method,
+                request.url,
+                content=request.content,
+                headers=request.headers,
+                extensions=request.extensions,
+            ),
         )
-        response = await self.client.send(request)
+
+    async def _request(
+        self, method: str, path: str, build: typing.Callable[[], httpx.Request]
+    ) -> typing.Any:
+        try:
+            return await self._cached_request(method, path, build)
+        except Exception as e:
+            if self.instrumentation is not None:
+                self.instrumentation.on_error(method, endpoint_template(path), e)
+            raise
+
+    async def _cached_request(
+        self, method: str, path: str, build: typing.Callable[[], httpx.Request]
+    ) -> typing.Any:
+        cache = self.cache.get(endpoint_group(path))
+        generation = None
+        if cache is not None:
+            if method != "GET":
+                cache.invalidate(self._cache_key(path))
+            elif endpoint_template(path).count("/") != 2:
+                # only single resource lookups are cached, not listings
+                cache = None
+            elif (cached := cache.get(path)) is not None:
+                return loads(cached)
+            else:
+                # a write while the request is in flight makes its body stale
+                generation = cache.generation(path)
+
+        start = time.perf_counter()
+        request = build()
+        if self.instrumentation is not None:
+            self.instrumentation.on_build(
+                method, endpoint_template(path), time.perf_counter() - start
+            )
+        if self.coalesce and method == "GET":
+            body, content = await self._fetch_coalesced(request)
+        else:
+            body, content = await self._fetch(request)
+
+        if cache is not None:
+            if method == "GET":
+                cache.set(path, content, generation=generation)
+            elif isinstance(data := body.get("data"), dict):
+                group = endpoint_group(path)
+                for key in ("id", "code"):
+                    if isinstance(code := data.get(key), str):
+                        cache.invalidate(f"{group}/{code}")
+
+        return body
+
+    async def _fetch_coalesced(
+        self, request: httpx.Request
+    ) -> tuple[typing.Any, bytes]:
+        key = str(request.url)
+        if (task := self._inflight.get(key)) is not None:
+            _, content = await asyncio.shield(task)
+            # followers decode their own copy, so no caller shares objects
+            return loads(content), content
+
+        def forget(task: asyncio.Task[tuple[typing.Any, bytes]]) -> None:
+            self._inflight.pop(key, None)
+            if not task.cancelled():
+                task.exception()  # do not warn if every caller was cancelled
+
+        task = asyncio.create_task(self._fetch(request))
+        self._inflight[key] = task
+        task.add_done_callback(forget)
+        # shielded so a cancelled first caller does not cancel everyone else
+        return await asyncio.shield(task)
+
+    async def _fetch(self, request: httpx.Request) -> tuple[typing.Any, bytes]:
+        if self.retry is None:
+            response = await self._send(request)
+        else:
+            response = await self.retry.send(self._send, request)
 
         content_type = response.headers["content-type"]
         if not content_type.startswith("application/json"):
@@ -48,7 +252,15 @@ class Coinbase(
                 f"content-type is {content_type!r}, expected application/json"
             )
 
-        body = response.json()
+        start = time.perf_counter()
+        body = loads(response.content)
+        if self.instrumentation is not None:
+            self.instrumentation.on_decode(
+                request.method,
+                endpoint_template(request.url.path),
+                len(response.content),
+                time.perf_counter() - start,
+            )
 
         if warnings := body.get("warnings"):
             for warning in warnings:
@@ -68,7 +280,54 @@ class Coinbase(
                 reason, request=e.request, response=e.response
             )
 
-        return body
+        return body, response.content
+
+    @staticmethod
+    def _cache_key(path: str) -> str:
+        # "/charges/CODE/cancel" changes the resource cached at "/charges/CODE"
+        return "/".join(path.split("/")[:3])
+
+    async def _send(self, request: httpx.Request) -> httpx.Response:
+        breaker = self.circuit_breaker
+        if breaker is None:
+            return await self._send_now(request)
+
+        group = endpoint_group(request.url.path)
+        permit, changed = breaker.acquire(group)
+        self._circuit_changed(group, changed)
+        try:
+            response = await self._send_now(request)
+        except httpx.TransportError:
+            self._circuit_changed(group, breaker.record(permit, failed=True))
+            raise
+        except BaseException:
+            breaker.release(permit)
+            raise
+        failed = response.status_code in breaker.status_codes
+        self._circuit_changed(group, breaker.record(permit, failed=failed))
+        return response
+
+    def _circuit_changed(self, group: str, state: CircuitState | None) -> None:
+        if state is not None:
+            logger.warning(f"circuit of {group} is now {state}")
+            if self.instrumentation is not None:
+                self.instrumentation.on_circuit_change(group, state)
+
+    async def _send_now(self, request: httpx.Request) -> httpx.Response:
+        if self.rate_limiter is not None:
+            await self.rate_limiter.acquire(request)
+        if self.instrumentation is None:
+            return await self.client.send(request)
+
+        start = time.perf_counter()
+        response = await self.client.send(request)
+        self.instrumentation.on_send(
+            request.method,
+            endpoint_template(request.url.path),
+            response,
+            time.perf_counter() - start,
+        )
+        return response
 
     def assert_code(self, code_or_id: str) -> None:
         if "/" in code_or_id or ".." in code_or_id:
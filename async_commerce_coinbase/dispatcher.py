@@ -0,0 +1,227 @@
+"""Verify webhooks right away and process them in the background.
+
+```py
+dispatcher = WebhookDispatcher(secret, workers=10)
+
+@dispatcher.on("charge:confirmed", "charge:resolved")
+async def fulfill(event: Event) -> None:
+    ...
+
+async with dispatcher:
+    # in the http handler, returns as soon as the event is queued
+    await dispatcher.submit(body, signature)
+```
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import typing
+
+from .idempotency import IdempotencyStore
+from .webhook import Event, EventType, LazyEvent, WebhookVerifier
+
+__all__ = ["WebhookDispatcher", "Handler"]
+
+logger = logging.getLogger(__name__)
+
+Handler = typing.Callable[[Event], typing.Awaitable[None]]
+ErrorHandler = typing.Callable[[Event, Exception], typing.Awaitable[None]]
+H = typing.TypeVar("H", bound=Handler)
+
+
+class WebhookDispatcher:
+    """Route verified events to async handlers run by a pool of workers.
+
+    At most ``queue_size`` events wait for a worker: `submit` blocks once the
+    queue is full and `submit_nowait` raises `asyncio.QueueFull`, so a flood
+    of webhooks can be answered with a 503 and redelivered later. The handlers
+    of an event run one after the other, all of them within ``timeout``
+    seconds: when it runs out, the running handler is cancelled and the next
+    ones are skipped. Handler failures, including the timeout, are passed to
+    ``on_error``, or logged when it is not set.
+
+    ``secret`` can also be a `WebhookVerifier`, to accept several secrets
+    while rotating them.
+
+    With an ``idempotency`` store, events whose id was already claimed are
+    skipped, and the id is released again when a handler fails.
+
+    `submit` only reads the id and type of an event, its ``data`` is decoded
+    by the worker that runs its handlers.
+    """
+
+    if typing.TYPE_CHECKING:  # pragma: no cover
+        Self = typing.TypeVar("Self", bound="WebhookDispatcher")
+
+    def __init__(
+        self,
+        secret: str | bytes | WebhookVerifier,
+        *,
+        workers: int = 10,
+        queue_size: int = 100,
+        timeout: float | None = 30.0,
+        on_error: ErrorHandler | None = None,
+        idempotency: IdempotencyStore | None = None,
+    ) -> None:
+        if workers < 1:
+            raise ValueError(f"workers must be >= 1, got {workers!r}")
+        if not isinstance(secret, WebhookVerifier):
+            secret = WebhookVerifier(secret)
+        self.verifier = secret
+        self.workers = workers
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self.on_error = on_error
+        self.idempotency = idempotency
+        self.handlers: dict[EventType | None, list[Handler]] = {}
+        self._queue: asyncio.Queue[Event | LazyEvent] | None = None
+        self._workers: list[asyncio.Task[None]] = []
+
+    def on(self, *event_types: EventType) -> typing.Callable[[H], H]:
+        """Decorator registering a handler, for every event type by default."""
+
+        def register(handler: H) -> H:
+            self.add_handler(handler, *event_types)
+            return handler
+
+        return register
+
+    def add_handler(self, handler: Handler, *event_types: EventType) -> None:
+        for event_type in event_types or (None,):
+            self.handlers.setdefault(event_type, []).append(handler)
+
+    def get_handlers(self, event_type: str) -> list[Handler]:
+        return [
+            *self.handlers.get(typing.cast(EventType, event_type), ()),
+            *self.handlers.get(None, ()),
+        ]
+
+    @property
+    def running(self) -> bool:
+        return bool(self._workers)
+
+    async def __aenter__(self: Self) -> Self:
+        self.start()
+        return self
+
+    async def __aexit__(self, *exc_info: typing.Any) -> None:
+        await self.stop()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._queue = asyncio.Queue(self.queue_size)
+        self._workers = [
+            asyncio.create_task(self._work(self._queue)) for _ in range(self.workers)
+        ]
+
+    async def stop(self, *, drain: bool = True) -> None:
+        """Stop the workers, after the queued events are processed if ``drain``."""
+        if self._queue is None:
+            return
+        if drain:
+            await self._queue.join()
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._queue = None
+
+    async def join(self) -> None:
+        """Wait until every submitted event has been processed."""
+        if self._queue is not None:
+            await self._queue.join()
+
+    async def submit(
+        self, body: str | bytes | memoryview, signature: str | bytes
+    ) -> LazyEvent | None:
+        """Verify ``body`` and queue its event, waiting if the queue is full.
+
+        Raises `SignatureVerificationError` before anything is queued. Events
+        without any handler are dropped, and None is returned, without their
+        ``data`` ever being decoded.
+        """
+        queue = self._get_queue()
+        event = self._verify(body, signature)
+        if event is not None:
+            await queue.put(event)
+        return event
+
+    def submit_nowait(
+        self, body: str | bytes | memoryview, signature: str | bytes
+    ) -> LazyEvent | None:
+        """Like `submit`, but raise `asyncio.QueueFull` instead of waiting."""
+        queue = self._get_queue()
+        event = self._verify(body, signature)
+        if event is not None:
+            queue.put_nowait(event)
+        return event
+
+    def _verify(
+        self, body: str | bytes | memoryview, signature: str | bytes
+    ) -> LazyEvent | None:
+        if isinstance(body, memoryview):
+            # decoded later, when the caller may have reused its buffer
+            body = body.tobytes()
+        event = self.verifier.verify_lazy(body, signature)
+        if not self.get_handlers(event.type):
+            return None
+        return event
+
+    async def submit_event(self, event: Event) -> None:
+        """Queue an already verified event."""
+        await self._get_queue().put(event)
+
+    def _get_queue(self) -> asyncio.Queue[Event | LazyEvent]:
+        if self._queue is None:
+            raise RuntimeError("the dispatcher is not started")
+        return self._queue
+
+    async def dispatch(self, event: Event | LazyEvent) -> None:
+        """Run the handlers of ``event`` in the current task."""
+        id = event.id if isinstance(event, LazyEvent) else event["id"]
+        idempotency = self.idempotency
+        if idempotency is not None and not await idempotency.claim(id):
+            return
+        if isinstance(event, LazyEvent):
+            try:
+                event = event.event
+            except Exception:
+                logger.exception(f"webhook event {id} could not be decoded")
+                if idempotency is not None:
+                    await idempotency.release(id)
+                return
+        errors: list[Exception] = []
+        try:
+            await asyncio.wait_for(self._run_handlers(event, errors), self.timeout)
+        except asyncio.TimeoutError as e:
+            errors.append(e)
+        for error in errors:
+            if self.on_error is None:
+                logger.error(
+                    f"webhook handler failed for event {event['id']}", exc_info=error
+                )
+            else:
+                await self.on_error(event, error)
+        if errors and idempotency is not None:
+            await idempotency.release(event["id"])
+
+    async def _run_handlers(self, event: Event, errors: list[Exception]) -> None:
+        for handler in self.get_handlers(event["type"]):
+            try:
+                await handler(event)
+            except Exception as e:
+                errors.append(e)
+
+    async def _work(self, queue: asyncio.Queue[Event | LazyEvent]) -> None:
+        while True:
+            event = await queue.get()
+            try:
+                await self.dispatch(event)
+            except Exception:  # pragma: no cover - on_error itself failed
+                id = event.id if isinstance(event, LazyEvent) else event["id"]
+                logger.exception(f"webhook error handler failed for {id}")
+            finally:
+                queue.task_done()
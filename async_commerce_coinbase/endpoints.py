@@ -0,0 +1,20 @@
+from __future__ import annotations
+
+__all__ = ["endpoint_template", "endpoint_group"]
+
+
+def endpoint_template(path: str) -> str:
+    """Replace the code or id in an api path with a placeholder.
+
+    ``/charges/ABCDEF/cancel`` becomes ``/charges/{code}/cancel`` so paths can
+    be used as low-cardinality keys.
+    """
+    parts = path.strip("/").split("/")
+    if len(parts) > 1:
+        parts[1] = "{code}"
+    return "/" + "/".join(parts)
+
+
+def endpoint_group(path: str) -> str:
+    """Return the resource collection a path belongs to, eg ``/charges``."""
+    return "/" + path.strip("/").split("/", 1)[0]
@@ -13,5 +13,14 @@ class CoinbaseHTTPStatusError(CoinbaseHTTPError, httpx.HTTPStatusError):
     pass
 
 
+class CircuitOpenError(CoinbaseHTTPError):
+    """Raised without sending the request while a circuit is open."""
+
+    def __init__(self, message: str, *, group: str, retry_after: float) -> None:
+        super().__init__(message)
+        self.group = group
+        self.retry_after = retry_after
+
+
 class SignatureVerificationError(CoinbaseException):
     pass
@@ -0,0 +1,197 @@
+"""Process every event once, however many times it is delivered.
+
+Coinbase redelivers webhooks until they are acknowledged and backfills with
+`list_events` return events that were already received, so an event id is
+claimed before the event is processed, and released if processing fails:
+
+```py
+store = MemoryIdempotencyStore(backend=SQLiteIdempotencyStore("events.db"))
+dispatcher = WebhookDispatcher(secret, idempotency=store)
+
+async with aclosing(deduplicate(coinbase.list_events(), store)) as events:
+    async for event in events:
+        ...  # skips the events the dispatcher already handled
+```
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import os
+import sqlite3
+import threading
+import time
+import typing
+from abc import ABC, abstractmethod
+from pathlib import Path
+
+from .cache import TTLCache
+
+if typing.TYPE_CHECKING:  # pragma: no cover
+    from .webhook import Event
+
+__all__ = [
+    "IdempotencyStore",
+    "MemoryIdempotencyStore",
+    "SQLiteIdempotencyStore",
+    "FileIdempotencyStore",
+    "claimed",
+    "deduplicate",
+]
+
+# coinbase keeps redelivering a webhook for up to 3 days
+DEFAULT_TTL = 3 * 24 * 60 * 60.0
+
+
+class IdempotencyStore(ABC):
+    """Remembers the ids of the events that have been processed."""
+
+    @abstractmethod
+    async def claim(self, key: str) -> bool:
+        """Mark ``key`` as seen, return False if it already was."""
+        raise NotImplementedError  # pragma: no cover
+
+    @abstractmethod
+    async def release(self, key: str) -> None:
+        """Forget ``key``, after its processing failed for example."""
+        raise NotImplementedError  # pragma: no cover
+
+
+class MemoryIdempotencyStore(IdempotencyStore):
+    """Seen-set holding the ``maxsize`` most recent ids for ``ttl`` seconds.
+
+    Keys are claimed in memory before ``backend`` is awaited, so concurrent
+    deliveries of the same event in this process never both claim it. Only
+    the keys that are not in memory reach ``backend``.
+    """
+
+    def __init__(
+        self,
+        *,
+        maxsize: int = 100_000,
+        ttl: float = DEFAULT_TTL,
+        backend: IdempotencyStore | None = None,
+    ) -> None:
+        self.seen = TTLCache[bool](maxsize=maxsize, ttl=ttl)
+        self.backend = backend
+
+    async def claim(self, key: str) -> bool:
+        if self.seen.get(key) is not None:
+            return False
+        self.seen.set(key, True)
+        if self.backend is None:
+            return True
+        try:
+            return await self.backend.claim(key)
+        except BaseException:
+            self.seen.invalidate(key)
+            raise
+
+    async def release(self, key: str) -> None:
+        self.seen.invalidate(key)
+        if self.backend is not None:
+            await self.backend.release(key)
+
+
+class SQLiteIdempotencyStore(IdempotencyStore):
+    """Persistent seen-set, ids claimed more than ``ttl`` seconds ago expire."""
+
+    def __init__(
+        self, path: str | os.PathLike[str] = ":memory:", *, ttl: float | None = None
+    ) -> None:
+        self.ttl = ttl
+        # claims are written from worker threads, one at a time
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS claims "
+            "(key TEXT PRIMARY KEY, claimed_at REAL NOT NULL)"
+        )
+        self._lock = threading.Lock()
+
+    def close(self) -> None:
+        self.connection.close()
+
+    async def claim(self, key: str) -> bool:
+        return await asyncio.to_thread(self._claim, key)
+
+    async def release(self, key: str) -> None:
+        await asyncio.to_thread(self._release, key)
+
+    def _claim(self, key: str) -> bool:
+        now = time.time()
+        expired = -1.0 if self.ttl is None else now - self.ttl
+        with self._lock, self.connection:
+            cursor = self.connection.execute(
+                "INSERT INTO claims VALUES (?, ?) ON CONFLICT (key) "
+                "DO UPDATE SET claimed_at = excluded.claimed_at "
+                "WHERE claimed_at < ?",
+                (key, now, expired),
+            )
+        return cursor.rowcount == 1
+
+    def _release(self, key: str) -> None:
+        with self._lock, self.connection:
+            self.connection.execute("DELETE FROM claims WHERE key = ?", (key,))
+
+
+class FileIdempotencyStore(IdempotencyStore):
+    """Appends every claimed id as a line of a text file."""
+
+    def __init__(self, path: str | os.PathLike[str]) -> None:
+        self.path = Path(path)
+        try:
+            self._keys = set(self.path.read_text().splitlines())
+        except FileNotFoundError:
+            self._keys = set()
+
+    async def claim(self, key: str) -> bool:
+        if key in self._keys:
+            return False
+        self._keys.add(key)
+        with open(self.path, "a") as file:
+            file.write(f"{key}\n")
+        return True
+
+    async def release(self, key: str) -> None:
+        if key not in self._keys:
+            return
+        self._keys.remove(key)
+        temporary = self.path.with_name(f"{self.path.name}.tmp")
+        temporary.write_text("".join(f"{key}\n" for key in self._keys))
+        os.replace(temporary, self.path)
+
+
+@contextlib.asynccontextmanager
+async def claimed(store: IdempotencyStore, key: str) -> typing.AsyncIterator[bool]:
+    """Claim ``key`` for the block, released again if the block raises.
+
+    ```py
+    async with claimed(store, event["id"]) as first:
+        if first:
+            await process(event)
+    ```
+    """
+    first = await store.claim(key)
+    try:
+        yield first
+    except BaseException:
+        if first:
+            await store.release(key)
+        raise
+
+
+async def deduplicate(
+    events: typing.AsyncIterable[Event], store: IdempotencyStore
+) -> typing.AsyncGenerator[Event, None]:
+    """Yield only the events whose id has not been claimed yet.
+
+    An id stays claimed once the next event is asked for. Leaving the loop
+    while processing an event, because it raised or by ``break``, releases
+    its id when the generator is closed, right away with
+    ``contextlib.aclosing``, so a later backfill processes it again.
+    """
+    async for event in events:
+        async with claimed(store, event["id"]) as first:
+            if first:
+                yield event
@@ -0,0 +1,292 @@
+"""Hooks called around every request, labelled by endpoint template.
+
+Endpoints are templates like ``/charges/{code}``, never raw urls, so they can
+be used as metric labels. `MetricsCollector` keeps histograms and counters in
+process, `OpenTelemetryInstrumentation` records the same measurements on an
+OpenTelemetry meter, without depending on the opentelemetry package itself.
+"""
+
+from __future__ import annotations
+
+import bisect
+import collections
+import math
+import typing
+
+import httpx
+
+from .circuit import CircuitState
+
+__all__ = [
+    "Instrumentation",
+    "Histogram",
+    "MetricsCollector",
+    "OpenTelemetryInstrumentation",
+]
+
+Stage = typing.Literal["build", "send", "decode"]
+DURATION_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+
+class Instrumentation:
+    """Base class of request hooks, which all do nothing by default.
+
+    Durations are in seconds. `on_send` is called for every attempt, retries
+    included, `on_error` once for a request that finally failed.
+    `on_circuit_change` is called when the circuit of an endpoint group, eg
+    ``/charges``, changes state, see `circuit.CircuitBreaker`.
+    """
+
+    def on_build(self, method: str, endpoint: str, duration: float) -> None:
+        pass
+
+    def on_send(
+        self, method: str, endpoint: str, response: httpx.Response, duration: float
+    ) -> None:
+        pass
+
+    def on_decode(self, method: str, endpoint: str, size: int, duration: float) -> None:
+        pass
+
+    def on_error(self, method: str, endpoint: str, error: Exception) -> None:
+        pass
+
+    def on_circuit_change(self, group: str, state: CircuitState) -> None:
+        pass
+
+
+class Histogram:
+    """Counts of observed values per bucket, like a prometheus histogram."""
+
+    def __init__(self, buckets: typing.Sequence[float] = DURATION_BUCKETS) -> None:
+        self.buckets = tuple(sorted(buckets))
+        # the last count is for values above the largest bucket
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the ``q`` quantile, eg 0.99."""
+        if not self.count:
+            return math.nan
+        rank = q * self.count
+        seen = 0
+        for bucket, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bucket
+        return math.inf
+
+
+class MetricsCollector(Instrumentation):
+    """Keeps latency and size histograms and status and error counters.
+
+    ``durations`` is keyed by ``(stage, method, endpoint)`` with stage one of
+    ``build``, ``send`` and ``decode``, ``sizes`` by ``(method, endpoint)``,
+    ``responses`` by ``(method, endpoint, status_code)`` and ``errors`` by
+    ``(method, endpoint, exception class name)``. ``circuits`` holds the
+    last state of each endpoint group and ``circuit_changes`` counts state
+    changes by ``(group, state)``.
+    """
+
+    def __init__(
+        self,
+        *,
+        duration_buckets: typing.Sequence[float] = DURATION_BUCKETS,
+        size_buckets: typing.Sequence[float] = SIZE_BUCKETS,
+    ) -> None:
+        self.duration_buckets = duration_buckets
+        self.size_buckets = size_buckets
+        self.durations: dict[tuple[Stage, str, str], Histogram] = {}
+        self.sizes: dict[tuple[str, str], Histogram] = {}
+        self.responses: collections.Counter[tuple[str, str, int]] = (
+            collections.Counter()
+        )
+        self.errors: collections.Counter[tuple[str, str, str]] = collections.Counter()
+        self.circuits: dict[str, CircuitState] = {}
+        self.circuit_changes: collections.Counter[tuple[str, CircuitState]] = (
+            collections.Counter()
+        )
+
+    def _observe_duration(
+        self, stage: Stage, method: str, endpoint: str, duration: float
+    ) -> None:
+        key = (stage, method, endpoint)
+        if (histogram := self.durations.get(key)) is None:
+            histogram = self.durations[key] = Histogram(self.duration_buckets)
+        histogram.observe(duration)
+
+    def on_build(self, method: str, endpoint: str, duration: float) -> None:
+        self._observe_duration("build", method, endpoint, duration)
+
+    def on_send(
+        self, method: str, endpoint: str, response: httpx.Response, duration: float
+    ) -> None:
+        self._observe_duration("send", method, endpoint, duration)
+        self.responses[method, endpoint, response.status_code] += 1
+
+    def on_decode(self, method: str, endpoint: str, size: int, duration: float) -> None:
+        self._observe_duration("decode", method, endpoint, duration)
+        if (histogram := self.sizes.get((method, endpoint))) is None:
+            histogram = self.sizes[method, endpoint] = Histogram(self.size_buckets)
+        histogram.observe(size)
+
+    def on_error(self, method: str, endpoint: str, error: Exception) -> None:
+        self.errors[method, endpoint, type(error).__name__] += 1
+
+    def on_circuit_change(self, group: str, state: CircuitState) -> None:
+        self.circuits[group] = state
+        self.circuit_changes[group, state] += 1
+
+    def to_prometheus(self, prefix: str = "coinbase") -> str:
+        """Render all metrics in the prometheus text exposition format."""
+        lines = [
+            *_histogram_lines(
+                f"{prefix}_request_duration_seconds",
+                (
+                    ({"stage": stage, "method": method, "endpoint": endpoint}, value)
+                    for (stage, method, endpoint), value in self.durations.items()
+                ),
+            ),
+            *_histogram_lines(
+                f"{prefix}_response_size_bytes",
+                (
+                    ({"method": method, "endpoint": endpoint}, value)
+                    for (method, endpoint), value in self.sizes.items()
+                ),
+            ),
+            *_counter_lines(
+                f"{prefix}_responses_total",
+                (
+                    ({"method": method, "endpoint": endpoint, "status": status}, count)
+                    for (method, endpoint, status), count in self.responses.items()
+                ),
+            ),
+            *_counter_lines(
+                f"{prefix}_errors_total",
+                (
+                    ({"method": method, "endpoint": endpoint, "error": error}, count)
+                    for (method, endpoint, error), count in self.errors.items()
+                ),
+            ),
+            *_counter_lines(
+                f"{prefix}_circuit_state",
+                (
+                    ({"group": group, "state": state}, int(state == current))
+                    for group, current in self.circuits.items()
+                    for state in typing.get_args(CircuitState)
+                ),
+                metric_type="gauge",
+            ),
+            *_counter_lines(
+                f"{prefix}_circuit_changes_total",
+                (
+                    ({"group": group, "state": state}, count)
+                    for (group, state), count in self.circuit_changes.items()
+                ),
+            ),
+        ]
+        return "\n".join(lines) + "\n"
+
+
+Labels = dict[str, typing.Any]
+
+
+def _escape(value: typing.Any) -> str:
+    # the only escapes of label values in the text exposition format
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Labels) -> str:
+    return ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items())
+
+
+def _histogram_lines(
+    name: str, histograms: typing.Iterable[tuple[Labels, Histogram]]
+) -> typing.Iterator[str]:
+    yield f"# TYPE {name} histogram"
+    for labels, histogram in histograms:
+        formatted = _format_labels(labels)
+        cumulative = 0
+        for bucket, count in zip(histogram.buckets, histogram.counts):
+            cumulative += count
+            yield f'{name}_bucket{{{formatted},le="{bucket}"}} {cumulative}'
+        yield f'{name}_bucket{{{formatted},le="+Inf"}} {histogram.count}'
+        yield f"{name}_sum{{{formatted}}} {histogram.sum}"
+        yield f"{name}_count{{{formatted}}} {histogram.count}"
+
+
+def _counter_lines(
+    name: str,
+    counters: typing.Iterable[tuple[Labels, int]],
+    *,
+    metric_type: str = "counter",
+) -> typing.Iterator[str]:
+    yield f"# TYPE {name} {metric_type}"
+    for labels, count in counters:
+        yield f"{name}{{{_format_labels(labels)}}} {count}"
+
+
+class OpenTelemetryInstrumentation(Instrumentation):
+    """Records measurements on an OpenTelemetry ``meter``.
+
+    ```py
+    from opentelemetry import metrics
+
+    meter = metrics.get_meter("async_commerce_coinbase")
+    coinbase = Coinbase(api_key, instrumentation=OpenTelemetryInstrumentation(meter))
+    ```
+    """
+
+    def __init__(self, meter: typing.Any) -> None:
+        self.duration = meter.create_histogram(
+            "coinbase.request.duration",
+            unit="s",
+            description="Time spent building, sending and decoding requests",
+        )
+        self.size = meter.create_histogram(
+            "coinbase.response.size", unit="By", description="Response body size"
+        )
+        self.errors = meter.create_counter(
+            "coinbase.request.errors", description="Failed requests"
+        )
+        self.circuit_changes = meter.create_counter(
+            "coinbase.circuit.changes", description="Circuit breaker state changes"
+        )
+
+    def on_build(self, method: str, endpoint: str, duration: float) -> None:
+        self.duration.record(
+            duration, {"method": method, "endpoint": endpoint, "stage": "build"}
+        )
+
+    def on_send(
+        self, method: str, endpoint: str, response: httpx.Response, duration: float
+    ) -> None:
+        self.duration.record(
+            duration,
+            {
+                "method": method,
+                "endpoint": endpoint,
+                "stage": "send",
+                "status": response.status_code,
+            },
+        )
+
+    def on_decode(self, method: str, endpoint: str, size: int, duration: float) -> None:
+        attributes = {"method": method, "endpoint": endpoint}
+        self.size.record(size, attributes)
+        self.duration.record(duration, {**attributes, "stage": "decode"})
+
+    def on_error(self, method: str, endpoint: str, error: Exception) -> None:
+        self.errors.add(
+            1, {"method": method, "endpoint": endpoint, "error": type(error).__name__}
+        )
+
+    def on_circuit_change(self, group: str, state: CircuitState) -> None:
+        self.circuit_changes.add(1, {"group": group, "state": state})
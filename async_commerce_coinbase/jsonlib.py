@@ -0,0 +1,50 @@
+"""The fastest available json library, picked once at import time.
+
+orjson is preferred, then msgspec, falling back to the standard library.
+"""
+
+from __future__ import annotations
+
+import importlib
+import json
+import typing
+
+__all__ = ["BACKEND", "Backend", "dumps", "loads", "select_backend"]
+
+Loads = typing.Callable[[typing.Union[bytes, bytearray, memoryview, str]], typing.Any]
+Dumps = typing.Callable[[typing.Any], bytes]
+BACKENDS = ("orjson", "msgspec", "json")
+
+
+class Backend(typing.NamedTuple):
+    name: str
+    loads: Loads
+    dumps: Dumps
+
+
+def _json_loads(data: bytes | bytearray | memoryview | str) -> typing.Any:
+    # unlike orjson and msgspec, json does not read from memoryviews
+    if isinstance(data, memoryview):
+        data = data.tobytes()
+    return json.loads(data)
+
+
+def _json_dumps(obj: typing.Any) -> bytes:
+    return json.dumps(obj, separators=(",", ":")).encode()
+
+
+def select_backend(preferred: typing.Iterable[str] = BACKENDS) -> Backend:
+    for name in preferred:
+        if name == "json":
+            return Backend(name, _json_loads, _json_dumps)
+        try:
+            module = importlib.import_module(name)
+        except ImportError:
+            continue
+        if name == "msgspec":
+            return Backend(name, module.json.decode, module.json.encode)
+        return Backend(name, module.loads, module.dumps)
+    raise ValueError(f"no json backend available out of {preferred!r}")
+
+
+BACKEND, loads, dumps = select_backend()
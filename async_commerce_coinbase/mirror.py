@@ -0,0 +1,276 @@
+"""Local SQLite copy of charges, checkouts, invoices and events.
+
+The first `Mirror.sync` downloads everything, later syncs only replay the
+events created since. Checkouts have no events and are listed again, and
+charges and invoices that are still open are fetched again: some changes,
+like cancelling a charge, send no event. Writes run in a worker thread so
+syncing does not block the event loop, reads are served from indexed tables
+and never touch the network.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import datetime
+import os
+import sqlite3
+import threading
+import typing
+
+from .jsonlib import dumps, loads
+from .paginator import CoinbasePaginator
+from .watermark import WatermarkStore
+
+if typing.TYPE_CHECKING:  # pragma: no cover
+    from .client import Coinbase
+
+__all__ = ["Mirror", "KINDS"]
+
+Kind = typing.Literal["charges", "checkouts", "invoices", "events"]
+KINDS: tuple[Kind, ...] = ("charges", "checkouts", "invoices", "events")
+EVENT_RESOURCES: dict[str, Kind] = {"charge": "charges", "invoice": "invoices"}
+# statuses that can still change, possibly without an event
+OPEN_STATUSES: dict[Kind, tuple[str, ...]] = {
+    "charges": ("NEW", "PENDING", "UNRESOLVED"),
+    "invoices": ("OPEN", "VIEWED", "UNRESOLVED"),
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS resources (
+    kind TEXT NOT NULL,
+    id TEXT NOT NULL,
+    code TEXT,
+    status TEXT,
+    -- when the resource got its status
+    changed_at TEXT,
+    created_at TEXT,
+    data BLOB NOT NULL,
+    PRIMARY KEY (kind, id)
+);
+CREATE INDEX IF NOT EXISTS resources_code ON resources (kind, code);
+CREATE INDEX IF NOT EXISTS resources_status ON resources (kind, status, changed_at);
+CREATE INDEX IF NOT EXISTS resources_created_at ON resources (kind, created_at);
+CREATE TABLE IF NOT EXISTS metadata (
+    kind TEXT NOT NULL,
+    id TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT,
+    PRIMARY KEY (kind, id, key)
+);
+CREATE INDEX IF NOT EXISTS metadata_lookup ON metadata (kind, key, value);
+CREATE TABLE IF NOT EXISTS watermarks (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+def _status(kind: Kind, resource: typing.Mapping[str, typing.Any]) -> str | None:
+    if kind == "charges":
+        if timeline := resource.get("timeline"):
+            return typing.cast(str | None, timeline[-1].get("status"))
+        return None
+    elif kind == "events":
+        return typing.cast(str | None, resource.get("type"))
+    return typing.cast(str | None, resource.get("status"))
+
+
+def _changed_at(kind: Kind, resource: typing.Mapping[str, typing.Any]) -> str | None:
+    if kind == "charges":
+        if timeline := resource.get("timeline"):
+            if (time := timeline[-1].get("time")) is not None:
+                return typing.cast(str, time)
+    elif kind == "invoices" and resource.get("updated_at"):
+        return typing.cast(str, resource["updated_at"])
+    return typing.cast(str | None, resource.get("created_at"))
+
+
+def _timestamp(value: str | datetime.datetime) -> str:
+    if isinstance(value, str):
+        return value
+    if value.tzinfo is not None:
+        value = value.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return value.isoformat(timespec="seconds") + "Z"
+
+
+class Mirror(WatermarkStore):
+    """SQLite mirror, also used as the watermark store of its event sync."""
+
+    def __init__(self, path: str | os.PathLike[str] = ":memory:") -> None:
+        # `sync` writes from worker threads, the lock serializes all queries
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def close(self) -> None:
+        self.connection.close()
+
+    async def get(self, key: str) -> str | None:
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT value FROM watermarks WHERE key = ?", (key,)
+            ).fetchone()
+        return None if row is None else typing.cast(str, row[0])
+
+    async def set(self, key: str, value: str) -> None:
+        await asyncio.to_thread(self._set, key, value)
+
+    def _set(self, key: str, value: str) -> None:
+        with self._lock, self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO watermarks (key, value) VALUES (?, ?)",
+                (key, value),
+            )
+
+    def upsert(
+        self, kind: Kind, resources: typing.Iterable[typing.Mapping[str, typing.Any]]
+    ) -> None:
+        rows = []
+        metadata = []
+        for resource in resources:
+            id = resource["id"]
+            rows.append(
+                (
+                    kind,
+                    id,
+                    resource.get("code"),
+                    _status(kind, resource),
+                    _changed_at(kind, resource),
+                    resource.get("created_at"),
+                    dumps(resource),
+                )
+            )
+            for key, value in (resource.get("metadata") or {}).items():
+                metadata.append((kind, id, key, None if value is None else str(value)))
+
+        with self._lock, self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO resources VALUES (?, ?, ?, ?, ?, ?, ?)", rows
+            )
+            self.connection.executemany(
+                "DELETE FROM metadata WHERE kind = ? AND id = ?",
+                [(kind, id) for kind, id, *_ in rows],
+            )
+            self.connection.executemany(
+                "INSERT INTO metadata VALUES (?, ?, ?, ?)", metadata
+            )
+
+    async def sync(self, coinbase: Coinbase) -> None:
+        if await self.get("events") is None:
+            await self._full_sync(coinbase)
+            return
+
+        async for event in coinbase.sync_events(self):
+            await asyncio.to_thread(self._upsert_event, event)
+        await self._sync_all(coinbase.list_checkouts(), "checkouts")
+        await self._refresh(coinbase.get_charges, "charges")
+        await self._refresh(coinbase.get_invoices, "invoices")
+
+    def _upsert_event(self, event: typing.Mapping[str, typing.Any]) -> None:
+        self.upsert("events", [event])
+        data = typing.cast(typing.Mapping[str, typing.Any], event["data"])
+        if (kind := EVENT_RESOURCES.get(data.get("resource", ""))) is not None:
+            self.upsert(kind, [data])
+
+    async def _full_sync(self, coinbase: Coinbase) -> None:
+        # remember the newest event first, anything that changes during the
+        # full download is replayed by the next sync
+        pages = CoinbasePaginator[typing.Any](coinbase, "/events", limit=1).pages()
+        newest, _ = await anext(pages)
+        await pages.aclose()
+
+        await self._sync_all(coinbase.list_charges(), "charges")
+        await self._sync_all(coinbase.list_invoices(), "invoices")
+        await self._sync_all(coinbase.list_checkouts(), "checkouts")
+        await self._sync_all(coinbase.list_events(), "events")
+        # an empty watermark replays all events, there were none before
+        await self.set("events", newest[0]["id"] if newest else "")
+
+    async def _sync_all(
+        self, paginator: CoinbasePaginator[typing.Any], kind: Kind
+    ) -> None:
+        async for page, _ in paginator.pages():
+            await asyncio.to_thread(self.upsert, kind, page)
+
+    async def _refresh(
+        self,
+        fetch: typing.Callable[
+            [list[str]], typing.Awaitable[typing.Sequence[typing.Any]]
+        ],
+        kind: Kind,
+    ) -> None:
+        statuses = OPEN_STATUSES[kind]
+        placeholders = ", ".join("?" * len(statuses))
+        with self._lock:
+            ids = [
+                id
+                for id, in self.connection.execute(
+                    "SELECT id FROM resources "
+                    f"WHERE kind = ? AND status IN ({placeholders})",
+                    (kind, *statuses),
+                )
+            ]
+        if not ids:
+            return
+        results = await fetch(ids)
+        resources = [result for result in results if not isinstance(result, Exception)]
+        await asyncio.to_thread(self.upsert, kind, resources)
+        for result in results:
+            if isinstance(result, Exception):
+                raise result
+
+    def _select(
+        self, where: str, parameters: typing.Sequence[typing.Any]
+    ) -> list[typing.Any]:
+        with self._lock:
+            rows = self.connection.execute(
+                f"SELECT data FROM resources WHERE {where} ORDER BY created_at DESC",
+                parameters,
+            ).fetchall()
+        return [loads(data) for data, in rows]
+
+    def get_resource(self, kind: Kind, code_or_id: str) -> typing.Any:
+        """The resource with this code or id, None if it is not mirrored."""
+        resources = self._select(
+            "kind = ? AND (id = ? OR code = ?)", (kind, code_or_id, code_or_id)
+        )
+        return resources[0] if resources else None
+
+    def find_by_metadata(self, kind: Kind, key: str, value: str) -> list[typing.Any]:
+        return self._select(
+            "kind = ? AND id IN "
+            "(SELECT id FROM metadata WHERE kind = ? AND key = ? AND value = ?)",
+            (kind, kind, key, value),
+        )
+
+    def find_by_status(
+        self,
+        kind: Kind,
+        status: str,
+        *,
+        changed_before: str | datetime.datetime | None = None,
+    ) -> list[typing.Any]:
+        """Resources with a status (last timeline status for charges).
+
+        ``changed_before`` keeps the ones that got it before then (time of the
+        last timeline entry for charges, ``updated_at`` for invoices), so
+        ``find_by_status("charges", "PENDING", changed_before=an_hour_ago)``
+        lists charges pending for more than an hour.
+        """
+        if changed_before is None:
+            return self._select("kind = ? AND status = ?", (kind, status))
+        return self._select(
+            "kind = ? AND status = ? AND changed_at < ?",
+            (kind, status, _timestamp(changed_before)),
+        )
+
+    def find_created_between(
+        self,
+        kind: Kind,
+        start: str | datetime.datetime,
+        end: str | datetime.datetime,
+    ) -> list[typing.Any]:
+        return self._select(
+            "kind = ? AND created_at >= ? AND created_at < ?",
+            (kind, _timestamp(start), _timestamp(end)),
+        )
@@ -0,0 +1,252 @@
+"""Compact slotted alternatives to the TypedDicts returned by default.
+
+Every model has a ``from_dict`` classmethod converting a dict returned by the
+api. Missing fields are set to None and unknown fields are ignored, so new or
+removed fields on coinbase's side never raise. Only the fields every resource
+has, like ``id`` and ``created_at``, are typed as never None: the others are
+left out of partial charges, event payloads or older api versions.
+
+```py
+charges = await coinbase.list_charges().map(models.Charge.from_dict).all()
+charge = models.Charge.from_dict(await coinbase.get_charge(code))
+```
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import typing
+
+from .resources.charge import PartialCheckout
+from .resources.types import PricingType
+
+__all__ = [
+    "Money",
+    "BlockInfo",
+    "Payment",
+    "TimelinePoint",
+    "PaymentThreshold",
+    "Charge",
+    "PartialCharge",
+    "Invoice",
+    "Event",
+]
+
+M = typing.TypeVar("M")
+Converter = typing.Callable[[typing.Any], typing.Any]
+
+
+_FIELD_NAMES: dict[type, tuple[str, ...]] = {}
+
+
+def _field_names(cls: type) -> tuple[str, ...]:
+    if (names := _FIELD_NAMES.get(cls)) is None:
+        names = _FIELD_NAMES[cls] = tuple(
+            field.name for field in dataclasses.fields(cls)
+        )
+    return names
+
+
+def _build(
+    cls: type[M], values: typing.Mapping[str, typing.Any], /, **converters: Converter
+) -> M:
+    kwargs: dict[str, typing.Any] = {}
+    for name in _field_names(cls):
+        value = values.get(name)
+        if value is not None and name in converters:
+            value = converters[name](value)
+        kwargs[name] = value
+    return cls(**kwargs)
+
+
+def _list_of(convert: Converter) -> Converter:
+    return lambda values: [convert(value) for value in values]
+
+
+def _dict_of(convert: Converter) -> Converter:
+    return lambda values: {key: convert(value) for key, value in values.items()}
+
+
+@dataclasses.dataclass(slots=True)
+class Money:
+    amount: float
+    currency: str
+
+    @classmethod
+    def from_dict(cls, data: typing.Mapping[str, typing.Any]) -> Money:
+        return _build(cls, data)
+
+
+@dataclasses.dataclass(slots=True)
+class BlockInfo:
+    height: int
+    hash: str
+    confirmations_accumulated: int | None
+    confirmations_required: int | None
+
+    @classmethod
+    def from_dict(cls, data: typing.Mapping[str, typing.Any]) -> BlockInfo:
+        return _build(cls, data)
+
+
+@dataclasses.dataclass(slots=True)
+class Payment:
+    network: str
+    transaction_id: str
+    status: str
+    value: dict[str, Money] | None
+    block: BlockInfo | None
+
+    @classmethod
+    def from_dict(cls, data: typing.Mapping[str, typing.Any]) -> Payment:
+        return _build(
+            cls, data, value=_dict_of(Money.from_dict), block=BlockInfo.from_dict
+        )
+
+
+@dataclasses.dataclass(slots=True)
+class TimelinePoint:
+    time: str
+    status: str
+    context: str | None
+
+    @classmethod
+    def from_dict(cls, data: typing.Mapping[str, typing.Any]) -> TimelinePoint:
+        return _build(cls, data)
+
+
+@dataclasses.dataclass(slots=True)
+class PaymentThreshold:
+    overpayment_absolute_threshold: Money | None
+    overpayment_relative_threshold: float | None
+    underpayment_absolute_threshold: Money | None
+    underpayment_relative_threshold: float | None
+
+    @classmethod
+    def from_dict(cls, data: typing.Mapping[str, typing.Any]) -> PaymentThreshold:
+        return _build(
+            cls,
+            data,
+            overpayment_absolute_threshold=Money.from_dict,
+            underpayment_absolute_threshold=Money.from_dict,
+        )
+
+
+_CHARGE_CONVERTERS: dict[str, Converter] = {
+    "timeline": _list_of(TimelinePoint.from_dict),
+    "pricing": _dict_of(Money.from_dict),
+    "payment_threshold": PaymentThreshold.from_dict,
+    "applied_threshold": Money.from_dict,
+    "payments": _list_of(Payment.from_dict),
+}
+
+
+@dataclasses.dataclass(slots=True)
+class Charge:
+    id: str
+    resource: str
+    code: str
+    name: str | None
+    description: str | None
+    logo_url: str | None
+    hosted_url: str | None
+    created_at: str
+    confirmed_at: str | None
+    expires_at: str | None
+    checkout: PartialCheckout | None
+    timeline: list[TimelinePoint] | None
+    metadata: dict[str, str] | None
+    pricing_type: PricingType | None
+    pricing: dict[str, Money] | None
+    payment_threshold: PaymentThreshold | None
+    applied_threshold: Money | None
+    applied_threshold_type: str | None
+    payments: list[Payment] | None
+    addresses: dict[str, str] | None
+
+    @classmethod
+    def from_dict(cls, data: typing.Mapping[str, typing.Any]) -> Charge:
+        return _build(cls, data, **_CHARGE_CONVERTERS)
+
+
+@dataclasses.dataclass(slots=True)
+class PartialCharge:
+    id: str
+    resource: str
+    code: str
+    name: str | None
+    description: str | None
+    logo_url: str | None
+    hosted_url: str | None
+    created_at: str
+    expires_at: str | None
+    timeline: list[TimelinePoint] | None
+    metadata: dict[str, str] | None
+    pricing_type: PricingType | None
+    pricing: dict[str, Money] | None
+    payments: list[Payment] | None
+    payment_threshold: PaymentThreshold | None
+    addresses: dict[str, str] | None
+    redirect_url: str | None
+    cancel_url: str | None
+
+    @classmethod
+    def from_dict(cls, data: typing.Mapping[str, typing.Any]) -> PartialCharge:
+        return _build(cls, data, **_CHARGE_CONVERTERS)
+
+
+@dataclasses.dataclass(slots=True)
+class Invoice:
+    id: str
+    resource: str
+    code: str
+    status: str
+    business_name: str | None
+    customer_name: str | None
+    customer_email: str | None
+    memo: str | None
+    local_price: Money | None
+    hosted_url: str | None
+    created_at: str
+    updated_at: str | None
+    charge: PartialCharge | None
+
+    @classmethod
+    def from_dict(cls, data: typing.Mapping[str, typing.Any]) -> Invoice:
+        return _build(
+            cls,
+            data,
+            local_price=Money.from_dict,
+            charge=_invoice_charge,
+        )
+
+
+def _invoice_charge(charge: typing.Mapping[str, typing.Any]) -> PartialCharge | None:
+    # invoices wrap their charge as {"data": {...}}
+    data = charge.get("data")
+    return None if data is None else PartialCharge.from_dict(data)
+
+
+@dataclasses.dataclass(slots=True)
+class Event:
+    id: str
+    resource: str
+    type: str
+    api_version: str | None
+    created_at: str
+    data: Charge | Invoice | typing.Mapping[str, typing.Any]
+
+    @classmethod
+    def from_dict(cls, data: typing.Mapping[str, typing.Any]) -> Event:
+        return _build(cls, data, data=_event_data)
+
+
+def _event_data(
+    data: typing.Mapping[str, typing.Any],
+) -> Charge | Invoice | typing.Mapping[str, typing.Any]:
+    resource = data.get("resource")
+    if resource == "charge":
+        return Charge.from_dict(data)
+    elif resource == "invoice":
+        return Invoice.from_dict(data)
+    return data
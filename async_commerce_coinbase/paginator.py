@@ -1,13 +1,40 @@
 from __future__ import annotations
 
+import asyncio
 import typing
-
-import httpx
+from collections import deque
 
 from .abc import AbstractRequestBase
 
 T = typing.TypeVar("T")
+U = typing.TypeVar("U")
 MAX_LIMIT_PER_PAGE = 100
+Transform = typing.Callable[[list[typing.Any]], list[T]]
+
+
+class Pagination(typing.TypedDict, total=False):
+    order: str
+    starting_after: str | None
+    ending_before: str | None
+    total: int
+    yielded: int
+    limit: int
+    previous_uri: str | None
+    next_uri: str | None
+    cursor: list[str]
+
+
+class Cursor(typing.TypedDict):
+    """Serializable position of a paginator, see `CoinbasePaginator.cursor`."""
+
+    starting_after: str | None
+    ending_before: str | None
+    exhausted: bool
+
+
+Page = tuple[list[T], Pagination]
+# a page with its items as returned by the api, before any transform
+_FetchedPage = tuple[list[T], Pagination, list[typing.Any]]
 
 
 class CoinbasePaginator(typing.Generic[T]):
@@ -16,7 +43,15 @@ class CoinbasePaginator(typing.Generic[T]):
 
     _starting_after: str | None | bool
     _ending_before: str | None
-    _pending: list[T]
+    _cursor: Cursor
+    _pending: deque[T]
+    _pending_cursor: Cursor
+    _page_raw: list[typing.Any] | None
+    _page_taken: int
+    _prefetcher: asyncio.Task[None] | None
+    _pages: asyncio.Queue[_FetchedPage[T] | BaseException | None] | None
+    _exhausted: bool
+    _iteration: int
 
     def __init__(
         self,
@@ -25,30 +60,169 @@ class CoinbasePaginator(typing.Generic[T]):
         *,
         order: str = "desc",
         limit: int = MAX_LIMIT_PER_PAGE,
+        prefetch: int = 0,
+        cursor: Cursor | None = None,
+        transform: Transform[T] | None = None,
     ) -> None:
+        if prefetch < 0:
+            raise ValueError(f"prefetch must be >= 0, got {prefetch!r}")
+
         self.coinbase = coinbase
         self.url = url
 
         self.order = order
         self.limit = limit
+        self.prefetch = prefetch
+        self.transform = transform
+        self.start_cursor: Cursor = cursor or {
+            "starting_after": None,
+            "ending_before": None,
+            "exhausted": False,
+        }
 
         self._starting_after = None
         self._ending_before = None
-        self._pending = []
+        self._cursor = self.start_cursor
+        self._pending = deque()
+        self._pending_cursor = self.start_cursor
+        self._page_raw = None
+        self._page_taken = 0
+        self._prefetcher = None
+        self._pages = None
+        self._exhausted = False
+        self._iteration = 0
 
-    def __aiter__(self: Self) -> Self:
-        self._starting_after = None
-        self._ending_before = None
-        self._pending.clear()
+    def __aiter__(self) -> typing.AsyncIterator[T]:
+        self._restart()
+        if self.prefetch:
+            # asyncio closes an async generator dropped by its consumer, on
+            # break or cancellation, which stops the prefetch task
+            return self._items()
         return self
 
+    def _restart(self) -> None:
+        self._cancel_prefetcher()
+        self._iteration += 1
+        start = self.start_cursor
+        self._starting_after = False if start["exhausted"] else start["starting_after"]
+        self._ending_before = start["ending_before"]
+        self._cursor = start
+        self._pending.clear()
+        self._pending_cursor = start
+        self._page_raw = None
+        self._exhausted = False
+
+    async def _items(self) -> typing.AsyncGenerator[T, None]:
+        iteration = self._iteration
+        try:
+            while True:
+                try:
+                    item = await self.__anext__()
+                except StopAsyncIteration:
+                    return
+                yield item
+        finally:
+            await self._close(iteration)
+
     async def __anext__(self) -> T:
-        if self._pending:
-            return self._pending.pop(0)
-        elif self._starting_after is False:
-            raise StopAsyncIteration
+        while not self._pending:
+            self._cursor = self._pending_cursor
+            page = await self._next_page()
+            if page is None:
+                raise StopAsyncIteration
+            data, pagination, raw = page
+            self._pending.extend(data)
+            self._pending_cursor = self._cursor_after(pagination)
+            # a transform that drops items makes item positions meaningless
+            self._page_raw = raw if len(raw) == len(data) else None
+            self._page_taken = 0
+        item = self._pending.popleft()
+        self._page_taken += 1
+        if not self._pending:
+            self._cursor = self._pending_cursor
+        return item
+
+    @property
+    def cursor(self) -> Cursor:
+        """Position right after the last item (or page) handed out.
+
+        The returned dict is JSON serializable and can be passed as
+        ``cursor=`` to a new paginator to resume where this one left off.
+        In the middle of a page it points after the last item yielded, using
+        the ``id`` the api returned for it. Without such an id it points to
+        the start of the page, and resuming yields that page again.
+        """
+        if self._pending and self._page_raw is not None and self._page_taken:
+            item = self._page_raw[self._page_taken - 1]
+            if isinstance(item, dict) and isinstance(id := item.get("id"), str):
+                return {
+                    "starting_after": id,
+                    "ending_before": self._ending_before,
+                    "exhausted": False,
+                }
+        return self._cursor.copy()
+
+    async def __aenter__(self: Self) -> Self:
+        return self
+
+    async def __aexit__(self, *exc_info: typing.Any) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Stop the background prefetch task, if one is running."""
+        prefetcher = self._prefetcher
+        self._cancel_prefetcher()
+        if prefetcher is not None:
+            try:
+                await prefetcher
+            except asyncio.CancelledError:
+                pass
+
+    async def _close(self, iteration: int) -> None:
+        # a restarted paginator has a new prefetch task, leave it running
+        if iteration == self._iteration:
+            await self.aclose()
+
+    async def _next_page(self) -> _FetchedPage[T] | None:
+        if self._exhausted:
+            return None
+        elif not self.prefetch:
+            if self._starting_after is False:
+                self._exhausted = True
+                return None
+            return await self._fetch_page()
 
-        request = httpx.Request(
+        if self._pages is None:
+            self._pages = asyncio.Queue(self.prefetch)
+            self._prefetcher = asyncio.create_task(self._prefetch(self._pages))
+
+        page = await self._pages.get()
+        if page is None or isinstance(page, BaseException):
+            self._exhausted = True
+            self._cancel_prefetcher()
+            if page is not None:
+                raise page
+        return page
+
+    async def _prefetch(
+        self, pages: asyncio.Queue[_FetchedPage[T] | BaseException | None]
+    ) -> None:
+        try:
+            while self._starting_after is not False:
+                await pages.put(await self._fetch_page())
+        except Exception as e:
+            await pages.put(e)
+        else:
+            await pages.put(None)
+
+    def _cancel_prefetcher(self) -> None:
+        if self._prefetcher is not None:
+            self._prefetcher.cancel()
+        self._prefetcher = None
+        self._pages = None
+
+    async def _fetch_page(self) -> _FetchedPage[T]:
+        response = await self.coinbase.call(
             "GET",
             self.url,
             params={
@@ -58,35 +232,109 @@ class CoinbasePaginator(typing.Generic[T]):
                 "ending_before": self._ending_before,
             },
         )
-        response = await self.coinbase.request(request)
 
-        pagination = response["pagination"]
+        pagination: Pagination = response["pagination"]
+        cursor = self._cursor_after(pagination)
+        # False raises StopIteration on next anext call
+        self._starting_after = (
+            False if cursor["exhausted"] else cursor["starting_after"]
+        )
+
+        data = response["data"]
+        if self.transform is not None:
+            return self.transform(data), pagination, data
+        return typing.cast(list[T], data), pagination, data
+
+    def _cursor_after(self, pagination: Pagination) -> Cursor:
         if pagination["next_uri"] is None:
-            # raise StopIteration on next anext call
-            self._starting_after = False
-        else:
-            _, end = pagination["cursor"]
-            self._starting_after = end
+            return {
+                "starting_after": None,
+                "ending_before": self._ending_before,
+                "exhausted": True,
+            }
+        _, end = pagination["cursor"]
+        return {
+            "starting_after": end,
+            "ending_before": self._ending_before,
+            "exhausted": False,
+        }
+
+    def map(self, func: typing.Callable[[T], U]) -> CoinbasePaginator[U]:
+        """Return a new paginator applying ``func`` to every item of a page.
 
-        self._pending.extend(typing.cast(typing.Sequence[T], response["data"]))
-        return self._pending.pop(0)
+        ``list_charges().map(models.Charge.from_dict)`` for example yields
+        slotted models instead of dicts.
+        """
+        transform = self.transform
+
+        def map_page(data: list[typing.Any]) -> list[U]:
+            if transform is not None:
+                data = transform(data)
+            return [func(item) for item in data]
+
+        return CoinbasePaginator(
+            self.coinbase,
+            self.url,
+            order=self.order,
+            limit=self.limit,
+            prefetch=self.prefetch,
+            cursor=self.start_cursor,
+            transform=map_page,
+        )
+
+    def select(self, *fields: str) -> CoinbasePaginator[dict[str, typing.Any]]:
+        """Return a new paginator only keeping ``fields`` of every item.
+
+        Everything else is dropped as soon as a page arrives, which keeps the
+        memory use of long scans low when only a few fields are needed.
+        """
+
+        def project(item: typing.Any) -> dict[str, typing.Any]:
+            return {field: item[field] for field in fields if field in item}
+
+        return self.map(project)
+
+    async def pages(self) -> typing.AsyncGenerator[Page[T], None]:
+        """Yield every page as a ``(data, pagination)`` tuple.
+
+        This is the cheapest way to consume a listing, it does one await per
+        page instead of one per item.
+        """
+        self._restart()
+        iteration = self._iteration
+        try:
+            while (page := await self._next_page()) is not None:
+                data, pagination, _ = page
+                self._cursor = self._cursor_after(pagination)
+                yield data, pagination
+        finally:
+            await self._close(iteration)
 
     async def all(self) -> typing.Sequence[T]:
         all: list[T] = []
-        async for item in self:
-            all.append(item)
-            all.extend(self._pending)
-            self._pending.clear()
+        async for data, _ in self.pages():
+            all.extend(data)
         return all
 
     async def chunk(
         self, chunk_size: int
     ) -> typing.AsyncGenerator[typing.Sequence[T], None]:
+        if chunk_size < 1:
+            raise ValueError(f"chunk_size must be >= 1, got {chunk_size!r}")
+
         chunk: list[T] = []
-        async for item in self:
-            chunk.append(item)
-            if len(chunk) >= chunk_size:
-                yield chunk[:chunk_size]
-                chunk = chunk[chunk_size:]
+        async for page, _ in self.pages():
+            offset = 0
+            if chunk:
+                # top up the leftovers of the previous page first
+                offset = chunk_size - len(chunk)
+                chunk.extend(page[:offset])
+                if len(chunk) < chunk_size:
+                    continue
+                yield chunk
+            while len(page) - offset >= chunk_size:
+                yield page[offset : offset + chunk_size]
+                offset += chunk_size
+            chunk = page[offset:]
         if chunk:
             yield chunk
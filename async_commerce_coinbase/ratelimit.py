@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import asyncio
+import time
+import typing
+
+import httpx
+
+from .endpoints import endpoint_template
+
+__all__ = ["TokenBucket", "RateLimiter"]
+
+
+class TokenBucket:
+    """Async token bucket refilling ``rate`` tokens per second up to ``capacity``.
+
+    Tokens are reserved before waiting, so waiters are served in order and a
+    bucket can be shared by any number of tasks and clients in one process.
+    """
+
+    def __init__(self, rate: float, capacity: float | None = None) -> None:
+        if rate <= 0:
+            raise ValueError(f"rate must be > 0, got {rate!r}")
+        self.rate = rate
+        self.capacity = rate if capacity is None else capacity
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated_at) * self.rate
+        )
+        self._updated_at = now
+
+    async def acquire(self, tokens: float = 1) -> None:
+        self._refill()
+        self._tokens -= tokens
+        if self._tokens >= 0:
+            return
+        try:
+            await asyncio.sleep(-self._tokens / self.rate)
+        except asyncio.CancelledError:
+            self._tokens += tokens
+            raise
+
+
+class RateLimiter:
+    """Picks the `TokenBucket` a request has to pass.
+
+    ``rules`` are keyed by ``"METHOD /template"``, ``"/template"`` or
+    ``"METHOD"`` (eg ``"POST /charges"``, ``"/charges/{code}"`` or ``"GET"``)
+    and the most specific match wins. Requests without a matching rule use
+    ``default``, or pass unthrottled if that is None.
+    """
+
+    def __init__(
+        self,
+        default: TokenBucket | None = None,
+        *,
+        rules: typing.Mapping[str, TokenBucket] | None = None,
+    ) -> None:
+        self.default = default
+        self.rules = dict(rules or {})
+
+    def get_bucket(self, request: httpx.Request) -> TokenBucket | None:
+        template = endpoint_template(request.url.path)
+        for key in (f"{request.method} {template}", template, request.method):
+            if (bucket := self.rules.get(key)) is not None:
+                return bucket
+        return self.default
+
+    async def acquire(self, request: httpx.Request) -> None:
+        if (bucket := self.get_bucket(request)) is not None:
+            await bucket.acquire()
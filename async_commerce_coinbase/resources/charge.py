@@ -2,10 +2,9 @@ from __future__ import annotations
 
 import typing
 
-import httpx
-
 from ..abc import AbstractRequestBase
-from ..paginator import CoinbasePaginator
+from ..bulk import fetch_many
+from ..paginator import CoinbasePaginator, Cursor
 from .types import Money, PricingType
 
 __all__ = [
@@ -109,8 +108,10 @@ class BlockInfo(typing.TypedDict):
 
 
 class CoinbaseChargeResource(AbstractRequestBase):
-    def list_charges(self) -> CoinbasePaginator[Charge]:
-        return CoinbasePaginator(self, "/charges")
+    def list_charges(
+        self, *, prefetch: int = 0, cursor: Cursor | None = None
+    ) -> CoinbasePaginator[Charge]:
+        return CoinbasePaginator(self, "/charges", prefetch=prefetch, cursor=cursor)
 
     async def create_charge(
         self,
@@ -131,24 +132,29 @@ class CoinbaseChargeResource(AbstractRequestBase):
             "cancel_url": cancel_url,
             "metadata": metadata,
         }
-        request = httpx.Request("POST", "/charges", json=body)
-        response = await self.request(request)
+        response = await self.call("POST", "/charges", json=body)
         return typing.cast(PartialCharge, response["data"])
 
     async def get_charge(self, code_or_id: str) -> Charge:
         self.assert_code(code_or_id)
-        request = httpx.Request("GET", f"/charges/{code_or_id}")
-        response = await self.request(request)
+        response = await self.call("GET", f"/charges/{code_or_id}")
         return typing.cast(Charge, response["data"])
 
+    async def get_charges(
+        self, codes_or_ids: typing.Iterable[str], *, concurrency: int = 10
+    ) -> list[Charge | Exception]:
+        """Fetch many charges concurrently, in the order of ``codes_or_ids``.
+
+        Failed lookups are returned as exceptions instead of raising.
+        """
+        return await fetch_many(self.get_charge, codes_or_ids, concurrency=concurrency)
+
     async def cancel_charge(self, code_or_id: str) -> PartialCharge:
         self.assert_code(code_or_id)
-        request = httpx.Request("POST", f"/charges/{code_or_id}/cancel")
-        response = await self.request(request)
+        response = await self.call("POST", f"/charges/{code_or_id}/cancel")
         return typing.cast(PartialCharge, response["data"])
 
     async def resolve_charge(self, code_or_id: str) -> PartialCharge:
         self.assert_code(code_or_id)
-        request = httpx.Request("POST", f"/charges/{code_or_id}/resolve")
-        response = await self.request(request)
+        response = await self.call("POST", f"/charges/{code_or_id}/resolve")
         return typing.cast(PartialCharge, response["data"])
@@ -2,10 +2,9 @@ from __future__ import annotations
 
 import typing
 
-import httpx
-
 from ..abc import AbstractRequestBase
-from ..paginator import CoinbasePaginator
+from ..bulk import fetch_many
+from ..paginator import CoinbasePaginator, Cursor
 from .types import Money, PricingType
 
 __all__ = ["Checkout", "CoinbaseCheckoutResource"]
@@ -25,8 +24,10 @@ RequestedInfo = typing.Literal["name", "email"]
 
 
 class CoinbaseCheckoutResource(AbstractRequestBase):
-    def list_checkouts(self) -> CoinbasePaginator[Checkout]:
-        return CoinbasePaginator(self, "/checkouts")
+    def list_checkouts(
+        self, *, prefetch: int = 0, cursor: Cursor | None = None
+    ) -> CoinbasePaginator[Checkout]:
+        return CoinbasePaginator(self, "/checkouts", prefetch=prefetch, cursor=cursor)
 
     async def create_checkout(
         self,
@@ -43,16 +44,25 @@ class CoinbaseCheckoutResource(AbstractRequestBase):
             "pricing_type": pricing_type,
             "local_price": local_price,
         }
-        request = httpx.Request("POST", "/checkouts", json=body)
-        response = await self.request(request)
+        response = await self.call("POST", "/checkouts", json=body)
         return typing.cast(Checkout, response["data"])
 
     async def get_checkout(self, code_or_id: str) -> Checkout:
         self.assert_code(code_or_id)
-        request = httpx.Request("GET", f"/checkouts/{code_or_id}")
-        response = await self.request(request)
+        response = await self.call("GET", f"/checkouts/{code_or_id}")
         return typing.cast(Checkout, response["data"])
 
+    async def get_checkouts(
+        self, codes_or_ids: typing.Iterable[str], *, concurrency: int = 10
+    ) -> list[Checkout | Exception]:
+        """Fetch many checkouts concurrently, in the order of ``codes_or_ids``.
+
+        Failed lookups are returned as exceptions instead of raising.
+        """
+        return await fetch_many(
+            self.get_checkout, codes_or_ids, concurrency=concurrency
+        )
+
     async def update_checkout(
         self,
         id: str,
@@ -73,11 +83,9 @@ class CoinbaseCheckoutResource(AbstractRequestBase):
             raise ValueError(
                 "must specify name, requested_info or local_price to overwrite"
             )
-        request = httpx.Request("PUT", f"/checkouts/{id}", json=body)
-        response = await self.request(request)
+        response = await self.call("PUT", f"/checkouts/{id}", json=body)
         return typing.cast(Checkout, response["data"])
 
     async def delete_checkout(self, id: str) -> None:
         self.assert_code(id)
-        request = httpx.Request("DELETE", f"/checkouts/{id}")
-        await self.request(request)
+        await self.call("DELETE", f"/checkouts/{id}")
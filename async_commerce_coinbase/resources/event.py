@@ -2,10 +2,10 @@ from __future__ import annotations
 
 import typing
 
-import httpx
-
 from ..abc import AbstractRequestBase
-from ..paginator import CoinbasePaginator
+from ..bulk import fetch_many
+from ..paginator import CoinbasePaginator, Cursor
+from ..watermark import WatermarkStore
 from .charge import PartialCharge
 
 __all__ = ["Event", "CoinbaseEventResource"]
@@ -21,11 +21,48 @@ class Event(typing.TypedDict):
 
 
 class CoinbaseEventResource(AbstractRequestBase):
-    def list_events(self) -> CoinbasePaginator[Event]:
-        return CoinbasePaginator(self, "/events")
+    def list_events(
+        self, *, prefetch: int = 0, cursor: Cursor | None = None
+    ) -> CoinbasePaginator[Event]:
+        return CoinbasePaginator(self, "/events", prefetch=prefetch, cursor=cursor)
+
+    async def sync_events(
+        self, store: WatermarkStore, *, key: str = "events", prefetch: int = 0
+    ) -> typing.AsyncGenerator[Event, None]:
+        """Yield only the events created since the last sync, oldest first.
+
+        The id of the newest event is written to ``store`` once a page of
+        events has been fully consumed, so a sync that is interrupted picks up
+        that page again on the next run. Without a watermark the full history
+        is synced.
+        """
+        paginator = CoinbasePaginator[Event](
+            self,
+            "/events",
+            order="asc",
+            prefetch=prefetch,
+            cursor={
+                "starting_after": await store.get(key),
+                "ending_before": None,
+                "exhausted": False,
+            },
+        )
+        async for events, _ in paginator.pages():
+            for event in events:
+                yield event
+            if events:
+                await store.set(key, events[-1]["id"])
 
     async def get_event(self, code_or_id: str) -> Event:
         self.assert_code(code_or_id)
-        request = httpx.Request("GET", f"/events/{code_or_id}")
-        response = await self.request(request)
+        response = await self.call("GET", f"/events/{code_or_id}")
         return typing.cast(Event, response["data"])
+
+    async def get_events(
+        self, codes_or_ids: typing.Iterable[str], *, concurrency: int = 10
+    ) -> list[Event | Exception]:
+        """Fetch many events concurrently, in the order of ``codes_or_ids``.
+
+        Failed lookups are returned as exceptions instead of raising.
+        """
+        return await fetch_many(self.get_event, codes_or_ids, concurrency=concurrency)
@@ -2,10 +2,9 @@ from __future__ import annotations
 
 import typing
 
-import httpx
-
 from ..abc import AbstractRequestBase
-from ..paginator import CoinbasePaginator
+from ..bulk import fetch_many
+from ..paginator import CoinbasePaginator, Cursor
 from .charge import PartialCharge
 from .types import Money
 
@@ -33,8 +32,10 @@ class ChargeData(typing.TypedDict):
 
 
 class CoinbaseInvoiceResource(AbstractRequestBase):
-    def list_invoices(self) -> CoinbasePaginator[Invoice]:
-        return CoinbasePaginator(self, "/invoices")
+    def list_invoices(
+        self, *, prefetch: int = 0, cursor: Cursor | None = None
+    ) -> CoinbasePaginator[Invoice]:
+        return CoinbasePaginator(self, "/invoices", prefetch=prefetch, cursor=cursor)
 
     async def create_invoice(
         self,
@@ -54,24 +55,29 @@ class CoinbaseInvoiceResource(AbstractRequestBase):
             body["customer_name"] = customer_name
         if memo is not None:
             body["memo"] = memo
-        request = httpx.Request("POST", "/invoices", json=body)
-        response = await self.request(request)
+        response = await self.call("POST", "/invoices", json=body)
         return typing.cast(Invoice, response["data"])
 
     async def get_invoice(self, code_or_id: str) -> Invoice:
         self.assert_code(code_or_id)
-        request = httpx.Request("GET", f"/invoices/{code_or_id}")
-        response = await self.request(request)
+        response = await self.call("GET", f"/invoices/{code_or_id}")
         return typing.cast(Invoice, response["data"])
 
+    async def get_invoices(
+        self, codes_or_ids: typing.Iterable[str], *, concurrency: int = 10
+    ) -> list[Invoice | Exception]:
+        """Fetch many invoices concurrently, in the order of ``codes_or_ids``.
+
+        Failed lookups are returned as exceptions instead of raising.
+        """
+        return await fetch_many(self.get_invoice, codes_or_ids, concurrency=concurrency)
+
     async def void_invoice(self, code_or_id: str) -> Invoice:
         self.assert_code(code_or_id)
-        request = httpx.Request("PUT", f"/invoices/{code_or_id}/void")
-        response = await self.request(request)
+        response = await self.call("PUT", f"/invoices/{code_or_id}/void")
         return typing.cast(Invoice, response["data"])
 
     async def resolve_invoice(self, code_or_id: str) -> Invoice:
         self.assert_code(code_or_id)
-        request = httpx.Request("PUT", f"/invoices/{code_or_id}/resolve")
-        response = await self.request(request)
+        response = await self.call("PUT", f"/invoices/{code_or_id}/resolve")
         return typing.cast(Invoice, response["data"])
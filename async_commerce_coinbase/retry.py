@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import asyncio
+import email.utils
+import random
+import time
+import typing
+
+import httpx
+
+__all__ = ["RetryPolicy", "RETRY_STATUS_CODES", "IDEMPOTENT_METHODS"]
+
+RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+# cancelling or resolving a charge twice has the same effect as doing it once
+IDEMPOTENT_POST_ACTIONS = ("/cancel", "/resolve")
+
+SendFunction = typing.Callable[[httpx.Request], typing.Awaitable[httpx.Response]]
+RetryHook = typing.Callable[[httpx.Request, int, float], None]
+
+
+class RetryPolicy:
+    """Retries idempotent requests with exponential backoff and full jitter.
+
+    A request is retried on transport errors and on responses with one of
+    ``status_codes``, at most ``max_attempts`` times in total and never past
+    ``deadline`` seconds after the first attempt. ``Retry-After`` headers are
+    honored. ``on_retry`` is called with the request, the attempt that failed
+    and the delay before the next one; ``retries`` counts all retries.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_attempts: int = 3,
+        backoff: float = 0.5,
+        max_backoff: float = 30.0,
+        deadline: float | None = 60.0,
+        status_codes: typing.Collection[int] = RETRY_STATUS_CODES,
+        on_retry: RetryHook | None = None,
+    ) -> None:
+        if max_attempts < 1:
+            raise ValueError(f"max_attempts must be >= 1, got {max_attempts!r}")
+
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.deadline = deadline
+        self.status_codes = frozenset(status_codes)
+        self.on_retry = on_retry
+        self.retries = 0
+
+    def is_retryable(self, request: httpx.Request) -> bool:
+        if request.method in IDEMPOTENT_METHODS:
+            return True
+        return request.method == "POST" and request.url.path.endswith(
+            IDEMPOTENT_POST_ACTIONS
+        )
+
+    def get_delay(
+        self, attempt: int, response: httpx.Response | None, elapsed: float
+    ) -> float | None:
+        """Return how long to wait before the next attempt or None to give up."""
+        if attempt >= self.max_attempts:
+            return None
+
+        delay = random.uniform(
+            0, min(self.max_backoff, self.backoff * 2 ** (attempt - 1))
+        )
+        if response is not None:
+            if (retry_after := parse_retry_after(response)) is not None:
+                delay = retry_after
+
+        if self.deadline is not None and elapsed + delay > self.deadline:
+            return None
+        return delay
+
+    async def send(self, send: SendFunction, request: httpx.Request) -> httpx.Response:
+        if not self.is_retryable(request):
+            return await send(request)
+
+        start = time.monotonic()
+        attempt = 1
+        while True:
+            try:
+                response = await send(request)
+            except httpx.TransportError:
+                delay = self.get_delay(attempt, None, time.monotonic() - start)
+                if delay is None:
+                    raise
+            else:
+                if response.status_code not in self.status_codes:
+                    return response
+                delay = self.get_delay(attempt, response, time.monotonic() - start)
+                if delay is None:
+                    return response
+                await response.aclose()
+
+            self.retries += 1
+            if self.on_retry is not None:
+                self.on_retry(request, attempt, delay)
+            await asyncio.sleep(delay)
+            attempt += 1
+
+
+def parse_retry_after(response: httpx.Response) -> float | None:
+    value = response.headers.get("retry-after")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        date = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, float(date.timestamp()) - time.time())
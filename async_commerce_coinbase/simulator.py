@@ -0,0 +1,407 @@
+"""An in-process coinbase commerce api, plugged in as an httpx transport.
+
+```py
+simulator = CoinbaseSimulator(latency=0.01, error_rate=0.01)
+coinbase = Coinbase("test", transport=simulator)
+charge = await coinbase.create_charge(...)
+simulator.set_charge_status(charge["code"], "COMPLETED")  # charge:confirmed
+```
+
+Charges, checkouts, invoices and events are kept in memory with cursor
+pagination, the cancel, resolve and void transitions and the events they
+create. Latency, 429 and 5xx responses can be injected to load-test retries,
+rate limiting and the other concurrency features without the real api.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import datetime
+import random
+import string
+import typing
+import uuid
+
+import httpx
+
+from .endpoints import endpoint_template
+from .jsonlib import dumps, loads
+
+__all__ = ["CoinbaseSimulator", "SimulatedError"]
+
+Resource = dict[str, typing.Any]
+Handler = typing.Callable[[httpx.Request, str], Resource]
+
+DEFAULT_LIMIT = 25
+MAX_LIMIT = 100
+COLLECTIONS = ("charges", "checkouts", "invoices", "events")
+CHARGE_EVENTS = {
+    "PENDING": "charge:pending",
+    "COMPLETED": "charge:confirmed",
+    "EXPIRED": "charge:failed",
+    "UNRESOLVED": "charge:failed",
+    "RESOLVED": "charge:resolved",
+}
+INVOICE_EVENTS = {
+    "VIEWED": "invoice:viewed",
+    "PAID": "invoice:paid",
+    "VOID": "invoice:voided",
+    "UNRESOLVED": "invoice:unresolved",
+}
+
+
+class SimulatedError(Exception):
+    """Turned into an error response by the simulator."""
+
+    def __init__(self, status_code: int, type: str, message: str) -> None:
+        super().__init__(message)
+        self.status_code = status_code
+        self.type = type
+        self.message = message
+
+
+class CoinbaseSimulator(httpx.AsyncBaseTransport):
+    """Fake coinbase commerce api keeping every resource in memory.
+
+    Every request waits ``latency`` seconds, then fails with a 429 (with a
+    ``Retry-After`` of ``retry_after`` seconds) with probability
+    ``throttle_rate`` or with a 500 or 503 with probability ``error_rate``.
+    With an ``api_key``, requests with another key are rejected with a 401.
+    ``seed`` makes ids, codes and injected failures reproducible.
+    """
+
+    def __init__(
+        self,
+        *,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        throttle_rate: float = 0.0,
+        retry_after: float = 1.0,
+        api_key: str | None = None,
+        seed: int | None = None,
+    ) -> None:
+        self.latency = latency
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.api_key = api_key
+        self.random = random.Random(seed)
+        self.requests = 0
+        self.collections: dict[str, dict[str, Resource]] = {
+            name: {} for name in COLLECTIONS
+        }
+        self._codes: dict[str, dict[str, str]] = {name: {} for name in COLLECTIONS}
+        # ids in creation order, None once deleted, and the position of each id
+        self._ids: dict[str, list[str | None]] = {name: [] for name in COLLECTIONS}
+        self._positions: dict[str, dict[str, int]] = {name: {} for name in COLLECTIONS}
+        self.routes: dict[tuple[str, str], Handler] = {
+            ("POST", "/charges"): self._create_charge,
+            ("POST", "/charges/{code}/cancel"): self._cancel_charge,
+            ("POST", "/charges/{code}/resolve"): self._resolve_charge,
+            ("POST", "/checkouts"): self._create_checkout,
+            ("PUT", "/checkouts/{code}"): self._update_checkout,
+            ("DELETE", "/checkouts/{code}"): self._delete_checkout,
+            ("POST", "/invoices"): self._create_invoice,
+            ("PUT", "/invoices/{code}/void"): self._void_invoice,
+            ("PUT", "/invoices/{code}/resolve"): self._resolve_invoice,
+        }
+        for name in COLLECTIONS:
+            self.routes["GET", f"/{name}"] = self._list
+            self.routes["GET", f"/{name}/{{code}}"] = self._get
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        await request.aread()
+
+        try:
+            self._check_request(request)
+            template = endpoint_template(request.url.path)
+            handler = self.routes.get((request.method, template))
+            if handler is None:
+                raise SimulatedError(404, "not_found", "Not found")
+            body = handler(request, template)
+        except SimulatedError as e:
+            headers = {}
+            if e.status_code == 429:
+                headers["Retry-After"] = str(self.retry_after)
+            return self._response(
+                e.status_code,
+                {"error": {"type": e.type, "message": e.message}},
+                headers,
+            )
+        return self._response(200, body)
+
+    def _check_request(self, request: httpx.Request) -> None:
+        if self.api_key is not None:
+            if request.headers.get("X-CC-Api-Key") != self.api_key:
+                raise SimulatedError(401, "authorization_error", "Invalid api key")
+        if self.throttle_rate and self.random.random() < self.throttle_rate:
+            raise SimulatedError(429, "rate_limit_exceeded", "Too many requests")
+        if self.error_rate and self.random.random() < self.error_rate:
+            status_code = self.random.choice((500, 503))
+            raise SimulatedError(status_code, "internal_server_error", "Try again")
+
+    def _response(
+        self,
+        status_code: int,
+        body: Resource,
+        headers: dict[str, str] | None = None,
+    ) -> httpx.Response:
+        return httpx.Response(
+            status_code,
+            headers={"Content-Type": "application/json", **(headers or {})},
+            content=dumps(body),
+        )
+
+    def _now(self) -> str:
+        return datetime.datetime.now(datetime.timezone.utc).strftime(
+            "%Y-%m-%dT%H:%M:%SZ"
+        )
+
+    def _new_resource(
+        self, collection: str, fields: Resource, *, code: bool = True
+    ) -> Resource:
+        id = str(uuid.UUID(int=self.random.getrandbits(128), version=4))
+        resource: Resource = {"id": id, "resource": collection[:-1]}
+        if code:
+            resource["code"] = "".join(
+                self.random.choices(string.ascii_uppercase + string.digits, k=8)
+            )
+            self._codes[collection][resource["code"]] = id
+        resource.update(fields)
+        resource["created_at"] = self._now()
+        self.collections[collection][id] = resource
+        ids = self._ids[collection]
+        self._positions[collection][id] = len(ids)
+        ids.append(id)
+        return resource
+
+    def _remove(self, collection: str, id: str) -> None:
+        resource = self.collections[collection].pop(id)
+        self._codes[collection].pop(resource.get("code", ""), None)
+        self._ids[collection][self._positions[collection].pop(id)] = None
+
+    def add_event(self, type: str, data: Resource) -> Resource:
+        """Record an event, like coinbase does on every change."""
+        return self._new_resource(
+            "events",
+            {"type": type, "api_version": "2018-03-22", "data": loads(dumps(data))},
+            code=False,
+        )
+
+    def find(self, collection: str, code_or_id: str) -> Resource:
+        resources = self.collections[collection]
+        id = self._codes[collection].get(code_or_id, code_or_id)
+        if (resource := resources.get(id)) is not None:
+            return resource
+        raise SimulatedError(404, "not_found", f"{collection[:-1]} not found")
+
+    def set_charge_status(self, code_or_id: str, status: str) -> Resource:
+        """Move a charge along its timeline, eg to ``COMPLETED`` once paid."""
+        charge = self.find("charges", code_or_id)
+        charge["timeline"].append({"time": self._now(), "status": status})
+        if status == "COMPLETED":
+            charge["confirmed_at"] = self._now()
+        if (event := CHARGE_EVENTS.get(status)) is not None:
+            self.add_event(event, charge)
+        return charge
+
+    def set_invoice_status(self, code_or_id: str, status: str) -> Resource:
+        invoice = self.find("invoices", code_or_id)
+        invoice["status"] = status
+        invoice["updated_at"] = self._now()
+        if (event := INVOICE_EVENTS.get(status)) is not None:
+            self.add_event(event, invoice)
+        return invoice
+
+    def _json(self, request: httpx.Request) -> Resource:
+        try:
+            body = loads(request.content)
+        except ValueError:
+            body = None
+        if not isinstance(body, dict):
+            raise SimulatedError(400, "invalid_request", "Expected a json object")
+        return body
+
+    def _code(self, request: httpx.Request) -> str:
+        return request.url.path.strip("/").split("/")[1]
+
+    def _list(self, request: httpx.Request, template: str) -> Resource:
+        params = request.url.params
+        order = params.get("order") or "desc"
+        try:
+            limit = min(int(params.get("limit") or DEFAULT_LIMIT), MAX_LIMIT)
+        except ValueError:
+            limit = 0
+        if limit < 1:
+            raise SimulatedError(400, "invalid_request", "limit must be >= 1")
+        starting_after = params.get("starting_after") or None
+        ending_before = params.get("ending_before") or None
+
+        collection = template.strip("/")
+        resources = self.collections[collection]
+        ids = self._ids[collection]
+        positions = self._positions[collection]
+        try:
+            # walk the creation order list from start towards stop, excluded
+            if order == "desc":
+                step = -1
+                start = (
+                    len(ids) if starting_after is None else positions[starting_after]
+                )
+                start -= 1
+                stop = -1 if ending_before is None else positions[ending_before]
+            else:
+                step = 1
+                start = 0 if starting_after is None else positions[starting_after] + 1
+                stop = len(ids) if ending_before is None else positions[ending_before]
+        except KeyError:
+            raise SimulatedError(400, "invalid_request", "Unknown cursor") from None
+
+        page: list[Resource] = []
+        index = start
+        while (stop - index) * step > 0 and len(page) < limit:
+            if (id := ids[index]) is not None:
+                page.append(resources[id])
+            index += step
+        while (stop - index) * step > 0 and ids[index] is None:
+            index += step
+        more = (stop - index) * step > 0
+
+        path = request.url.path
+        return {
+            "pagination": {
+                "order": order,
+                "starting_after": starting_after,
+                "ending_before": ending_before,
+                "total": len(resources),
+                "yielded": len(page),
+                "limit": limit,
+                "previous_uri": None,
+                "next_uri": (
+                    f"{path}?order={order}&limit={limit}"
+                    f"&starting_after={page[-1]['id']}"
+                    if more
+                    else None
+                ),
+                "cursor": [page[0]["id"], page[-1]["id"]] if page else [],
+            },
+            "data": page,
+        }
+
+    def _get(self, request: httpx.Request, template: str) -> Resource:
+        collection = template.strip("/").split("/")[0]
+        return {"data": self.find(collection, self._code(request))}
+
+    def _create_charge(self, request: httpx.Request, template: str) -> Resource:
+        body = self._json(request)
+        now = datetime.datetime.now(datetime.timezone.utc)
+        local_price = body.get("local_price")
+        charge = self._new_resource(
+            "charges",
+            {
+                "name": body.get("name"),
+                "description": body.get("description"),
+                "pricing_type": body.get("pricing_type", "no_price"),
+                "pricing": {"local": local_price} if local_price else {},
+                "metadata": body.get("metadata") or {},
+                "redirect_url": body.get("redirect_url"),
+                "cancel_url": body.get("cancel_url"),
+                "expires_at": (now + datetime.timedelta(hours=1)).strftime(
+                    "%Y-%m-%dT%H:%M:%SZ"
+                ),
+                "timeline": [{"time": self._now(), "status": "NEW"}],
+                "payments": [],
+                "addresses": {},
+            },
+        )
+        charge["hosted_url"] = f"https://commerce.coinbase.com/charges/{charge['code']}"
+        self.add_event("charge:created", charge)
+        return {"data": charge}
+
+    def _charge_transition(
+        self, request: httpx.Request, source: str, target: str
+    ) -> Resource:
+        charge = self.find("charges", self._code(request))
+        status = charge["timeline"][-1]["status"]
+        if status != source:
+            raise SimulatedError(
+                400,
+                "invalid_request",
+                f"charge is {status}, only {source} charges can become {target}",
+            )
+        return {"data": self.set_charge_status(charge["id"], target)}
+
+    def _cancel_charge(self, request: httpx.Request, template: str) -> Resource:
+        return self._charge_transition(request, "NEW", "CANCELED")
+
+    def _resolve_charge(self, request: httpx.Request, template: str) -> Resource:
+        return self._charge_transition(request, "UNRESOLVED", "RESOLVED")
+
+    def _create_checkout(self, request: httpx.Request, template: str) -> Resource:
+        body = self._json(request)
+        checkout = self._new_resource(
+            "checkouts",
+            {
+                "name": body.get("name"),
+                "description": body.get("description"),
+                "requested_info": body.get("requested_info", []),
+                "pricing_type": body.get("pricing_type", "no_price"),
+                "local_price": body.get("local_price"),
+            },
+            code=False,
+        )
+        return {"data": checkout}
+
+    def _update_checkout(self, request: httpx.Request, template: str) -> Resource:
+        checkout = self.find("checkouts", self._code(request))
+        body = self._json(request)
+        for key in ("name", "requested_info", "local_price"):
+            if key in body:
+                checkout[key] = body[key]
+        return {"data": checkout}
+
+    def _delete_checkout(self, request: httpx.Request, template: str) -> Resource:
+        checkout = self.find("checkouts", self._code(request))
+        self._remove("checkouts", checkout["id"])
+        return {}
+
+    def _create_invoice(self, request: httpx.Request, template: str) -> Resource:
+        body = self._json(request)
+        invoice = self._new_resource(
+            "invoices",
+            {
+                "status": "OPEN",
+                "business_name": body.get("business_name"),
+                "customer_name": body.get("customer_name"),
+                "customer_email": body.get("customer_email"),
+                "memo": body.get("memo"),
+                "local_price": body.get("local_price"),
+            },
+        )
+        invoice["updated_at"] = invoice["created_at"]
+        invoice["hosted_url"] = (
+            f"https://commerce.coinbase.com/invoices/{invoice['code']}"
+        )
+        self.add_event("invoice:created", invoice)
+        return {"data": invoice}
+
+    def _invoice_transition(
+        self, request: httpx.Request, sources: tuple[str, ...], target: str
+    ) -> Resource:
+        invoice = self.find("invoices", self._code(request))
+        if invoice["status"] not in sources:
+            raise SimulatedError(
+                400,
+                "invalid_request",
+                f"invoice is {invoice['status']}, it cannot become {target}",
+            )
+        return {"data": self.set_invoice_status(invoice["id"], target)}
+
+    def _void_invoice(self, request: httpx.Request, template: str) -> Resource:
+        return self._invoice_transition(request, ("OPEN", "VIEWED"), "VOID")
+
+    def _resolve_invoice(self, request: httpx.Request, template: str) -> Resource:
+        return self._invoice_transition(request, ("UNRESOLVED",), "RESOLVED")
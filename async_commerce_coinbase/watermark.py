@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import json
+import os
+import typing
+from abc import ABC, abstractmethod
+from pathlib import Path
+
+__all__ = ["WatermarkStore", "MemoryWatermarkStore", "FileWatermarkStore"]
+
+
+class WatermarkStore(ABC):
+    """Persists the id of the newest resource that has been fully processed."""
+
+    @abstractmethod
+    async def get(self, key: str) -> str | None:
+        raise NotImplementedError  # pragma: no cover
+
+    @abstractmethod
+    async def set(self, key: str, value: str) -> None:
+        raise NotImplementedError  # pragma: no cover
+
+
+class MemoryWatermarkStore(WatermarkStore):
+    def __init__(self) -> None:
+        self.watermarks: dict[str, str] = {}
+
+    async def get(self, key: str) -> str | None:
+        return self.watermarks.get(key)
+
+    async def set(self, key: str, value: str) -> None:
+        self.watermarks[key] = value
+
+
+class FileWatermarkStore(WatermarkStore):
+    """Keeps all watermarks in a single json file.
+
+    The file is rewritten atomically, so a crash never leaves a corrupt file.
+    """
+
+    def __init__(self, path: str | os.PathLike[str]) -> None:
+        self.path = Path(path)
+
+    def _load(self) -> dict[str, str]:
+        try:
+            return typing.cast(dict[str, str], json.loads(self.path.read_text()))
+        except FileNotFoundError:
+            return {}
+
+    async def get(self, key: str) -> str | None:
+        return self._load().get(key)
+
+    async def set(self, key: str, value: str) -> None:
+        watermarks = self._load()
+        watermarks[key] = value
+        temporary = self.path.with_name(f"{self.path.name}.tmp")
+        temporary.write_text(json.dumps(watermarks))
+        os.replace(temporary, self.path)
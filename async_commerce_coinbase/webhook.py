@@ -1,8 +1,13 @@
+from __future__ import annotations
+
+import hashlib
 import hmac
 import json
+import re
 import typing
 
 from .exceptions import SignatureVerificationError
+from .jsonlib import loads
 from .resources.charge import Charge, PartialCharge
 from .resources.invoice import Invoice
 
@@ -44,5 +49,149 @@ def verify_signature(
     mac = hmac.digest(secret, body, "sha256")
     if not hmac.compare_digest(mac, signature):
         raise SignatureVerificationError("signature mismatch")
-    data = json.loads(body)
+    data = loads(body)
     return typing.cast(Event, data["event"])
+
+
+# the separator in front of a member and its key, keys with escapes are rare
+# enough to fall back to a full decode
+_KEY = re.compile(r'[ \t\n\r]*[{,][ \t\n\r]*"([^"\\]*)"[ \t\n\r]*:[ \t\n\r]*')
+_scan_value: typing.Callable[[str, int], tuple[typing.Any, int]]
+_scan_value = json.JSONDecoder().scan_once  # type: ignore[attr-defined]
+_ENVELOPE_KEYS = frozenset(("id", "type", "created_at"))
+
+
+def _scan_envelope(text: str) -> dict[str, typing.Any] | None:
+    """Decode the event fields before ``data``, None if the layout is unusual.
+
+    Only the members in front of the wanted keys are decoded, the scan stops
+    as soon as ``id``, ``type`` and ``created_at`` are found.
+    """
+    index = 0
+    in_event = False
+    envelope: dict[str, typing.Any] = {}
+    try:
+        while (member := _KEY.match(text, index)) is not None:
+            key = member.group(1)
+            index = member.end()
+            if text[index] == "{":
+                # data, or an object in front of the event
+                if in_event or key != "event":
+                    return None
+                in_event = True
+                continue
+            value, index = _scan_value(text, index)
+            if in_event and key in _ENVELOPE_KEYS:
+                envelope[key] = value
+                if len(envelope) == len(_ENVELOPE_KEYS):
+                    return envelope
+    except (IndexError, StopIteration, ValueError):
+        # truncated or invalid json, the full decode reports it
+        pass
+    return None
+
+
+class LazyEvent:
+    """Event whose ``id``, ``type`` and ``created_at`` are read upfront.
+
+    The rest of the body, and mainly ``data``, is only decoded when `event` or
+    `data` is accessed, which is never needed for events that are ignored.
+    ``created_at`` is None when the event has none. A body that is not an
+    event with an ``id`` and a ``type`` raises `SignatureVerificationError`.
+    """
+
+    __slots__ = ("id", "type", "created_at", "_body", "_event")
+
+    id: str
+    type: EventType
+    created_at: str | None
+
+    def __init__(self, body: bytes | bytearray | memoryview) -> None:
+        self._body = body
+        self._event: Event | None = None
+        try:
+            envelope: typing.Any = _scan_envelope(str(body, "utf-8"))
+            if envelope is None:
+                envelope = self.event
+        except (KeyError, TypeError, ValueError) as e:
+            # ValueError covers invalid utf-8 and json
+            raise SignatureVerificationError("body is not an event") from e
+        if not isinstance(envelope, dict):
+            raise SignatureVerificationError("body is not an event")
+        if "id" not in envelope or "type" not in envelope:
+            raise SignatureVerificationError("event without an id or a type")
+        self.id = envelope["id"]
+        self.type = envelope["type"]
+        self.created_at = envelope.get("created_at")
+
+    def __repr__(self) -> str:
+        return f"LazyEvent(id={self.id!r}, type={self.type!r})"
+
+    @property
+    def event(self) -> Event:
+        if self._event is None:
+            self._event = typing.cast(Event, loads(self._body)["event"])
+        return self._event
+
+    @property
+    def data(self) -> Charge | PartialCharge | Invoice:
+        return self.event["data"]
+
+
+class WebhookVerifier:
+    """Verifies webhooks signed with any of ``secrets``.
+
+    The hmac key schedule of every secret is computed once and copied for
+    each body, and bodies may be any buffer (``bytes``, ``bytearray``,
+    ``memoryview``) without being copied. Passing the old and the new secret
+    allows rotating it without rejecting webhooks in the meantime.
+    """
+
+    def __init__(self, *secrets: str | bytes) -> None:
+        if not secrets:
+            raise ValueError("at least one secret is required")
+        self._macs = [
+            hmac.new(
+                secret.encode() if isinstance(secret, str) else secret,
+                digestmod=hashlib.sha256,
+            )
+            for secret in secrets
+        ]
+
+    def is_valid(
+        self, body: bytes | bytearray | memoryview, signature: bytes | str
+    ) -> bool:
+        if isinstance(signature, str):
+            try:
+                signature = bytes.fromhex(signature)
+            except ValueError:
+                return False
+
+        valid = False
+        for initial in self._macs:
+            mac = initial.copy()
+            mac.update(body)
+            # no early exit, every secret takes the same time to check
+            valid |= hmac.compare_digest(mac.digest(), signature)
+        return valid
+
+    def verify(
+        self, body: str | bytes | bytearray | memoryview, signature: str | bytes
+    ) -> Event:
+        """Return the event of ``body``, raise if its signature is invalid."""
+        if isinstance(body, str):
+            body = body.encode()
+        if not self.is_valid(body, signature):
+            raise SignatureVerificationError("signature mismatch")
+        data = loads(body)
+        return typing.cast(Event, data["event"])
+
+    def verify_lazy(
+        self, body: str | bytes | bytearray | memoryview, signature: str | bytes
+    ) -> LazyEvent:
+        """Like `verify`, but only decode the body as far as `LazyEvent` needs."""
+        if isinstance(body, str):
+            body = body.encode()
+        if not self.is_valid(body, signature):
+            raise SignatureVerificationError("signature mismatch")
+        return LazyEvent(body)
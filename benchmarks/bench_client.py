@@ -0,0 +1,69 @@
+"""Per call overhead of the client against an in-memory transport.
+
+`Coinbase.call` builds each request once, `Coinbase.request` rebuilds the
+request passed by the caller. The transport answers instantly, so the time is
+spent in the client and httpx only.
+
+Run with ``python -m benchmarks.bench_client``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+import typing
+
+import httpx
+
+from async_commerce_coinbase import Coinbase
+
+from .samples import charge
+
+CALLS = 5_000
+BODY = {"name": "The Sovereign Individual", "pricing_type": "no_price"}
+
+
+def mocked_coinbase() -> Coinbase:
+    content = json.dumps({"data": charge(0)}).encode()
+    headers = {"content-type": "application/json"}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, headers=headers, content=content)
+
+    client = httpx.AsyncClient(
+        base_url="https://coinbase.test", transport=httpx.MockTransport(handler)
+    )
+    return Coinbase("test", client=client)
+
+
+async def measure(call: typing.Callable[[], typing.Awaitable[typing.Any]]) -> float:
+    for _ in range(100):
+        await call()
+    start = time.perf_counter()
+    for _ in range(CALLS):
+        await call()
+    return (time.perf_counter() - start) / CALLS
+
+
+async def run() -> None:
+    coinbase = mocked_coinbase()
+    cases: dict[str, typing.Callable[[], typing.Awaitable[typing.Any]]] = {
+        "GET call": lambda: coinbase.call("GET", "/charges/CODE"),
+        "GET request": lambda: coinbase.request(httpx.Request("GET", "/charges/CODE")),
+        "POST call": lambda: coinbase.call("POST", "/charges", json=BODY),
+        "POST request": lambda: coinbase.request(
+            httpx.Request("POST", "/charges", json=BODY)
+        ),
+        "list page": lambda: coinbase.list_charges()._fetch_page(),
+    }
+    for name, call in cases.items():
+        print(f"{name:>12}: {await measure(call) * 1e6:7.1f} us/call")
+
+
+def main() -> None:
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
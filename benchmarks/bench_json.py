@@ -0,0 +1,30 @@
+"""Compare json backends decoding 100 item charge pages.
+
+Run with ``python -m benchmarks.bench_json``.
+"""
+
+from __future__ import annotations
+
+import json
+import timeit
+
+from async_commerce_coinbase import jsonlib
+
+from .samples import charge_page
+
+
+def main() -> None:
+    body = json.dumps(charge_page()).encode()
+    print(f"page size: {len(body)} bytes, selected backend: {jsonlib.BACKEND}")
+    for name in jsonlib.BACKENDS:
+        try:
+            _, loads, _ = jsonlib.select_backend([name])
+        except ValueError:
+            print(f"{name:>8}: not installed")
+            continue
+        number, total = timeit.Timer(lambda: loads(body)).autorange()
+        print(f"{name:>8}: {total / number * 1e6:9.1f} us/page")
+
+
+if __name__ == "__main__":
+    main()
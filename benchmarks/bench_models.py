@@ -0,0 +1,64 @@
+"""Compare memory use and decode speed of dicts, models and projections.
+
+Run with ``python -m benchmarks.bench_models``.
+"""
+
+from __future__ import annotations
+
+import json
+import timeit
+import tracemalloc
+import typing
+
+from async_commerce_coinbase import jsonlib, models
+
+from .samples import charge_page
+
+CHARGES = 10_000
+
+
+def measure(build: typing.Callable[[], typing.Any]) -> int:
+    tracemalloc.start()
+    retained = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del retained
+    return size
+
+
+def main() -> None:
+    pages = [
+        json.dumps(charge_page(start, 100)).encode() for start in range(0, CHARGES, 100)
+    ]
+
+    def as_dicts() -> list[typing.Any]:
+        return [charge for page in pages for charge in jsonlib.loads(page)["data"]]
+
+    def as_models() -> list[models.Charge]:
+        return [
+            models.Charge.from_dict(charge)
+            for page in pages
+            for charge in jsonlib.loads(page)["data"]
+        ]
+
+    def selected() -> list[dict[str, typing.Any]]:
+        fields = ("id", "code", "timeline")
+        return [
+            {field: charge[field] for field in fields}
+            for page in pages
+            for charge in jsonlib.loads(page)["data"]
+        ]
+
+    print(f"{CHARGES} charges, json backend: {jsonlib.BACKEND}")
+    builders = (("dict", as_dicts), ("models", as_models), ("select", selected))
+    for name, build in builders:
+        size = measure(build)
+        number, total = timeit.Timer(build).autorange()
+        print(
+            f"{name:>6}: {size / 2**20:7.1f} MiB retained, "
+            f"{total / number * 1e3 / (CHARGES / 100):6.2f} ms/page"
+        )
+
+
+if __name__ == "__main__":
+    main()
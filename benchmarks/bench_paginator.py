@@ -0,0 +1,83 @@
+"""Check that iterating, `all()` and `chunk()` scale linearly with the items.
+
+Pages hold ``PAGE_SIZE`` items, large enough that popping items from the
+front of a list or re-slicing chunks item by item would be quadratic per page.
+10x the items should take about 10x the time, quadratic behaviour would be
+closer to 100x. `tests/test_paginator.py` counts copied items instead, so the
+unit tests do not depend on timing.
+
+Run with ``python -m benchmarks.bench_paginator``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+import typing
+
+from async_commerce_coinbase.paginator import CoinbasePaginator
+
+PAGE_SIZE = 10_000
+SMALL = 100_000
+LARGE = 1_000_000
+
+
+class FakeCoinbase:
+    def __init__(self, total: int) -> None:
+        self.page = list(range(PAGE_SIZE))
+        self.pages = total // PAGE_SIZE
+        self.served = 0
+
+    async def call(self, *args: typing.Any, **kwargs: typing.Any) -> typing.Any:
+        self.served += 1
+        next_uri = None if self.served >= self.pages else "x"
+        return {
+            "pagination": {"next_uri": next_uri, "cursor": [None, "x"]},
+            "data": self.page,
+        }
+
+
+def paginator(total: int) -> CoinbasePaginator[int]:
+    return CoinbasePaginator(FakeCoinbase(total), "/test")  # type: ignore
+
+
+async def time_anext(total: int) -> float:
+    start = time.perf_counter()
+    count = 0
+    async for _ in paginator(total):
+        count += 1
+    assert count == total
+    return time.perf_counter() - start
+
+
+async def time_all(total: int) -> float:
+    start = time.perf_counter()
+    assert len(await paginator(total).all()) == total
+    return time.perf_counter() - start
+
+
+async def time_chunk(total: int) -> float:
+    start = time.perf_counter()
+    count = 0
+    async for chunk in paginator(total).chunk(1_000):
+        count += len(chunk)
+    assert count == total
+    return time.perf_counter() - start
+
+
+async def run() -> None:
+    for timer in (time_anext, time_all, time_chunk):
+        small = await timer(SMALL)
+        large = await timer(LARGE)
+        print(
+            f"{timer.__name__:>10}: {SMALL} items {small:7.3f}s, "
+            f"{LARGE} items {large:7.3f}s, ratio {large / small:5.1f}"
+        )
+
+
+def main() -> None:
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
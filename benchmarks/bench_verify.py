@@ -0,0 +1,61 @@
+"""Compare `verify_signature` with a `WebhookVerifier` created once.
+
+``verify_lazy`` only decodes the event envelope, its gain grows with the size
+of ``data``, so it is also measured on a charge with many payments.
+
+Run with ``python -m benchmarks.bench_verify``.
+"""
+
+from __future__ import annotations
+
+import hmac
+import json
+import timeit
+
+from async_commerce_coinbase import jsonlib
+from async_commerce_coinbase.webhook import (
+    LazyEvent,
+    WebhookVerifier,
+    verify_signature,
+)
+
+from .samples import webhook
+
+SECRET = "benchmark secret"
+
+
+def main() -> None:
+    body = json.dumps(webhook(0)).encode()
+    signature = hmac.digest(SECRET.encode(), body, "sha256").hex()
+    verifier = WebhookVerifier(SECRET)
+    rotating = WebhookVerifier("previous secret", SECRET)
+    view = memoryview(body)
+
+    print(f"body size: {len(body)} bytes")
+    for name, verify in [
+        ("verify_signature", lambda: verify_signature(body, signature, SECRET)),
+        ("WebhookVerifier", lambda: verifier.verify(body, signature)),
+        ("memoryview body", lambda: verifier.verify(view, signature)),
+        ("2 secrets", lambda: rotating.verify(body, signature)),
+        ("signature only", lambda: verifier.is_valid(body, signature)),
+        ("verify_lazy", lambda: verifier.verify_lazy(body, signature)),
+    ]:
+        number, total = timeit.Timer(verify).autorange()
+        print(f"{name:>16}: {number / total:9.0f} verifications/s")
+
+    payload = webhook(0)
+    payments = payload["event"]["data"]["payments"]
+    payload["event"]["data"]["payments"] = payments * 50
+    large = json.dumps(payload).encode()
+    print(f"body size: {len(large)} bytes, decoding only")
+    for name, decode in [
+        (f"{jsonlib.BACKEND} full", lambda: jsonlib.loads(large)["event"]),
+        ("lazy envelope", lambda: LazyEvent(large)),
+        ("lazy + data", lambda: LazyEvent(large).data),
+    ]:
+        number, total = timeit.Timer(decode).autorange()
+        print(f"{name:>16}: {number / total:9.0f} events/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Webhooks per second through `WebhookDispatcher` with a simulated handler.
+
+Every signed payload is verified, parsed, queued and handled by a handler
+awaiting ``HANDLER_LATENCY`` seconds, like a database write would.
+
+Run with ``python -m benchmarks.bench_webhook``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hmac
+import json
+import time
+
+from async_commerce_coinbase.dispatcher import WebhookDispatcher
+from async_commerce_coinbase.webhook import Event
+
+from .samples import webhook
+
+SECRET = b"benchmark secret"
+EVENTS = 5_000
+HANDLER_LATENCY = 0.001
+
+
+async def run(workers: int, payloads: list[tuple[bytes, str]]) -> float:
+    handled = 0
+
+    async def handler(event: Event) -> None:
+        nonlocal handled
+        await asyncio.sleep(HANDLER_LATENCY)
+        handled += 1
+
+    dispatcher = WebhookDispatcher(SECRET, workers=workers, queue_size=workers * 2)
+    dispatcher.add_handler(handler)
+    start = time.perf_counter()
+    async with dispatcher:
+        for body, signature in payloads:
+            await dispatcher.submit(body, signature)
+    elapsed = time.perf_counter() - start
+    assert handled == len(payloads)
+    return len(payloads) / elapsed
+
+
+def main() -> None:
+    payloads = []
+    for index in range(EVENTS):
+        body = json.dumps(webhook(index)).encode()
+        payloads.append((body, hmac.digest(SECRET, body, "sha256").hex()))
+
+    for workers in (1, 10, 100):
+        rate = asyncio.run(run(workers, payloads))
+        print(f"{workers:>4} workers: {rate:9.0f} events/s")
+
+
+if __name__ == "__main__":
+    main()
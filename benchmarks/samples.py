@@ -0,0 +1,101 @@
+"""Realistic payloads shared by the benchmarks."""
+
+from __future__ import annotations
+
+import typing
+
+
+def charge(index: int) -> dict[str, typing.Any]:
+    code = f"CODE{index:06d}"
+    money = {"amount": "10.00", "currency": "EUR"}
+    return {
+        "id": f"f765421f-2e4f-4c2d-8b7a-{index:012d}",
+        "resource": "charge",
+        "code": code,
+        "name": "The Sovereign Individual",
+        "description": "Mastering the Transition to the Information Age",
+        "logo_url": "https://commerce.coinbase.com/charges/logo.png",
+        "hosted_url": f"https://commerce.coinbase.com/charges/{code}",
+        "created_at": "2017-01-31T20:49:02Z",
+        "confirmed_at": "2017-01-31T20:50:02Z",
+        "expires_at": "2017-01-31T21:49:02Z",
+        "checkout": {"id": "a76721f2-1611-48fb-a513-1f2ee6e8d54e"},
+        "timeline": [
+            {"time": "2017-01-31T20:49:02Z", "status": "NEW"},
+            {"time": "2017-01-31T20:50:02Z", "status": "PENDING"},
+            {"time": "2017-01-31T20:50:02Z", "status": "COMPLETED"},
+        ],
+        "metadata": {"customer_id": f"id_{index}", "customer_name": "Satoshi"},
+        "pricing_type": "fixed_price",
+        "pricing": {
+            "local": money,
+            "bitcoin": {"amount": "0.00100000", "currency": "BTC"},
+            "ethereum": {"amount": "0.010000000", "currency": "ETH"},
+            "litecoin": {"amount": "0.10000000", "currency": "LTC"},
+            "usdc": {"amount": "10.000000", "currency": "USDC"},
+        },
+        "payment_threshold": {
+            "overpayment_absolute_threshold": money,
+            "overpayment_relative_threshold": 0.045,
+            "underpayment_absolute_threshold": money,
+            "underpayment_relative_threshold": 0.005,
+        },
+        "applied_threshold": money,
+        "applied_threshold_type": "absolute",
+        "payments": [
+            {
+                "network": "ethereum",
+                "transaction_id": f"0xe02fead885c3e4019945428ed54d094247bada2d0{index}",
+                "status": "CONFIRMED",
+                "value": {
+                    "local": money,
+                    "crypto": {"amount": "0.010000000", "currency": "ETH"},
+                },
+                "block": {
+                    "height": 100,
+                    "hash": "0xe02fead885c3e4019945428ed54d094247bada2d0ac41b",
+                    "confirmations_accumulated": 8,
+                    "confirmations_required": 2,
+                },
+            }
+        ],
+        "addresses": {
+            "bitcoin": "1000000000000000000000000000000000",
+            "ethereum": "0x0000000000000000000000000000000000000000",
+            "litecoin": "3000000000000000000000000000000000",
+            "usdc": "0x0000000000000000000000000000000000000000",
+        },
+    }
+
+
+def charge_page(start: int = 0, size: int = 100) -> dict[str, typing.Any]:
+    return {
+        "pagination": {
+            "order": "desc",
+            "starting_after": None,
+            "ending_before": None,
+            "total": size,
+            "yielded": size,
+            "limit": size,
+            "previous_uri": None,
+            "next_uri": None,
+            "cursor": [None, None],
+        },
+        "data": [charge(index) for index in range(start, start + size)],
+    }
+
+
+def webhook(index: int) -> dict[str, typing.Any]:
+    return {
+        "id": index,
+        "scheduled_for": "2017-01-31T20:50:02Z",
+        "attempt_number": 1,
+        "event": {
+            "id": f"24934862-d980-46cb-9402-{index:012d}",
+            "resource": "event",
+            "type": "charge:confirmed",
+            "api_version": "2018-03-22",
+            "created_at": "2017-01-31T20:50:02Z",
+            "data": charge(index),
+        },
+    }
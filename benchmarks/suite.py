@@ -0,0 +1,257 @@
+"""Benchmark suite of the client, paginator and webhook hot paths.
+
+Every case is timed ``--repeat`` times and the results are written as json,
+with the commit, python version and json backend they were measured with, so
+runs of two commits can be compared::
+
+    python -m benchmarks.suite --output before.json
+    git checkout feature
+    python -m benchmarks.suite --output after.json --compare before.json
+
+``--filter`` only runs the cases whose name contains one of its values. Like
+the other benchmarks, requests are answered by an in-memory transport, so the
+time is spent in the client, httpx and json decoding only.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import dataclasses
+import functools
+import hmac
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import timeit
+import typing
+
+import httpx
+
+from async_commerce_coinbase import Coinbase, jsonlib
+from async_commerce_coinbase.webhook import verify_signature
+
+from .bench_client import mocked_coinbase
+from .samples import charge, charge_page, webhook
+
+SECRET = "benchmark secret"
+PAGE_SIZE = 100
+HISTORY = 10_000
+CALLS = 200
+
+
+@dataclasses.dataclass
+class Case:
+    """A function timed as a whole, doing ``operations`` operations per run."""
+
+    name: str
+    run: typing.Callable[[], typing.Any]
+    operations: int = 1
+    unit: str = "op"
+
+
+class Result(typing.TypedDict):
+    unit: str
+    operations: int
+    runs: int
+    seconds_per_op: dict[str, float]
+    ops_per_second: float
+
+
+def in_loop(
+    loop: asyncio.AbstractEventLoop,
+    func: typing.Callable[[], typing.Coroutine[typing.Any, typing.Any, typing.Any]],
+) -> typing.Callable[[], typing.Any]:
+    return lambda: loop.run_until_complete(func())
+
+
+def history_client(total: int) -> Coinbase:
+    """A client listing ``total`` charges, ``PAGE_SIZE`` per page."""
+    data = jsonlib.dumps([charge(index) for index in range(PAGE_SIZE)])
+    pages = total // PAGE_SIZE
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        page = int(request.url.params.get("starting_after") or 0)
+        following = page + 1 if page + 1 < pages else None
+        pagination = {
+            "limit": PAGE_SIZE,
+            "next_uri": None if following is None else "/charges",
+            "cursor": [str(page), str(following)],
+        }
+        content = b'{"pagination":%s,"data":%s}' % (jsonlib.dumps(pagination), data)
+        return httpx.Response(
+            200, headers={"content-type": "application/json"}, content=content
+        )
+
+    client = httpx.AsyncClient(
+        base_url="https://coinbase.test", transport=httpx.MockTransport(handler)
+    )
+    return Coinbase("test", client=client)
+
+
+def client_cases(loop: asyncio.AbstractEventLoop) -> typing.Iterator[Case]:
+    coinbase = mocked_coinbase()
+
+    async def requests() -> None:
+        for _ in range(CALLS):
+            await coinbase.request(httpx.Request("GET", "/charges/CODE"))
+
+    async def calls() -> None:
+        for _ in range(CALLS):
+            await coinbase.call("GET", "/charges/CODE")
+
+    yield Case("client.request", in_loop(loop, requests), CALLS)
+    yield Case("client.call", in_loop(loop, calls), CALLS)
+
+
+def paginator_cases(loop: asyncio.AbstractEventLoop) -> typing.Iterator[Case]:
+    coinbase = history_client(HISTORY)
+
+    async def iterate() -> None:
+        async for _ in coinbase.list_charges():
+            pass
+
+    async def iterate_prefetch() -> None:
+        async for _ in coinbase.list_charges(prefetch=2):
+            pass
+
+    async def chunk() -> None:
+        async for _ in coinbase.list_charges().chunk(1_000):
+            pass
+
+    for name, iterator in [
+        ("paginator.iterate", iterate),
+        ("paginator.iterate_prefetch", iterate_prefetch),
+        ("paginator.chunk", chunk),
+    ]:
+        yield Case(name, in_loop(loop, iterator), HISTORY, "item")
+
+
+def decode_cases() -> typing.Iterator[Case]:
+    body = jsonlib.dumps(charge_page(0, PAGE_SIZE))
+    yield Case(f"decode.page.{jsonlib.BACKEND}", lambda: jsonlib.loads(body), 1, "page")
+    if jsonlib.BACKEND != "json":
+        yield Case("decode.page.json", lambda: json.loads(body), 1, "page")
+
+
+def webhook_cases() -> typing.Iterator[Case]:
+    for payments in (1, 10, 100):
+        payload = webhook(0)
+        payload["event"]["data"]["payments"] *= payments
+        body = jsonlib.dumps(payload)
+        signature = hmac.digest(SECRET.encode(), body, "sha256").hex()
+        yield Case(
+            f"webhook.verify_signature.{len(body) // 1024}KiB",
+            functools.partial(verify_signature, body, signature, SECRET),
+        )
+
+
+def cases(loop: asyncio.AbstractEventLoop) -> list[Case]:
+    return [
+        *client_cases(loop),
+        *paginator_cases(loop),
+        *decode_cases(),
+        *webhook_cases(),
+    ]
+
+
+def measure(case: Case, repeat: int) -> Result:
+    timer = timeit.Timer(case.run)
+    number, _ = timer.autorange()
+    times = [total / number / case.operations for total in timer.repeat(repeat, number)]
+    median = statistics.median(times)
+    return {
+        "unit": case.unit,
+        "operations": number * case.operations,
+        "runs": repeat,
+        "seconds_per_op": {"min": min(times), "median": median, "max": max(times)},
+        "ops_per_second": 1 / median,
+    }
+
+
+def metadata() -> dict[str, typing.Any]:
+    try:
+        commit: str | None = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "date": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "json_backend": jsonlib.BACKEND,
+        "httpx": httpx.__version__,
+    }
+
+
+def run(repeat: int = 5, filters: typing.Sequence[str] = ()) -> dict[str, typing.Any]:
+    """Measure the cases matching ``filters``, or all of them."""
+    loop = asyncio.new_event_loop()
+    try:
+        results: dict[str, Result] = {}
+        for case in cases(loop):
+            if not filters or any(value in case.name for value in filters):
+                results[case.name] = measure(case, repeat)
+    finally:
+        loop.close()
+    return {"metadata": metadata(), "results": results}
+
+
+def compare(
+    before: dict[str, typing.Any], after: dict[str, typing.Any]
+) -> dict[str, float]:
+    """Median time change per case present in both runs, 0.1 is 10% slower."""
+    return {
+        name: result["seconds_per_op"]["median"]
+        / before["results"][name]["seconds_per_op"]["median"]
+        - 1
+        for name, result in after["results"].items()
+        if name in before["results"]
+    }
+
+
+def report(
+    results: dict[str, typing.Any], changes: dict[str, float] | None = None
+) -> str:
+    lines = []
+    for name, result in results["results"].items():
+        line = (
+            f"{name:<34} {result['seconds_per_op']['median'] * 1e6:10.2f} "
+            f"us/{result['unit']:<4} {result['ops_per_second']:12.0f} "
+            f"{result['unit']}s/s"
+        )
+        if changes is not None and name in changes:
+            line += f" {changes[name]:+8.1%}"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def main(argv: typing.Sequence[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-o", "--output", help="write the results to this json file")
+    parser.add_argument("--compare", help="json file of a previous run")
+    parser.add_argument("--filter", action="append", default=[])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    results = run(args.repeat, args.filter)
+    changes = None
+    if args.compare:
+        with open(args.compare) as file:
+            before = json.load(file)
+        changes = compare(before, results)
+        print(f"compared to {before['metadata']['commit']}")
+    print(report(results, changes))
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+            file.write("\n")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -15,6 +15,7 @@ setup(
     author_email="git@leodev.xyz",
     description="async coinbase commerce api",
     install_requires=Path("requirements.txt").read_text().splitlines(),
+    extras_require={"http2": ["httpx[http2]"], "orjson": ["orjson"]},
     packages=find_namespace_packages(include=["async_commerce_coinbase*"]),
     package_data={"async_commerce_coinbase": ["py.typed"]},
 )
@@ -0,0 +1,39 @@
+import typing
+
+import httpx
+import pytest
+
+from async_commerce_coinbase import Coinbase
+
+Handler = typing.Callable[
+    [httpx.Request], httpx.Response | typing.Awaitable[httpx.Response]
+]
+
+
+class MockCoinbase:
+    """Builds clients whose requests are answered by a sync or async handler.
+
+    Every request sent by any of them is appended to ``requests``.
+    """
+
+    def __init__(self) -> None:
+        self.requests: list[httpx.Request] = []
+
+    def __call__(self, handler: Handler, **options: typing.Any) -> Coinbase:
+        async def handle(request: httpx.Request) -> httpx.Response:
+            self.requests.append(request)
+            response = handler(request)
+            if isinstance(response, httpx.Response):
+                return response
+            return await response
+
+        client = httpx.AsyncClient(
+            base_url="https://coinbase.test",
+            transport=httpx.MockTransport(handle),  # type: ignore[arg-type]
+        )
+        return Coinbase("test", client=client, **options)
+
+
+@pytest.fixture
+def mock_coinbase() -> MockCoinbase:
+    return MockCoinbase()
@@ -1,8 +1,6 @@
-import json
 import typing
 from unittest import mock
 
-import httpx
 import pytest
 
 from async_commerce_coinbase import Coinbase
@@ -12,8 +10,8 @@ from async_commerce_coinbase.resources.types import Money
 @pytest.fixture
 def coinbase() -> Coinbase:
     coinbase = Coinbase("test")
-    coinbase.request = mock.AsyncMock()  # type: ignore
-    coinbase.request.return_value = {"data": {"resource": "charge"}}
+    coinbase.call = mock.AsyncMock()  # type: ignore
+    coinbase.call.return_value = {"data": {"resource": "charge"}}
     return coinbase
 
 
@@ -37,12 +35,10 @@ async def test_create_charge(coinbase: Coinbase) -> None:
         },
     )
     assert (await coinbase.create_charge(**data))["resource"] == "charge"
-    request = typing.cast(
-        httpx.Request, coinbase.request.await_args.args[0]  # type: ignore
-    )
-    assert request.method == "POST"
-    assert request.url == "/charges"
-    assert json.loads(request.content) == data
+    method, path = coinbase.call.await_args.args  # type: ignore
+    assert method == "POST"
+    assert path == "/charges"
+    assert coinbase.call.await_args.kwargs["json"] == data  # type: ignore
 
 
 class CreateChargeArguments(typing.TypedDict):
@@ -58,28 +54,34 @@ class CreateChargeArguments(typing.TypedDict):
 @pytest.mark.asyncio
 async def test_get_charge(coinbase: Coinbase) -> None:
     assert (await coinbase.get_charge("test"))["resource"] == "charge"
-    request = typing.cast(
-        httpx.Request, coinbase.request.await_args.args[0]  # type: ignore
-    )
-    assert request.method == "GET"
-    assert request.url == "/charges/test"
+    method, path = coinbase.call.await_args.args  # type: ignore
+    assert method == "GET"
+    assert path == "/charges/test"
 
 
 @pytest.mark.asyncio
 async def test_cancel_charge(coinbase: Coinbase) -> None:
     assert (await coinbase.cancel_charge("test"))["resource"] == "charge"
-    request = typing.cast(
-        httpx.Request, coinbase.request.await_args.args[0]  # type: ignore
-    )
-    assert request.method == "POST"
-    assert request.url == "/charges/test/cancel"
+    method, path = coinbase.call.await_args.args  # type: ignore
+    assert method == "POST"
+    assert path == "/charges/test/cancel"
 
 
 @pytest.mark.asyncio
 async def test_resolve_charge(coinbase: Coinbase) -> None:
     assert (await coinbase.resolve_charge("test"))["resource"] == "charge"
-    request = typing.cast(
-        httpx.Request, coinbase.request.await_args.args[0]  # type: ignore
-    )
-    assert request.method == "POST"
-    assert request.url == "/charges/test/resolve"
+    method, path = coinbase.call.await_args.args  # type: ignore
+    assert method == "POST"
+    assert path == "/charges/test/resolve"
+
+
+@pytest.mark.asyncio
+async def test_get_charges(coinbase: Coinbase) -> None:
+    results = await coinbase.get_charges(["a", "../b", "c"], concurrency=2)
+    assert [
+        "error" if isinstance(result, Exception) else result["resource"]
+        for result in results
+    ] == ["charge", "error", "charge"]
+    assert isinstance(results[1], ValueError)
+    urls = [call.args[1] for call in coinbase.call.await_args_list]  # type: ignore
+    assert sorted(urls) == ["/charges/a", "/charges/c"]
@@ -1,8 +1,6 @@
-import json
 import typing
 from unittest import mock
 
-import httpx
 import pytest
 
 from async_commerce_coinbase import Coinbase
@@ -12,8 +10,8 @@ from async_commerce_coinbase.resources.types import Money
 @pytest.fixture
 def coinbase() -> Coinbase:
     coinbase = Coinbase("test")
-    coinbase.request = mock.AsyncMock()  # type: ignore
-    coinbase.request.return_value = {"data": {"resource": "checkout"}}
+    coinbase.call = mock.AsyncMock()  # type: ignore
+    coinbase.call.return_value = {"data": {"resource": "checkout"}}
     return coinbase
 
 
@@ -35,12 +33,10 @@ async def test_create_checkout(coinbase: Coinbase) -> None:
         },
     )
     assert (await coinbase.create_checkout(**data))["resource"] == "checkout"
-    request = typing.cast(
-        httpx.Request, coinbase.request.await_args.args[0]  # type: ignore
-    )
-    assert request.method == "POST"
-    assert request.url == "/checkouts"
-    assert json.loads(request.content) == data
+    method, path = coinbase.call.await_args.args  # type: ignore
+    assert method == "POST"
+    assert path == "/checkouts"
+    assert coinbase.call.await_args.kwargs["json"] == data  # type: ignore
 
 
 class CreateCheckoutArguments(typing.TypedDict):
@@ -54,11 +50,9 @@ class CreateCheckoutArguments(typing.TypedDict):
 @pytest.mark.asyncio
 async def test_get_checkout(coinbase: Coinbase) -> None:
     assert (await coinbase.get_checkout("test"))["resource"] == "checkout"
-    request = typing.cast(
-        httpx.Request, coinbase.request.await_args.args[0]  # type: ignore
-    )
-    assert request.method == "GET"
-    assert request.url == "/checkouts/test"
+    method, path = coinbase.call.await_args.args  # type: ignore
+    assert method == "GET"
+    assert path == "/checkouts/test"
 
 
 @pytest.mark.asyncio
@@ -71,11 +65,9 @@ async def test_update_checkout(coinbase: Coinbase) -> None:
             local_price={"amount": 1337, "currency": "TST2"},
         )
     )["resource"] == "checkout"
-    request = typing.cast(
-        httpx.Request, coinbase.request.await_args.args[0]  # type: ignore
-    )
-    assert request.method == "PUT"
-    assert request.url == "/checkouts/test"
+    method, path = coinbase.call.await_args.args  # type: ignore
+    assert method == "PUT"
+    assert path == "/checkouts/test"
 
 
 @pytest.mark.asyncio
@@ -87,8 +79,15 @@ async def test_update_checkout_without_arguments(coinbase: Coinbase) -> None:
 @pytest.mark.asyncio
 async def test_delete_checkout(coinbase: Coinbase) -> None:
     assert await coinbase.delete_checkout("test") is None  # type: ignore
-    request = typing.cast(
-        httpx.Request, coinbase.request.await_args.args[0]  # type: ignore
-    )
-    assert request.method == "DELETE"
-    assert request.url == "/checkouts/test"
+    method, path = coinbase.call.await_args.args  # type: ignore
+    assert method == "DELETE"
+    assert path == "/checkouts/test"
+
+
+@pytest.mark.asyncio
+async def test_get_checkouts(coinbase: Coinbase) -> None:
+    results = await coinbase.get_checkouts(["a", "b"])
+    assert [
+        None if isinstance(result, Exception) else result["resource"]
+        for result in results
+    ] == ["checkout", "checkout"]
@@ -1,17 +1,16 @@
-import typing
 from unittest import mock
 
-import httpx
 import pytest
 
 from async_commerce_coinbase import Coinbase
+from async_commerce_coinbase.watermark import MemoryWatermarkStore
 
 
 @pytest.fixture
 def coinbase() -> Coinbase:
     coinbase = Coinbase("test")
-    coinbase.request = mock.AsyncMock()  # type: ignore
-    coinbase.request.return_value = {"data": {"resource": "event"}}
+    coinbase.call = mock.AsyncMock()  # type: ignore
+    coinbase.call.return_value = {"data": {"resource": "event"}}
     return coinbase
 
 
@@ -23,8 +22,59 @@ def test_list_events(coinbase: Coinbase) -> None:
 @pytest.mark.asyncio
 async def test_get_event(coinbase: Coinbase) -> None:
     assert (await coinbase.get_event("test"))["resource"] == "event"
-    request = typing.cast(
-        httpx.Request, coinbase.request.await_args.args[0]  # type: ignore
-    )
-    assert request.method == "GET"
-    assert request.url == "/events/test"
+    method, path = coinbase.call.await_args.args  # type: ignore
+    assert method == "GET"
+    assert path == "/events/test"
+
+
+@pytest.mark.asyncio
+async def test_sync_events(coinbase: Coinbase) -> None:
+    coinbase.call.side_effect = [  # type: ignore
+        {
+            "pagination": {"next_uri": "x", "cursor": ["a", "b"]},
+            "data": [{"id": "a"}, {"id": "b"}],
+        },
+        {"pagination": {"next_uri": None}, "data": [{"id": "c"}]},
+        {"pagination": {"next_uri": None}, "data": []},
+    ]
+    store = MemoryWatermarkStore()
+
+    assert [event["id"] async for event in coinbase.sync_events(store)] == [
+        "a",
+        "b",
+        "c",
+    ]
+    assert await store.get("events") == "c"
+    first = coinbase.call.await_args_list[0]  # type: ignore
+    assert first.args == ("GET", "/events")
+    assert first.kwargs["params"]["order"] == "asc"
+    assert first.kwargs["params"]["starting_after"] is None
+
+    assert [event async for event in coinbase.sync_events(store)] == []
+    assert await store.get("events") == "c"
+    params = coinbase.call.await_args.kwargs["params"]  # type: ignore
+    assert params["starting_after"] == "c"
+
+
+@pytest.mark.asyncio
+async def test_sync_events_interrupted(coinbase: Coinbase) -> None:
+    coinbase.call.return_value = {  # type: ignore
+        "pagination": {"next_uri": None},
+        "data": [{"id": "a"}, {"id": "b"}],
+    }
+    store = MemoryWatermarkStore()
+    await store.set("events", "start")
+
+    async for event in coinbase.sync_events(store):
+        break
+
+    assert await store.get("events") == "start"
+
+
+@pytest.mark.asyncio
+async def test_get_events(coinbase: Coinbase) -> None:
+    results = await coinbase.get_events(["a", "b"])
+    assert [
+        None if isinstance(result, Exception) else result["resource"]
+        for result in results
+    ] == ["event", "event"]
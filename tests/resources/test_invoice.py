@@ -1,8 +1,6 @@
-import json
 import typing
 from unittest import mock
 
-import httpx
 import pytest
 
 from async_commerce_coinbase import Coinbase
@@ -12,8 +10,8 @@ from async_commerce_coinbase.resources.types import Money
 @pytest.fixture
 def coinbase() -> Coinbase:
     coinbase = Coinbase("test")
-    coinbase.request = mock.AsyncMock()  # type: ignore
-    coinbase.request.return_value = {"data": {"resource": "invoice"}}
+    coinbase.call = mock.AsyncMock()  # type: ignore
+    coinbase.call.return_value = {"data": {"resource": "invoice"}}
     return coinbase
 
 
@@ -35,12 +33,10 @@ async def test_create_invoice(coinbase: Coinbase) -> None:
         },
     )
     assert (await coinbase.create_invoice(**data))["resource"] == "invoice"
-    request = typing.cast(
-        httpx.Request, coinbase.request.await_args.args[0]  # type: ignore
-    )
-    assert request.method == "POST"
-    assert request.url == "/invoices"
-    assert json.loads(request.content) == data
+    method, path = coinbase.call.await_args.args  # type: ignore
+    assert method == "POST"
+    assert path == "/invoices"
+    assert coinbase.call.await_args.kwargs["json"] == data  # type: ignore
 
 
 class CreateInvoiceArguments(typing.TypedDict):
@@ -54,28 +50,31 @@ class CreateInvoiceArguments(typing.TypedDict):
 @pytest.mark.asyncio
 async def test_get_invoice(coinbase: Coinbase) -> None:
     assert (await coinbase.get_invoice("test"))["resource"] == "invoice"
-    request = typing.cast(
-        httpx.Request, coinbase.request.await_args.args[0]  # type: ignore
-    )
-    assert request.method == "GET"
-    assert request.url == "/invoices/test"
+    method, path = coinbase.call.await_args.args  # type: ignore
+    assert method == "GET"
+    assert path == "/invoices/test"
 
 
 @pytest.mark.asyncio
 async def test_void_invoice(coinbase: Coinbase) -> None:
     assert (await coinbase.void_invoice("test"))["resource"] == "invoice"
-    request = typing.cast(
-        httpx.Request, coinbase.request.await_args.args[0]  # type: ignore
-    )
-    assert request.method == "PUT"
-    assert request.url == "/invoices/test/void"
+    method, path = coinbase.call.await_args.args  # type: ignore
+    assert method == "PUT"
+    assert path == "/invoices/test/void"
 
 
 @pytest.mark.asyncio
 async def test_resolve_invoice(coinbase: Coinbase) -> None:
     assert (await coinbase.resolve_invoice("test"))["resource"] == "invoice"
-    request = typing.cast(
-        httpx.Request, coinbase.request.await_args.args[0]  # type: ignore
-    )
-    assert request.method == "PUT"
-    assert request.url == "/invoices/test/resolve"
+    method, path = coinbase.call.await_args.args  # type: ignore
+    assert method == "PUT"
+    assert path == "/invoices/test/resolve"
+
+
+@pytest.mark.asyncio
+async def test_get_invoices(coinbase: Coinbase) -> None:
+    results = await coinbase.get_invoices(["a", "b"])
+    assert [
+        None if isinstance(result, Exception) else result["resource"]
+        for result in results
+    ] == ["invoice", "invoice"]
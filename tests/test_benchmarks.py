@@ -0,0 +1,83 @@
+import asyncio
+import json
+import pathlib
+import typing
+
+import pytest
+
+from benchmarks import suite
+
+
+def fake_measure(case: suite.Case, repeat: int) -> suite.Result:
+    seconds = 1e-6 * len(case.name)
+    return {
+        "unit": case.unit,
+        "operations": case.operations,
+        "runs": repeat,
+        "seconds_per_op": {"min": seconds, "median": seconds, "max": seconds},
+        "ops_per_second": 1 / seconds,
+    }
+
+
+def test_measure(monkeypatch: pytest.MonkeyPatch) -> None:
+    class Timer:
+        def __init__(self, run: typing.Callable[[], typing.Any]) -> None:
+            pass
+
+        def autorange(self) -> tuple[int, float]:
+            return 10, 0.2
+
+        def repeat(self, repeat: int, number: int) -> list[float]:
+            return [0.4, 0.2, 0.3][:repeat]
+
+    monkeypatch.setattr("timeit.Timer", Timer)
+    result = suite.measure(suite.Case("case", lambda: None, 2, "item"), 3)
+    assert result["unit"] == "item"
+    assert (result["operations"], result["runs"]) == (20, 3)
+    assert result["seconds_per_op"] == pytest.approx(
+        {"min": 0.01, "median": 0.015, "max": 0.02}
+    )
+    assert result["ops_per_second"] == pytest.approx(1 / 0.015)
+
+
+def test_suite(
+    tmp_path: pathlib.Path,
+    capsys: pytest.CaptureFixture[str],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(suite, "measure", fake_measure)
+    before = suite.run(repeat=2, filters=["decode.page.json", "verify"])
+    assert before["metadata"]["python"]
+    assert list(before["results"]) == [
+        "decode.page.json",
+        "webhook.verify_signature.2KiB",
+        "webhook.verify_signature.5KiB",
+        "webhook.verify_signature.36KiB",
+    ]
+    result = before["results"]["decode.page.json"]
+    assert result["runs"] == 2
+    assert result["unit"] == "page"
+
+    path = tmp_path / "before.json"
+    path.write_text(json.dumps(before))
+    output = tmp_path / "after.json"
+    suite.main(
+        ["--repeat", "1", "--filter", "json", "--compare", str(path), "-o", str(output)]
+    )
+    after = json.loads(output.read_text())
+    backend = after["metadata"]["json_backend"]
+    assert set(after["results"]) == {"decode.page.json", f"decode.page.{backend}"}
+    changes = suite.compare(before, after)
+    assert changes == {"decode.page.json": 0.0}
+    assert "+0.0%" in capsys.readouterr().out
+
+
+def test_cases_run() -> None:
+    # every case runs once, untimed, paginator ones list 10k items
+    loop = asyncio.new_event_loop()
+    try:
+        for case in suite.cases(loop):
+            if not case.name.startswith("paginator."):
+                case.run()
+    finally:
+        loop.close()
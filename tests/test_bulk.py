@@ -0,0 +1,62 @@
+import asyncio
+
+import pytest
+
+from async_commerce_coinbase.bulk import fetch_as_completed, fetch_many
+
+
+class Fetcher:
+    def __init__(self) -> None:
+        self.running = 0
+        self.max_running = 0
+
+    async def __call__(self, key: int) -> int:
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            await asyncio.sleep(0.001 * (key % 3))
+        finally:
+            self.running -= 1
+        if key == 7:
+            raise ValueError("test error")
+        return key * 2
+
+
+@pytest.mark.asyncio
+async def test_fetch_many() -> None:
+    fetch = Fetcher()
+    results = await fetch_many(fetch, range(20), concurrency=4)
+
+    assert fetch.max_running == 4
+    assert results[:7] == [0, 2, 4, 6, 8, 10, 12]
+    assert isinstance(results[7], ValueError)
+    assert results[8:] == [key * 2 for key in range(8, 20)]
+
+
+@pytest.mark.asyncio
+async def test_fetch_as_completed() -> None:
+    fetch = Fetcher()
+    results = [
+        item async for item in fetch_as_completed(fetch, range(20), concurrency=4)
+    ]
+
+    assert fetch.max_running == 4
+    assert sorted(key for key, _ in results) == list(range(20))
+    assert {key: result for key, result in results if key != 7} == {
+        key: key * 2 for key in range(20) if key != 7
+    }
+
+
+@pytest.mark.asyncio
+async def test_fetch_as_completed_early_exit() -> None:
+    fetch = Fetcher()
+    async for _ in fetch_as_completed(fetch, range(20), concurrency=4):
+        break
+    await asyncio.sleep(0.01)
+    assert fetch.running == 0
+
+
+@pytest.mark.asyncio
+async def test_invalid_concurrency() -> None:
+    with pytest.raises(ValueError):
+        await fetch_many(Fetcher(), range(20), concurrency=0)
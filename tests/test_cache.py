@@ -0,0 +1,135 @@
+import asyncio
+import time
+from unittest import mock
+
+import httpx
+import pytest
+
+from async_commerce_coinbase import Coinbase
+from async_commerce_coinbase.cache import TTLCache
+from tests.conftest import MockCoinbase
+
+
+def test_ttl_cache() -> None:
+    cache: TTLCache[int] = TTLCache(maxsize=2, ttl=60)
+    assert cache.get("a") is None
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)  # evicts b, a was used more recently
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+    assert len(cache) == 2
+    assert (cache.hits, cache.misses) == (2, 2)
+
+    cache.invalidate("a")
+    assert cache.get("a") is None
+    cache.clear()
+    assert len(cache) == 0
+
+
+def test_ttl_cache_expiry() -> None:
+    cache: TTLCache[int] = TTLCache(ttl=10)
+    cache.set("a", 1)
+    with mock.patch("time.monotonic", return_value=time.monotonic() + 11):
+        assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_ttl_cache_generation() -> None:
+    cache: TTLCache[int] = TTLCache(maxsize=2)
+    generation = cache.generation("a")
+    cache.invalidate("a")
+    cache.set("a", 1, generation=generation)
+    assert cache.get("a") is None
+    cache.set("a", 1, generation=cache.generation("a"))
+    assert cache.get("a") == 1
+
+    # invalidations of forgotten keys still count
+    generation = cache.generation("b")
+    cache.invalidate("b")
+    cache.invalidate("c")
+    cache.invalidate("d")
+    cache.set("b", 2, generation=generation)
+    assert cache.get("b") is None
+    generation = cache.generation("e")
+    cache.clear()
+    cache.set("e", 3, generation=generation)
+    assert len(cache) == 0
+
+
+def test_ttl_cache_invalid() -> None:
+    with pytest.raises(ValueError):
+        TTLCache(maxsize=0)
+
+
+def handler(request: httpx.Request) -> httpx.Response:
+    data = {"id": "ID", "code": "CODE", "resource": "charge"}
+    if request.url.path == "/charges":
+        return httpx.Response(
+            200, json={"pagination": {"next_uri": None}, "data": [data]}
+        )
+    return httpx.Response(200, json={"data": data})
+
+
+def cached_coinbase(mock_coinbase: MockCoinbase) -> Coinbase:
+    return mock_coinbase(
+        handler,
+        cache={"/charges": TTLCache(ttl=60), "/checkouts": TTLCache(ttl=60)},
+    )
+
+
+@pytest.mark.asyncio
+async def test_cached_lookup(mock_coinbase: MockCoinbase) -> None:
+    coinbase = cached_coinbase(mock_coinbase)
+    first = await coinbase.get_charge("CODE")
+    second = await coinbase.get_charge("CODE")
+    assert first == second
+    assert first is not second
+    assert len(mock_coinbase.requests) == 1
+    assert coinbase.cache["/charges"].hits == 1
+
+    await coinbase.list_charges().all()
+    await coinbase.list_charges().all()
+    assert len(mock_coinbase.requests) == 3
+
+
+@pytest.mark.asyncio
+async def test_cache_invalidation(mock_coinbase: MockCoinbase) -> None:
+    coinbase = cached_coinbase(mock_coinbase)
+    await coinbase.get_charge("CODE")
+    await coinbase.get_charge("ID")
+    # cancelled through the code, but the response invalidates the id too
+    await coinbase.cancel_charge("CODE")
+    await coinbase.get_charge("CODE")
+    await coinbase.get_charge("ID")
+    assert len(mock_coinbase.requests) == 5
+
+    await coinbase.get_checkout("ID")
+    await coinbase.delete_checkout("ID")
+    await coinbase.get_checkout("ID")
+    assert len(mock_coinbase.requests) == 8
+
+
+@pytest.mark.asyncio
+async def test_write_during_lookup(mock_coinbase: MockCoinbase) -> None:
+    started, responded = asyncio.Event(), asyncio.Event()
+    requests = mock_coinbase.requests
+
+    async def lookup_handler(request: httpx.Request) -> httpx.Response:
+        name = "before" if len(requests) == 1 else "after"
+        if len(requests) == 1:
+            started.set()
+            await responded.wait()
+        data = {"id": "ID", "code": "CODE", "name": name}
+        return httpx.Response(200, json={"data": data})
+
+    coinbase = mock_coinbase(lookup_handler, cache={"/charges": TTLCache()})
+    lookup = asyncio.create_task(coinbase.get_charge("CODE"))
+    await started.wait()
+    await coinbase.cancel_charge("CODE")
+    responded.set()
+    # read before the cancel, returned but not cached
+    assert (await lookup)["name"] == "before"
+    assert (await coinbase.get_charge("CODE"))["name"] == "after"
+    assert len(requests) == 3
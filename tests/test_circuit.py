@@ -0,0 +1,194 @@
+import asyncio
+import typing
+
+import httpx
+import pytest
+
+from async_commerce_coinbase import (
+    CircuitBreaker,
+    CircuitOpenError,
+    Coinbase,
+    CoinbaseHTTPError,
+    CoinbaseHTTPStatusError,
+    RetryPolicy,
+)
+from async_commerce_coinbase.instrumentation import MetricsCollector
+from tests.conftest import MockCoinbase
+
+
+def circuit_coinbase(
+    mock_coinbase: MockCoinbase, breaker: CircuitBreaker, **options: typing.Any
+) -> tuple[Coinbase, list[int | Exception]]:
+    # status or exception of the following responses, then 200s
+    outcomes: list[int | Exception] = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/charges/SLOW":
+            await asyncio.sleep(0.05)
+        outcome = outcomes.pop(0) if outcomes else 200
+        if isinstance(outcome, Exception):
+            raise outcome
+        return httpx.Response(outcome, json={"data": {"code": "ABCD"}})
+
+    coinbase = mock_coinbase(handler, circuit_breaker=breaker, **options)
+    return coinbase, outcomes
+
+
+@pytest.mark.asyncio
+async def test_circuit_opens_and_recovers(mock_coinbase: MockCoinbase) -> None:
+    metrics = MetricsCollector()
+    breaker = CircuitBreaker(failure_threshold=3, recovery_time=0.05)
+    coinbase, outcomes = circuit_coinbase(
+        mock_coinbase, breaker, instrumentation=metrics
+    )
+
+    outcomes.extend([500, httpx.ReadTimeout("timeout"), 503])
+    for _ in range(3):
+        with pytest.raises(httpx.HTTPError):
+            await coinbase.get_charge("ABCD")
+    assert breaker.state("/charges") == "open"
+
+    try:
+        await coinbase.list_charges().all()
+    except CircuitOpenError as error:
+        assert isinstance(error, CoinbaseHTTPError)
+        assert error.group == "/charges"
+        assert 0 < error.retry_after <= 0.05
+    else:
+        raise AssertionError("the circuit is not open")
+    assert len(mock_coinbase.requests) == 3
+    # other endpoint groups are not affected
+    await coinbase.get_checkout("ABCD")
+
+    await asyncio.sleep(0.06)
+    assert breaker.state("/charges") == "half_open"
+    await coinbase.get_charge("ABCD")
+    assert breaker.state("/charges") == "closed"
+    assert metrics.circuit_changes == {
+        ("/charges", "open"): 1,
+        ("/charges", "half_open"): 1,
+        ("/charges", "closed"): 1,
+    }
+    assert metrics.errors["GET", "/charges", "CircuitOpenError"] == 1
+    text = metrics.to_prometheus()
+    assert 'coinbase_circuit_state{group="/charges",state="closed"} 1' in text
+    assert 'coinbase_circuit_state{group="/charges",state="open"} 0' in text
+
+
+@pytest.mark.asyncio
+async def test_failed_probe_reopens(mock_coinbase: MockCoinbase) -> None:
+    breaker = CircuitBreaker(failure_threshold=1, recovery_time=0.05)
+    coinbase, outcomes = circuit_coinbase(mock_coinbase, breaker)
+
+    outcomes.append(502)
+    with pytest.raises(CoinbaseHTTPStatusError):
+        await coinbase.get_charge("ABCD")
+    await asyncio.sleep(0.06)
+
+    outcomes.append(httpx.ConnectError("down"))
+    with pytest.raises(httpx.ConnectError):
+        await coinbase.get_charge("ABCD")
+    assert breaker.state("/charges") == "open"
+    with pytest.raises(CircuitOpenError):
+        await coinbase.get_charge("ABCD")
+    assert len(mock_coinbase.requests) == 2
+
+
+@pytest.mark.asyncio
+async def test_single_probe(mock_coinbase: MockCoinbase) -> None:
+    breaker = CircuitBreaker(failure_threshold=1, recovery_time=0)
+    coinbase, outcomes = circuit_coinbase(mock_coinbase, breaker)
+    outcomes.append(500)
+    with pytest.raises(CoinbaseHTTPStatusError):
+        await coinbase.get_charge("ABCD")
+
+    results = await asyncio.gather(
+        coinbase.get_charge("SLOW"),
+        coinbase.get_charge("ABCD"),
+        return_exceptions=True,
+    )
+    assert not isinstance(results[0], BaseException)
+    assert results[0]["code"] == "ABCD"
+    assert isinstance(results[1], CircuitOpenError)
+    assert breaker.state("/charges") == "closed"
+
+    # a cancelled probe lets the next request probe again
+    outcomes.append(500)
+    with pytest.raises(CoinbaseHTTPStatusError):
+        await coinbase.get_charge("ABCD")
+    task = asyncio.create_task(coinbase.get_charge("SLOW"))
+    await asyncio.sleep(0.01)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    await coinbase.get_charge("ABCD")
+    assert breaker.state("/charges") == "closed"
+
+
+@pytest.mark.asyncio
+async def test_thresholds_and_status_codes(mock_coinbase: MockCoinbase) -> None:
+    breaker = CircuitBreaker(failure_threshold=2, thresholds={"/invoices": 1})
+    coinbase, outcomes = circuit_coinbase(mock_coinbase, breaker)
+
+    outcomes.extend([500, 200, 500, 404, 429])
+    for code in ("A", "B", "C", "D", "E"):
+        try:
+            await coinbase.get_charge(code)
+        except CoinbaseHTTPStatusError:
+            pass
+    # failures must be consecutive, client errors do not count
+    assert breaker.state("/charges") == "closed"
+
+    outcomes.append(500)
+    with pytest.raises(CoinbaseHTTPStatusError):
+        await coinbase.get_invoice("ABCD")
+    assert breaker.state("/invoices") == "open"
+
+    with pytest.raises(ValueError):
+        CircuitBreaker(failure_threshold=0)
+
+
+@pytest.mark.asyncio
+async def test_retries_fail_fast(mock_coinbase: MockCoinbase) -> None:
+    breaker = CircuitBreaker(failure_threshold=2)
+    retry = RetryPolicy(max_attempts=5, backoff=0)
+    coinbase, outcomes = circuit_coinbase(mock_coinbase, breaker, retry=retry)
+
+    outcomes.extend([503] * 5)
+    with pytest.raises(CircuitOpenError):
+        await coinbase.get_charge("ABCD")
+    assert len(mock_coinbase.requests) == 2
+
+
+def test_stale_release_keeps_the_probe() -> None:
+    breaker = CircuitBreaker(failure_threshold=1, recovery_time=0)
+    slow, _ = breaker.acquire("/charges")
+    failing, _ = breaker.acquire("/charges")
+    assert breaker.record(failing, failed=True) == "open"
+    probe, changed = breaker.acquire("/charges")
+    assert probe.probe and changed == "half_open"
+
+    # cancelling a request sent before the circuit opened
+    breaker.release(slow)
+    with pytest.raises(CircuitOpenError, match="waiting for its probe"):
+        breaker.acquire("/charges")
+    assert breaker.record(probe, failed=False) == "closed"
+
+
+def test_stale_outcomes_ignored() -> None:
+    breaker = CircuitBreaker(failure_threshold=1, recovery_time=0)
+    slow, _ = breaker.acquire("/charges")
+    other, _ = breaker.acquire("/charges")
+    failing, _ = breaker.acquire("/charges")
+    assert breaker.record(failing, failed=True) == "open"
+    probe, _ = breaker.acquire("/charges")
+
+    # late outcomes of requests sent before the circuit opened
+    assert breaker.record(slow, failed=False) is None
+    assert breaker.record(other, failed=True) is None
+    assert breaker.state("/charges") == "half_open"
+    assert breaker.record(probe, failed=True) == "open"
+    # a probe that already reported cannot change the circuit again
+    breaker.release(probe)
+    assert breaker.record(probe, failed=False) is None
+    assert breaker.state("/charges") == "half_open"
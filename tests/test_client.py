@@ -1,3 +1,4 @@
+import json
 import typing
 from unittest import mock
 
@@ -14,10 +15,10 @@ def forged_coinbase(
 ) -> Coinbase:
     mocked_return = mock.Mock()
     mocked_return.headers = {"content-type": content_type}
-    mocked_return.json.return_value = return_value
+    mocked_return.content = json.dumps(return_value).encode()
     if raise_for_status:
         mocked_return.raise_for_status.side_effect = httpx.HTTPStatusError(
-            "test error", request=None, response=None  # type: ignore
+            "test error", request=httpx.Request("GET", "/test"), response=mocked_return
         )
 
     coinbase = Coinbase("test")
@@ -38,6 +39,34 @@ def test_client() -> None:
     assert coinbase.client.headers["X-CC-Api-Key"] == "test"
 
 
+def test_client_options() -> None:
+    coinbase = Coinbase(
+        "test",
+        max_connections=5,
+        keepalive_expiry=1.0,
+        connect_timeout=2.0,
+        read_timeout=3.0,
+    )
+    assert coinbase.client.timeout.connect == 2.0
+    assert coinbase.client.timeout.read == 3.0
+    pool = coinbase.client._transport._pool  # type: ignore
+    assert pool._max_connections == 5
+    assert pool._keepalive_expiry == 1.0
+
+
+@pytest.mark.asyncio
+async def test_lifecycle() -> None:
+    async with Coinbase("test") as coinbase:
+        assert not coinbase.client.is_closed
+    assert coinbase.client.is_closed
+
+    client = httpx.AsyncClient()
+    async with Coinbase("test", client=client):
+        pass
+    assert not client.is_closed
+    await client.aclose()
+
+
 @pytest.mark.asyncio
 async def test_request() -> None:
     coinbase = forged_coinbase({"value": "test"})
@@ -46,6 +75,25 @@ async def test_request() -> None:
     assert response == {"value": "test"}
 
 
+@pytest.mark.asyncio
+async def test_call() -> None:
+    coinbase = forged_coinbase({"value": "test"})
+    response = await coinbase.call(
+        "POST", "/test", params={"a": 1, "b": None}, json={"name": "é"}
+    )
+    assert response == {"value": "test"}
+    request: httpx.Request = coinbase.client.send.await_args.args[0]  # type: ignore
+    assert request.url == "https://api.commerce.coinbase.com/test?a=1&b="
+    assert request.headers["Content-Type"] == "application/json"
+    assert request.headers["X-CC-Api-Key"] == "test"
+    assert json.loads(request.content) == {"name": "é"}
+
+    await coinbase.call("GET", "/test")
+    request = coinbase.client.send.await_args.args[0]  # type: ignore
+    assert "Content-Type" not in request.headers
+    assert request.content == b""
+
+
 @pytest.mark.asyncio
 async def test_request_with_application_json_utf8() -> None:
     coinbase = forged_coinbase(
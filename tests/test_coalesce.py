@@ -0,0 +1,64 @@
+import asyncio
+
+import httpx
+import pytest
+
+from async_commerce_coinbase import Coinbase, CoinbaseHTTPStatusError
+from tests.conftest import MockCoinbase
+
+
+def coalescing_coinbase(
+    mock_coinbase: MockCoinbase, status_code: int = 200
+) -> Coinbase:
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(0.01)
+        return httpx.Response(status_code, json={"data": {"resource": "charge"}})
+
+    return mock_coinbase(handler, coalesce=True)
+
+
+@pytest.mark.asyncio
+async def test_coalesce(mock_coinbase: MockCoinbase) -> None:
+    coinbase = coalescing_coinbase(mock_coinbase)
+    charges = await asyncio.gather(*(coinbase.get_charge("a") for _ in range(10)))
+
+    assert [str(r.url) for r in mock_coinbase.requests] == [
+        "https://coinbase.test/charges/a"
+    ]
+    assert all(charge["resource"] == "charge" for charge in charges)
+    assert len({id(charge) for charge in charges}) == 10
+    assert coinbase._inflight == {}
+
+    await asyncio.gather(coinbase.get_charge("a"), coinbase.get_charge("b"))
+    assert len(mock_coinbase.requests) == 3
+
+
+@pytest.mark.asyncio
+async def test_coalesce_only_get(mock_coinbase: MockCoinbase) -> None:
+    coinbase = coalescing_coinbase(mock_coinbase)
+    await asyncio.gather(*(coinbase.cancel_charge("a") for _ in range(3)))
+    assert len(mock_coinbase.requests) == 3
+
+
+@pytest.mark.asyncio
+async def test_coalesce_error(mock_coinbase: MockCoinbase) -> None:
+    coinbase = coalescing_coinbase(mock_coinbase, 500)
+    results = await asyncio.gather(
+        *(coinbase.get_charge("a") for _ in range(3)), return_exceptions=True
+    )
+    assert len(mock_coinbase.requests) == 1
+    assert all(isinstance(result, CoinbaseHTTPStatusError) for result in results)
+
+
+@pytest.mark.asyncio
+async def test_coalesce_first_caller_cancelled(mock_coinbase: MockCoinbase) -> None:
+    coinbase = coalescing_coinbase(mock_coinbase)
+    first = asyncio.create_task(coinbase.get_charge("a"))
+    await asyncio.sleep(0)
+    second = asyncio.create_task(coinbase.get_charge("a"))
+    await asyncio.sleep(0)
+    first.cancel()
+
+    assert (await second)["resource"] == "charge"
+    assert first.cancelled()
+    assert len(mock_coinbase.requests) == 1
@@ -0,0 +1,205 @@
+import asyncio
+import hmac
+import json
+import typing
+from unittest import mock
+
+import pytest
+
+from async_commerce_coinbase import SignatureVerificationError, jsonlib, webhook
+from async_commerce_coinbase.dispatcher import WebhookDispatcher
+from async_commerce_coinbase.webhook import Event
+
+SECRET = "secret"
+
+
+def signed(id: str, type: str = "charge:confirmed", **fields: str) -> tuple[bytes, str]:
+    event = {"id": id, "resource": "event", "type": type, **fields, "data": {}}
+    body = json.dumps({"id": 1, "event": event}).encode()
+    return body, hmac.digest(SECRET.encode(), body, "sha256").hex()
+
+
+@pytest.mark.asyncio
+async def test_routing() -> None:
+    dispatcher = WebhookDispatcher(SECRET, workers=2)
+    confirmed: list[str] = []
+    every: list[str] = []
+
+    @dispatcher.on("charge:confirmed", "charge:resolved")
+    async def on_confirmed(event: Event) -> None:
+        confirmed.append(event["id"])
+
+    @dispatcher.on()
+    async def on_every(event: Event) -> None:
+        every.append(event["id"])
+
+    async with dispatcher:
+        assert dispatcher.running
+        await dispatcher.submit(*signed("1"))
+        await dispatcher.submit(*signed("2", "charge:created"))
+        dispatcher.submit_nowait(*signed("3", "charge:resolved"))
+        await dispatcher.join()
+        assert sorted(confirmed) == ["1", "3"]
+        assert sorted(every) == ["1", "2", "3"]
+    assert not dispatcher.running
+
+
+@pytest.mark.asyncio
+async def test_invalid_signature() -> None:
+    async with WebhookDispatcher(SECRET) as dispatcher:
+        body, _ = signed("1")
+        with pytest.raises(SignatureVerificationError):
+            await dispatcher.submit(body, "00")
+        # signed, but not an event
+        for body in (b'{"event": 5}', b'{"event": {"id": "x'):
+            signature = hmac.digest(SECRET.encode(), body, "sha256").hex()
+            with pytest.raises(SignatureVerificationError):
+                await dispatcher.submit(body, signature)
+
+
+@pytest.mark.asyncio
+async def test_not_started() -> None:
+    with pytest.raises(RuntimeError):
+        await WebhookDispatcher(SECRET).submit(*signed("1"))
+    with pytest.raises(ValueError):
+        WebhookDispatcher(SECRET, workers=0)
+
+
+@pytest.mark.asyncio
+async def test_backpressure() -> None:
+    release = asyncio.Event()
+    dispatcher = WebhookDispatcher(SECRET, workers=1, queue_size=1)
+
+    @dispatcher.on()
+    async def handler(event: Event) -> None:
+        await release.wait()
+
+    async with dispatcher:
+        dispatcher.submit_nowait(*signed("1"))
+        await asyncio.sleep(0)  # picked up by the worker
+        dispatcher.submit_nowait(*signed("2"))
+        with pytest.raises(asyncio.QueueFull):
+            dispatcher.submit_nowait(*signed("3"))
+
+        blocked = asyncio.create_task(dispatcher.submit(*signed("3")))
+        await asyncio.sleep(0.01)
+        assert not blocked.done()
+        release.set()
+        await blocked
+
+
+@pytest.mark.asyncio
+async def test_timeout_and_errors() -> None:
+    errors: list[tuple[str, type[Exception]]] = []
+
+    async def on_error(event: Event, error: Exception) -> None:
+        errors.append((event["id"], type(error)))
+
+    dispatcher = WebhookDispatcher(SECRET, timeout=0.01, on_error=on_error)
+
+    @dispatcher.on("charge:confirmed")
+    async def slow(event: Event) -> None:
+        await asyncio.sleep(1)
+
+    @dispatcher.on("charge:failed")
+    async def failing(event: Event) -> None:
+        raise KeyError(event["id"])
+
+    handled: list[str] = []
+
+    @dispatcher.on()
+    async def handler(event: Event) -> None:
+        handled.append(event["id"])
+
+    async with dispatcher:
+        await dispatcher.submit(*signed("1"))
+        await dispatcher.submit(*signed("2", "charge:failed"))
+
+    assert sorted(errors) == [("1", asyncio.TimeoutError), ("2", KeyError)]
+    # a failing handler does not prevent the next ones from running, a timeout
+    # cancels the whole event
+    assert handled == ["2"]
+
+
+@pytest.mark.asyncio
+async def test_timeout_per_event() -> None:
+    errors: list[type[Exception]] = []
+
+    async def on_error(event: Event, error: Exception) -> None:
+        errors.append(type(error))
+
+    dispatcher = WebhookDispatcher(SECRET, timeout=0.05, on_error=on_error)
+    handled: list[int] = []
+    for index in range(3):
+
+        @dispatcher.on()
+        async def handler(event: Event, index: int = index) -> None:
+            await asyncio.sleep(0.03)
+            handled.append(index)
+
+    async with dispatcher:
+        await dispatcher.submit(*signed("1"))
+    # each handler is within the timeout, but not the three of them
+    assert handled == [0]
+    assert errors == [asyncio.TimeoutError]
+
+
+@pytest.mark.asyncio
+async def test_stop_without_drain(caplog: pytest.LogCaptureFixture) -> None:
+    dispatcher = WebhookDispatcher(SECRET, workers=1)
+
+    @dispatcher.on()
+    async def handler(event: Event) -> None:
+        raise ValueError
+
+    dispatcher.start()
+    dispatcher.start()
+    await dispatcher.submit(*signed("1"))
+    await dispatcher.join()
+    await dispatcher.stop(drain=False)
+    await dispatcher.stop()
+    await dispatcher.join()
+    assert "webhook handler failed for event 1" in caplog.text
+
+
+def test_get_handlers() -> None:
+    dispatcher = WebhookDispatcher(SECRET)
+    handler = typing.cast(typing.Any, object())
+    dispatcher.add_handler(handler, "invoice:paid")
+    assert dispatcher.get_handlers("invoice:paid") == [handler]
+    assert dispatcher.get_handlers("invoice:voided") == []
+
+
+@pytest.mark.asyncio
+async def test_unhandled_events_are_dropped() -> None:
+    dispatcher = WebhookDispatcher(SECRET)
+    dispatcher.add_handler(mock.AsyncMock(), "charge:confirmed")
+    async with dispatcher:
+        assert await dispatcher.submit(*signed("1", "charge:created")) is None
+        assert dispatcher.submit_nowait(*signed("2", "charge:failed")) is None
+        assert await dispatcher.submit(*signed("3")) is not None
+
+
+@pytest.mark.asyncio
+async def test_data_is_decoded_by_the_worker() -> None:
+    handled: list[Event] = []
+    dispatcher = WebhookDispatcher(SECRET, workers=1)
+
+    @dispatcher.on()
+    async def handler(event: Event) -> None:
+        handled.append(event)
+
+    async with dispatcher:
+        with mock.patch.object(webhook, "loads", wraps=jsonlib.loads) as loads:
+            submitted = await dispatcher.submit(
+                *signed("1", created_at="2022-01-01T00:00:00Z")
+            )
+            loads.assert_not_called()
+            await dispatcher.join()
+            loads.assert_called_once()
+        # without created_at the envelope needs a full decode
+        await dispatcher.submit(*signed("2"))
+
+    assert submitted is not None and submitted.created_at == "2022-01-01T00:00:00Z"
+    assert [event["id"] for event in handled] == ["1", "2"]
+    assert "created_at" not in handled[1]
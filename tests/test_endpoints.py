@@ -0,0 +1,17 @@
+import pytest
+
+from async_commerce_coinbase.endpoints import endpoint_group, endpoint_template
+
+
+@pytest.mark.parametrize(
+    "path,template,group",
+    [
+        ("/charges", "/charges", "/charges"),
+        ("/charges/ABC", "/charges/{code}", "/charges"),
+        ("/charges/ABC/cancel", "/charges/{code}/cancel", "/charges"),
+        ("/invoices/ABC/void", "/invoices/{code}/void", "/invoices"),
+    ],
+)
+def test_endpoints(path: str, template: str, group: str) -> None:
+    assert endpoint_template(path) == template
+    assert endpoint_group(path) == group
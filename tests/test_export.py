@@ -0,0 +1,239 @@
+import csv
+import gzip
+import io
+import json
+import logging
+import subprocess
+import sys
+import typing
+from pathlib import Path
+from unittest import mock
+
+import httpx
+import pytest
+
+from async_commerce_coinbase.__main__ import main
+from async_commerce_coinbase.export import export, flatten
+from tests.conftest import Handler, MockCoinbase
+
+RECORDS = [
+    {
+        "id": str(index),
+        "code": f"C{index}",
+        "pricing": {"local": {"amount": "1.00", "currency": "EUR"}},
+        "metadata": {"user_id": str(index)} if index % 2 else {},
+        "timeline": [{"status": "NEW"}],
+    }
+    for index in range(5)
+]
+
+
+def listing(fail_after: int | None = None, page_size: int = 2) -> Handler:
+    """Pages of ``RECORDS``, failing after ``fail_after`` requests."""
+    requests = 0
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal requests
+        requests += 1
+        if fail_after is not None and requests > fail_after:
+            raise httpx.ConnectError("test error")
+        start = int(request.url.params.get("starting_after") or 0)
+        data = RECORDS[start : start + page_size]
+        end = start + len(data)
+        return httpx.Response(
+            200,
+            json={
+                "pagination": {
+                    "next_uri": "x" if end < len(RECORDS) else None,
+                    "cursor": [str(start), str(end)],
+                },
+                "data": data,
+            },
+        )
+
+    return handler
+
+
+def test_flatten() -> None:
+    assert flatten(RECORDS[1]) == {
+        "id": "1",
+        "code": "C1",
+        "pricing.local.amount": "1.00",
+        "pricing.local.currency": "EUR",
+        "metadata.user_id": "1",
+        "timeline": '[{"status":"NEW"}]',
+    }
+
+
+@pytest.mark.asyncio
+async def test_export_ndjson(mock_coinbase: MockCoinbase, tmp_path: Path) -> None:
+    output = tmp_path / "charges.ndjson"
+    assert await export(mock_coinbase(listing()).list_charges(), output) == 5
+    lines = output.read_text().splitlines()
+    assert [json.loads(line) for line in lines] == RECORDS
+
+
+@pytest.mark.asyncio
+async def test_export_csv_gzip(mock_coinbase: MockCoinbase, tmp_path: Path) -> None:
+    output = tmp_path / "charges.csv.gz"
+    count = await export(
+        mock_coinbase(listing()).list_charges(),
+        output,
+        format="csv",
+        columns=["code", "pricing.local.amount", "metadata.user_id"],
+    )
+    assert count == 5
+    with gzip.open(output, "rt", newline="") as file:
+        rows = list(csv.reader(file))
+    assert rows[0] == ["code", "pricing.local.amount", "metadata.user_id"]
+    assert rows[1:3] == [["C0", "1.00", ""], ["C1", "1.00", "1"]]
+    assert len(rows) == 6
+
+
+@pytest.mark.asyncio
+async def test_export_resume(mock_coinbase: MockCoinbase, tmp_path: Path) -> None:
+    output = tmp_path / "charges.csv.gz"
+    checkpoint = tmp_path / "checkpoint.json"
+
+    with pytest.raises(httpx.ConnectError):
+        await export(
+            mock_coinbase(listing(fail_after=1)).list_charges(),
+            output,
+            format="csv",
+            checkpoint=checkpoint,
+        )
+    assert json.loads(checkpoint.read_text())["starting_after"] == "2"
+
+    count = await export(
+        mock_coinbase(listing()).list_charges(),
+        output,
+        format="csv",
+        checkpoint=checkpoint,
+    )
+    assert count == 3
+    assert json.loads(checkpoint.read_text())["exhausted"]
+    with gzip.open(output, "rt", newline="") as file:
+        rows = list(csv.DictReader(file))
+    assert [row["code"] for row in rows] == ["C0", "C1", "C2", "C3", "C4"]
+
+    assert (
+        await export(
+            mock_coinbase(listing()).list_charges(), output, checkpoint=checkpoint
+        )
+        == 0
+    )
+
+
+# writes half of the second page, then dies like a SIGKILL would
+KILLED_EXPORT = """
+import asyncio, os, sys
+from async_commerce_coinbase import export
+from tests.conftest import MockCoinbase
+from tests.test_export import listing
+
+class Dying:
+    def __init__(self, file):
+        self.file, self.writes = file, 0
+    def write(self, data):
+        self.writes += 1
+        if self.writes == 2:
+            self.file.write(data[: len(data) // 2])
+            self.file.flush()
+            os._exit(9)
+        return self.file.write(data)
+    def __getattr__(self, name):
+        return getattr(self.file, name)
+    def __enter__(self):
+        return self
+    def __exit__(self, *exc_info):
+        self.file.close()
+
+export.open = lambda *args: Dying(open(*args))
+asyncio.run(export.export(
+    MockCoinbase()(listing()).list_charges(), sys.argv[1], format=sys.argv[2],
+    checkpoint=sys.argv[3],
+))
+"""
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "name, format", [("charges.csv.gz", "csv"), ("charges.ndjson.gz", "ndjson")]
+)
+async def test_export_resume_after_kill(
+    mock_coinbase: MockCoinbase, tmp_path: Path, name: str, format: str
+) -> None:
+    output = tmp_path / name
+    checkpoint = tmp_path / "checkpoint.json"
+    process = subprocess.run(
+        [sys.executable, "-c", KILLED_EXPORT, str(output), format, str(checkpoint)],
+        cwd=Path(__file__).parent.parent,
+    )
+    assert process.returncode == 9
+    saved = json.loads(checkpoint.read_text())
+    assert saved["starting_after"] == "2"
+    assert output.stat().st_size > saved["offset"]  # a broken gzip member
+
+    count = await export(
+        mock_coinbase(listing()).list_charges(),
+        output,
+        format=typing.cast(typing.Any, format),
+        checkpoint=checkpoint,
+    )
+    assert count == 3
+    with gzip.open(output, "rt", newline="") as file:
+        if format == "csv":
+            codes = [row["code"] for row in csv.DictReader(file)]
+        else:
+            codes = [json.loads(line)["code"] for line in file]
+    assert codes == ["C0", "C1", "C2", "C3", "C4"]
+
+
+@pytest.mark.asyncio
+async def test_export_csv_dropped_fields(
+    mock_coinbase: MockCoinbase, tmp_path: Path, caplog: pytest.LogCaptureFixture
+) -> None:
+    output = tmp_path / "charges.csv"
+    with caplog.at_level(logging.WARNING):
+        await export(mock_coinbase(listing()).list_charges(), output, format="csv")
+    # metadata.user_id is missing from the first record only, C1 is on page 1
+    assert caplog.messages == []
+
+    caplog.clear()
+    with caplog.at_level(logging.WARNING):
+        await export(
+            mock_coinbase(listing(page_size=1)).list_charges(), output, format="csv"
+        )
+    assert caplog.messages == [
+        "fields not in the csv columns are left out: ['metadata.user_id'], "
+        "pass columns to include them"
+    ]
+
+
+@pytest.mark.asyncio
+async def test_export_invalid_format(
+    mock_coinbase: MockCoinbase, tmp_path: Path
+) -> None:
+    with pytest.raises(ValueError):
+        await export(
+            mock_coinbase(listing()).list_charges(),
+            tmp_path / "x",
+            format=typing.cast(typing.Any, "xml"),
+        )
+
+
+def test_cli(mock_coinbase: MockCoinbase, tmp_path: Path) -> None:
+    output = tmp_path / "events.csv"
+    with mock.patch(
+        "async_commerce_coinbase.__main__.Coinbase",
+        lambda api_key: mock_coinbase(listing()),
+    ), mock.patch("sys.stderr", io.StringIO()) as stderr:
+        assert main(["export", "events", str(output), "--api-key", "test"]) == 0
+    assert stderr.getvalue().startswith("exported 5 events")
+    assert output.read_text().startswith("id,code,pricing.local.amount")
+
+
+def test_cli_requires_api_key(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.delenv("COINBASE_API_KEY", raising=False)
+    with pytest.raises(SystemExit), mock.patch("sys.stderr", io.StringIO()):
+        main(["export", "charges", "out.ndjson"])
@@ -0,0 +1,179 @@
+import asyncio
+import contextlib
+import threading
+import typing
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+from async_commerce_coinbase.dispatcher import WebhookDispatcher
+from async_commerce_coinbase.idempotency import (
+    FileIdempotencyStore,
+    IdempotencyStore,
+    MemoryIdempotencyStore,
+    SQLiteIdempotencyStore,
+    claimed,
+    deduplicate,
+)
+from async_commerce_coinbase.webhook import Event
+
+
+def event(id: str) -> Event:
+    return typing.cast(Event, {"id": id, "type": "charge:confirmed"})
+
+
+async def check_store(store: IdempotencyStore) -> None:
+    assert await store.claim("a")
+    assert not await store.claim("a")
+    assert await store.claim("b")
+    await store.release("a")
+    await store.release("missing")
+    assert await store.claim("a")
+
+
+@pytest.mark.asyncio
+async def test_memory_store() -> None:
+    await check_store(MemoryIdempotencyStore())
+
+
+@pytest.mark.asyncio
+async def test_memory_store_expiry() -> None:
+    store = MemoryIdempotencyStore(maxsize=2, ttl=10)
+    with mock.patch("time.monotonic", return_value=0):
+        assert await store.claim("a")
+        assert await store.claim("b")
+        assert await store.claim("c")
+        # "a" was the least recently used
+        assert await store.claim("a")
+    with mock.patch("time.monotonic", return_value=20):
+        assert await store.claim("c")
+
+
+@pytest.mark.asyncio
+async def test_sqlite_store(tmp_path: Path) -> None:
+    await check_store(SQLiteIdempotencyStore())
+
+    store = SQLiteIdempotencyStore(tmp_path / "claims.db", ttl=10)
+    with mock.patch("time.time", return_value=0):
+        assert await store.claim("a")
+    store.close()
+    store = SQLiteIdempotencyStore(tmp_path / "claims.db", ttl=10)
+    with mock.patch("time.time", return_value=5):
+        assert not await store.claim("a")
+    with mock.patch("time.time", return_value=11):
+        assert await store.claim("a")
+
+
+@pytest.mark.asyncio
+async def test_file_store(tmp_path: Path) -> None:
+    await check_store(FileIdempotencyStore(tmp_path / "claims"))
+    store = FileIdempotencyStore(tmp_path / "claims")
+    assert not await store.claim("a")
+    assert not await store.claim("b")
+
+
+@pytest.mark.asyncio
+async def test_concurrent_claims() -> None:
+    class SlowStore(SQLiteIdempotencyStore):
+        async def claim(self, key: str) -> bool:
+            await asyncio.sleep(0.01)
+            return await super().claim(key)
+
+    store = MemoryIdempotencyStore(backend=SlowStore())
+    claims = await asyncio.gather(*(store.claim("a") for _ in range(10)))
+    assert claims.count(True) == 1
+
+    # already claimed by another process sharing the backend
+    other = MemoryIdempotencyStore(backend=store.backend)
+    assert not await other.claim("a")
+    await other.release("a")
+    assert await store.backend.claim("a")  # type: ignore[union-attr]
+
+
+@pytest.mark.asyncio
+async def test_backend_failure() -> None:
+    backend = mock.AsyncMock(IdempotencyStore)
+    backend.claim.side_effect = OSError
+    store = MemoryIdempotencyStore(backend=backend)
+    with pytest.raises(OSError):
+        await store.claim("a")
+    backend.claim.side_effect = None
+    backend.claim.return_value = True
+    assert await store.claim("a")
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_and_backfill() -> None:
+    store = MemoryIdempotencyStore()
+    dispatcher = WebhookDispatcher("secret", workers=3, idempotency=store)
+    handled: list[str] = []
+
+    @dispatcher.on()
+    async def handler(event: Event) -> None:
+        handled.append(event["id"])
+        if event["id"] == "failing":
+            raise ValueError
+
+    async with dispatcher:
+        for id in ("1", "1", "2", "1", "failing"):
+            await dispatcher.submit_event(event(id))
+    assert sorted(handled) == ["1", "2", "failing"]
+
+    async def backfill() -> typing.AsyncGenerator[Event, None]:
+        for id in ("3", "2", "1", "failing"):
+            yield event(id)
+
+    # the failing event was released, so the backfill processes it again
+    assert [e["id"] async for e in deduplicate(backfill(), store)] == [
+        "3",
+        "failing",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_failed_backfill_is_retried(tmp_path: Path) -> None:
+    store = SQLiteIdempotencyStore(tmp_path / "claims.db")
+
+    async def backfill() -> typing.AsyncGenerator[Event, None]:
+        for id in ("1", "2", "3"):
+            yield event(id)
+
+    with pytest.raises(ValueError):
+        async with contextlib.aclosing(deduplicate(backfill(), store)) as events:
+            async for processed in events:
+                if processed["id"] == "2":
+                    raise ValueError
+    assert [e["id"] async for e in deduplicate(backfill(), store)] == ["2", "3"]
+    assert [e["id"] async for e in deduplicate(backfill(), store)] == []
+
+    with pytest.raises(ValueError):
+        async with claimed(store, "4") as first:
+            assert first
+            raise ValueError
+    async with claimed(store, "4") as first:
+        assert first
+    async with claimed(store, "4") as first:
+        assert not first
+
+
+@pytest.mark.asyncio
+async def test_sqlite_store_off_the_loop(monkeypatch: pytest.MonkeyPatch) -> None:
+    store = SQLiteIdempotencyStore()
+    threads = set()
+    claim, release = store._claim, store._release
+
+    def recording_claim(key: str) -> bool:
+        threads.add(threading.get_ident())
+        return claim(key)
+
+    def recording_release(key: str) -> None:
+        threads.add(threading.get_ident())
+        release(key)
+
+    monkeypatch.setattr(store, "_claim", recording_claim)
+    monkeypatch.setattr(store, "_release", recording_release)
+    claims = await asyncio.gather(*(store.claim("a") for _ in range(10)))
+    assert claims.count(True) == 1
+    await store.release("a")
+    assert threads and threading.get_ident() not in threads
@@ -0,0 +1,105 @@
+import math
+from unittest import mock
+
+import httpx
+import pytest
+
+from async_commerce_coinbase import CoinbaseHTTPStatusError
+from async_commerce_coinbase.instrumentation import (
+    Histogram,
+    Instrumentation,
+    MetricsCollector,
+    OpenTelemetryInstrumentation,
+)
+from tests.conftest import MockCoinbase
+
+
+def handler(request: httpx.Request) -> httpx.Response:
+    if request.url.path == "/charges/MISSING":
+        return httpx.Response(404, json={"error": {}})
+    if request.url.path == "/charges/BROKEN":
+        raise httpx.ConnectError("test error")
+    return httpx.Response(200, json={"data": {"code": "ABCD"}})
+
+
+def test_histogram() -> None:
+    histogram = Histogram([1, 0.1, 10])
+    assert math.isnan(histogram.quantile(0.5))
+    for value in (0.05, 0.1, 0.5, 2, 20):
+        histogram.observe(value)
+    assert histogram.counts == [2, 1, 1, 1]
+    assert (histogram.count, histogram.sum) == (5, 22.65)
+    assert histogram.quantile(0.4) == 0.1
+    assert histogram.quantile(0.6) == 1
+    assert histogram.quantile(0.99) == math.inf
+
+
+@pytest.mark.asyncio
+async def test_metrics_collector(mock_coinbase: MockCoinbase) -> None:
+    metrics = MetricsCollector()
+    coinbase = mock_coinbase(handler, instrumentation=metrics)
+    await coinbase.get_charge("ABCD")
+    await coinbase.get_charge("EFGH")
+    with pytest.raises(CoinbaseHTTPStatusError):
+        await coinbase.get_charge("MISSING")
+    with pytest.raises(httpx.ConnectError):
+        await coinbase.get_charge("BROKEN")
+
+    endpoint = "/charges/{code}"
+    assert metrics.durations["build", "GET", endpoint].count == 4
+    assert metrics.durations["send", "GET", endpoint].count == 3
+    assert metrics.durations["decode", "GET", endpoint].count == 3
+    assert metrics.sizes["GET", endpoint].sum > 0
+    assert metrics.responses == {("GET", endpoint, 200): 2, ("GET", endpoint, 404): 1}
+    assert metrics.errors == {
+        ("GET", endpoint, "CoinbaseHTTPStatusError"): 1,
+        ("GET", endpoint, "ConnectError"): 1,
+    }
+
+    text = metrics.to_prometheus()
+    assert "# TYPE coinbase_request_duration_seconds histogram" in text
+    labels = 'stage="send",method="GET",endpoint="/charges/{code}"'
+    assert f'coinbase_request_duration_seconds_bucket{{{labels},le="+Inf"}} 3' in text
+    assert (
+        'coinbase_responses_total{method="GET",endpoint="/charges/{code}",'
+        'status="200"} 2'
+    ) in text
+    assert 'error="ConnectError"} 1' in text
+
+
+def test_prometheus_escaping() -> None:
+    metrics = MetricsCollector()
+    metrics.on_circuit_change('a\\b "c"\nd', "open")
+    text = metrics.to_prometheus()
+    assert 'coinbase_circuit_state{group="a\\\\b \\"c\\"\\nd",state="open"} 1' in text
+    assert not any(line.startswith('d"') for line in text.splitlines())
+
+
+@pytest.mark.asyncio
+async def test_opentelemetry(mock_coinbase: MockCoinbase) -> None:
+    meter = mock.Mock()
+    duration, size = mock.Mock(), mock.Mock()
+    meter.create_histogram.side_effect = [duration, size]
+    coinbase = mock_coinbase(
+        handler, instrumentation=OpenTelemetryInstrumentation(meter)
+    )
+
+    await coinbase.get_charge("ABCD")
+    with pytest.raises(httpx.ConnectError):
+        await coinbase.get_charge("BROKEN")
+
+    stages = [call.args[1]["stage"] for call in duration.record.call_args_list]
+    assert stages == ["build", "send", "decode", "build"]
+    assert duration.record.call_args_list[1].args[1]["status"] == 200
+    size.record.assert_called_once()
+    meter.create_counter.return_value.add.assert_called_once_with(
+        1, {"method": "GET", "endpoint": "/charges/{code}", "error": "ConnectError"}
+    )
+
+
+@pytest.mark.asyncio
+async def test_default_hooks(mock_coinbase: MockCoinbase) -> None:
+    coinbase = mock_coinbase(handler, instrumentation=Instrumentation())
+    await coinbase.get_charge("ABCD")
+    with pytest.raises(httpx.ConnectError):
+        await coinbase.get_charge("BROKEN")
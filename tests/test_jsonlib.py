@@ -0,0 +1,27 @@
+import json
+
+import pytest
+
+from async_commerce_coinbase import jsonlib
+
+DOCUMENT = {"data": [{"id": "a", "amount": 1.5, "meta": None, "ok": True}]}
+
+
+@pytest.mark.parametrize("backend", jsonlib.BACKENDS)
+def test_backends_agree(backend: str) -> None:
+    _, loads, dumps = jsonlib.select_backend([backend, "json"])
+    encoded = json.dumps(DOCUMENT)
+    assert loads(encoded) == DOCUMENT
+    assert loads(encoded.encode()) == DOCUMENT
+    assert loads(memoryview(encoded.encode())) == DOCUMENT
+    assert json.loads(dumps(DOCUMENT)) == DOCUMENT
+
+
+def test_fallback() -> None:
+    assert jsonlib.select_backend(["does-not-exist", "json"]).name == "json"
+    with pytest.raises(ValueError):
+        jsonlib.select_backend(["does-not-exist"])
+
+
+def test_selected_backend() -> None:
+    assert jsonlib.BACKEND in jsonlib.BACKENDS
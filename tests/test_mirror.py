@@ -0,0 +1,178 @@
+import datetime
+import threading
+import typing
+from pathlib import Path
+
+import httpx
+import pytest
+
+from async_commerce_coinbase.mirror import Mirror
+from tests.conftest import MockCoinbase
+
+
+def charge(
+    index: int, status: str = "NEW", changed_at: str | None = None
+) -> dict[str, typing.Any]:
+    created_at = f"2022-01-0{index}T00:00:00Z"
+    return {
+        "id": f"charge-{index}",
+        "resource": "charge",
+        "code": f"CODE{index}",
+        "created_at": created_at,
+        "metadata": {"user_id": str(index % 2)},
+        "timeline": [
+            {"time": created_at, "status": "NEW"},
+            {"time": changed_at or created_at, "status": status},
+        ],
+    }
+
+
+def event(index: int, data: dict[str, typing.Any]) -> dict[str, typing.Any]:
+    return {
+        "id": f"event-{index}",
+        "resource": "event",
+        "type": "charge:created",
+        "created_at": f"2022-01-0{index}T00:00:00Z",
+        "data": data,
+    }
+
+
+class Server:
+    """Cursor paginated lists, oldest first, like coinbase returns them."""
+
+    def __init__(self) -> None:
+        self.resources: dict[str, list[dict[str, typing.Any]]] = {
+            "/charges": [
+                charge(1),
+                charge(2, "PENDING", "2022-01-06T00:00:00Z"),
+                charge(3, "PENDING", "2022-01-04T00:00:00Z"),
+            ],
+            "/checkouts": [{"id": "checkout-1", "created_at": "2022-01-01"}],
+            "/invoices": [],
+            "/events": [],
+        }
+        self.paths: list[str] = []
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        self.paths.append(request.url.path)
+        _, collection, *code = request.url.path.split("/")
+        items = self.resources[f"/{collection}"]
+        if code:
+            found = [item for item in items if code[0] in (item["id"], item["code"])]
+            return httpx.Response(200, json={"data": found[0]})
+        if request.url.params["order"] == "desc":
+            items = items[::-1]
+        start = 0
+        if starting_after := request.url.params.get("starting_after"):
+            ids = [item["id"] for item in items]
+            start = ids.index(starting_after) + 1
+        end = start + int(request.url.params["limit"])
+        data = items[start:end]
+        return httpx.Response(
+            200,
+            json={
+                "pagination": {
+                    "next_uri": "x" if end < len(items) else None,
+                    "cursor": [data[0]["id"], data[-1]["id"]] if data else [],
+                },
+                "data": data,
+            },
+        )
+
+
+@pytest.mark.asyncio
+async def test_full_sync(mock_coinbase: MockCoinbase) -> None:
+    server = Server()
+    server.resources["/events"] = [event(1, charge(1))]
+    mirror = Mirror()
+    await mirror.sync(mock_coinbase(server.handler))
+
+    assert await mirror.get("events") == "event-1"
+    assert mirror.get_resource("charges", "CODE2")["id"] == "charge-2"
+    assert mirror.get_resource("charges", "charge-2")["code"] == "CODE2"
+    assert mirror.get_resource("checkouts", "checkout-1") is not None
+    assert mirror.get_resource("events", "event-1") is not None
+    assert mirror.get_resource("charges", "missing") is None
+
+
+@pytest.mark.asyncio
+async def test_incremental_sync(mock_coinbase: MockCoinbase) -> None:
+    server = Server()
+    mirror = Mirror()
+    await mirror.sync(mock_coinbase(server.handler))
+    assert await mirror.get("events") == ""
+
+    server.resources["/events"] = [
+        event(4, charge(4)),
+        event(5, charge(1, "COMPLETED")),
+    ]
+    server.resources["/charges"].append(charge(4))
+    server.resources["/checkouts"].append({"id": "checkout-2"})
+    server.paths.clear()
+    await mirror.sync(mock_coinbase(server.handler))
+
+    # charges still new or pending are fetched again, charge-1 was completed
+    assert server.paths[:2] == ["/events", "/checkouts"]
+    assert sorted(server.paths[2:]) == [
+        "/charges/charge-2",
+        "/charges/charge-3",
+        "/charges/charge-4",
+    ]
+    assert await mirror.get("events") == "event-5"
+    assert mirror.get_resource("charges", "CODE4") is not None
+    assert [c["id"] for c in mirror.find_by_status("charges", "COMPLETED")] == [
+        "charge-1"
+    ]
+    assert mirror.get_resource("checkouts", "checkout-2") is not None
+
+    server.paths.clear()
+    await mirror.sync(mock_coinbase(server.handler))
+    assert mirror.get_resource("events", "event-5") is not None
+    assert await mirror.get("events") == "event-5"
+
+
+@pytest.mark.asyncio
+async def test_queries(mock_coinbase: MockCoinbase, tmp_path: Path) -> None:
+    mirror = Mirror(tmp_path / "mirror.db")
+    await mirror.sync(mock_coinbase(Server().handler))
+
+    found = mirror.find_by_metadata("charges", "user_id", "1")
+    assert [c["id"] for c in found] == ["charge-3", "charge-1"]
+    assert mirror.find_by_metadata("invoices", "user_id", "1") == []
+
+    pending = mirror.find_by_status("charges", "PENDING")
+    assert [c["id"] for c in pending] == ["charge-3", "charge-2"]
+    # pending since before the 5th, whatever their creation date
+    old = mirror.find_by_status(
+        "charges",
+        "PENDING",
+        changed_before=datetime.datetime(2022, 1, 5, tzinfo=datetime.timezone.utc),
+    )
+    assert [c["id"] for c in old] == ["charge-3"]
+
+    between = mirror.find_created_between(
+        "charges", "2022-01-01T00:00:00Z", datetime.datetime(2022, 1, 3)
+    )
+    assert [c["id"] for c in between] == ["charge-2", "charge-1"]
+    mirror.close()
+
+    # the watermark is persisted with the data
+    assert await Mirror(tmp_path / "mirror.db").get("events") == ""
+
+
+@pytest.mark.asyncio
+async def test_sync_writes_off_the_loop(
+    mock_coinbase: MockCoinbase, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    mirror = Mirror()
+    threads = set()
+    upsert = mirror.upsert
+
+    def recording(*args: typing.Any) -> None:
+        threads.add(threading.get_ident())
+        upsert(*args)
+
+    monkeypatch.setattr(mirror, "upsert", recording)
+    await mirror.sync(mock_coinbase(Server().handler))
+    assert threads and threading.get_ident() not in threads
+    assert len(mirror.find_by_status("charges", "PENDING")) == 2
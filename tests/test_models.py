@@ -0,0 +1,99 @@
+import typing
+from unittest import mock
+
+import pytest
+
+from async_commerce_coinbase import models
+from async_commerce_coinbase.paginator import CoinbasePaginator
+
+CHARGE = {
+    "id": "id",
+    "resource": "charge",
+    "code": "CODE",
+    "timeline": [{"time": "t", "status": "NEW"}],
+    "pricing": {"local": {"amount": 10.0, "currency": "EUR"}},
+    "payments": [
+        {
+            "network": "ethereum",
+            "transaction_id": "0x0",
+            "value": {"local": {"amount": 10.0, "currency": "EUR"}},
+            "block": {"height": 100, "hash": "0x0"},
+        }
+    ],
+    "metadata": {"user_id": "1"},
+    "some_new_field": "ignored",
+}
+
+
+def test_charge() -> None:
+    charge = models.Charge.from_dict(CHARGE)
+    assert charge.code == "CODE"
+    assert charge.timeline == [models.TimelinePoint("t", "NEW", None)]
+    assert charge.pricing is not None
+    assert charge.pricing["local"] == models.Money(10.0, "EUR")
+    assert charge.payments is not None
+    block = charge.payments[0].block
+    assert block is not None
+    assert block.height == 100
+    assert block.confirmations_required is None
+    assert charge.metadata == {"user_id": "1"}
+    assert charge.confirmed_at is None
+    assert charge.payment_threshold is None
+    assert not hasattr(charge, "__dict__")
+    assert not hasattr(charge, "some_new_field")
+
+
+def test_partial_charge_in_event() -> None:
+    # event payloads only carry some of the fields
+    event = models.Event.from_dict(
+        {"id": "id", "type": "charge:created", "data": {"resource": "charge"}}
+    )
+    assert isinstance(event.data, models.Charge)
+    assert event.data.timeline is None
+    assert event.data.pricing is None
+    assert event.api_version is None
+
+
+def test_invoice() -> None:
+    invoice = models.Invoice.from_dict(
+        {
+            "id": "id",
+            "local_price": {"amount": 1.0, "currency": "EUR"},
+            "charge": {"data": CHARGE},
+        }
+    )
+    assert invoice.local_price == models.Money(1.0, "EUR")
+    assert invoice.charge is not None
+    assert invoice.charge.code == "CODE"
+    assert models.Invoice.from_dict({"charge": {}}).charge is None
+
+
+@pytest.mark.parametrize(
+    "data,expected",
+    [
+        (CHARGE, models.Charge),
+        ({"resource": "invoice"}, models.Invoice),
+        ({"resource": "something"}, dict),
+    ],
+)
+def test_event(data: dict[str, str], expected: type) -> None:
+    event = models.Event.from_dict({"id": "id", "type": "charge:created", "data": data})
+    assert event.type == "charge:created"
+    assert isinstance(event.data, expected)
+
+
+@pytest.mark.asyncio
+async def test_paginator_map() -> None:
+    coinbase = mock.AsyncMock()
+    coinbase.call.return_value = {
+        "pagination": {"next_uri": None},
+        "data": [CHARGE, CHARGE],
+    }
+    paginator: CoinbasePaginator[typing.Any] = CoinbasePaginator(
+        coinbase, "/charges", prefetch=1
+    )
+    charges = await paginator.map(models.Charge.from_dict).all()
+    assert [charge.code for charge in charges] == ["CODE", "CODE"]
+
+    codes = await paginator.map(models.Charge.from_dict).map(lambda c: c.code).all()
+    assert codes == ["CODE", "CODE"]
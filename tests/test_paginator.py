@@ -1,12 +1,29 @@
+import asyncio
+import collections
+import json
 import typing
 from unittest import mock
 
-import httpx
 import pytest
 
 from async_commerce_coinbase.paginator import CoinbasePaginator
 
 
+def assert_fetched(
+    paginator: CoinbasePaginator[str], starting_after: str | None = None
+) -> None:
+    paginator.coinbase.call.assert_awaited_with(  # type: ignore
+        "GET",
+        "/test",
+        params={
+            "order": "desc",
+            "limit": 100,
+            "starting_after": starting_after,
+            "ending_before": None,
+        },
+    )
+
+
 @pytest.fixture
 def paginator() -> CoinbasePaginator[str]:
     coinbase = mock.AsyncMock()
@@ -22,7 +39,7 @@ def test_paginator(paginator: CoinbasePaginator[str]) -> None:
 
 @pytest.mark.asyncio
 async def test_iter(paginator: CoinbasePaginator[str]) -> None:
-    paginator.coinbase.request.return_value = {  # type: ignore
+    paginator.coinbase.call.return_value = {  # type: ignore
         "pagination": {"next_uri": None},
         "data": ["foo", "bar"],
     }
@@ -37,34 +54,26 @@ async def test_iter(paginator: CoinbasePaginator[str]) -> None:
 
     assert i == 2
 
-    paginator.coinbase.request.assert_awaited_once()  # type: ignore
-    request = typing.cast(
-        httpx.Request, paginator.coinbase.request.await_args.args[0]  # type: ignore
-    )
-    assert request.method == "GET"
-    assert request.url == "/test?order=desc&limit=100&starting_after=&ending_before="
+    paginator.coinbase.call.assert_awaited_once()  # type: ignore
+    assert_fetched(paginator)
 
 
 @pytest.mark.asyncio
 async def test_all_single(paginator: CoinbasePaginator[str]) -> None:
-    paginator.coinbase.request.return_value = {  # type: ignore
+    paginator.coinbase.call.return_value = {  # type: ignore
         "pagination": {"next_uri": None},
         "data": ["foo", "bar"],
     }
 
     assert await paginator.all() == ["foo", "bar"]
 
-    paginator.coinbase.request.assert_awaited_once()  # type: ignore
-    request = typing.cast(
-        httpx.Request, paginator.coinbase.request.await_args.args[0]  # type: ignore
-    )
-    assert request.method == "GET"
-    assert request.url == "/test?order=desc&limit=100&starting_after=&ending_before="
+    paginator.coinbase.call.assert_awaited_once()  # type: ignore
+    assert_fetched(paginator)
 
 
 @pytest.mark.asyncio
 async def test_all_multiple(paginator: CoinbasePaginator[str]) -> None:
-    paginator.coinbase.request.side_effect = [  # type: ignore
+    paginator.coinbase.call.side_effect = [  # type: ignore
         {
             "pagination": {"next_uri": "x", "cursor": ["x", "abcdef"]},
             "data": ["foo", "bar"],
@@ -74,19 +83,13 @@ async def test_all_multiple(paginator: CoinbasePaginator[str]) -> None:
 
     assert await paginator.all() == ["foo", "bar", "foo", "bar"]
 
-    assert paginator.coinbase.request.await_count == 2  # type: ignore
-    request = typing.cast(
-        httpx.Request, paginator.coinbase.request.await_args.args[0]  # type: ignore
-    )
-    assert request.method == "GET"
-    assert (
-        request.url == "/test?order=desc&limit=100&starting_after=abcdef&ending_before="
-    )
+    assert paginator.coinbase.call.await_count == 2  # type: ignore
+    assert_fetched(paginator, "abcdef")
 
 
 @pytest.mark.asyncio
 async def test_chunk(paginator: CoinbasePaginator[str]) -> None:
-    paginator.coinbase.request.return_value = {  # type: ignore
+    paginator.coinbase.call.return_value = {  # type: ignore
         "pagination": {"next_uri": None},
         "data": ["foo", "bar"] * 10 + ["foo"],
     }
@@ -101,9 +104,324 @@ async def test_chunk(paginator: CoinbasePaginator[str]) -> None:
 
     assert i == 11
 
-    paginator.coinbase.request.assert_awaited_once()  # type: ignore
-    request = typing.cast(
-        httpx.Request, paginator.coinbase.request.await_args.args[0]  # type: ignore
+    paginator.coinbase.call.assert_awaited_once()  # type: ignore
+    assert_fetched(paginator)
+
+
+@pytest.fixture
+def prefetching_paginator() -> CoinbasePaginator[str]:
+    coinbase = mock.AsyncMock()
+    pager = CoinbasePaginator(coinbase, "/test", prefetch=2)  # type: ignore
+    return pager
+
+
+@pytest.mark.asyncio
+async def test_prefetch_all(prefetching_paginator: CoinbasePaginator[str]) -> None:
+    prefetching_paginator.coinbase.call.side_effect = [  # type: ignore
+        {
+            "pagination": {"next_uri": "x", "cursor": ["x", "abcdef"]},
+            "data": ["foo", "bar"],
+        },
+        {
+            "pagination": {"next_uri": "x", "cursor": ["x", "ghijkl"]},
+            "data": [],
+        },
+        {"pagination": {"next_uri": None}, "data": ["baz"]},
+    ]
+
+    assert await prefetching_paginator.all() == ["foo", "bar", "baz"]
+    assert prefetching_paginator.coinbase.call.await_count == 3  # type: ignore
+    assert_fetched(prefetching_paginator, "ghijkl")
+
+
+@pytest.mark.asyncio
+async def test_prefetch_error(prefetching_paginator: CoinbasePaginator[str]) -> None:
+    prefetching_paginator.coinbase.call.side_effect = [  # type: ignore
+        {
+            "pagination": {"next_uri": "x", "cursor": ["x", "abcdef"]},
+            "data": ["foo"],
+        },
+        RuntimeError("test error"),
+    ]
+
+    items = []
+    with pytest.raises(RuntimeError, match="test error"):
+        async for item in prefetching_paginator:
+            items.append(item)
+    assert items == ["foo"]
+    assert prefetching_paginator._prefetcher is None
+
+
+@pytest.mark.asyncio
+async def test_prefetch_early_exit(
+    prefetching_paginator: CoinbasePaginator[str],
+) -> None:
+    prefetching_paginator.coinbase.call.return_value = {  # type: ignore
+        "pagination": {"next_uri": "x", "cursor": ["x", "abcdef"]},
+        "data": ["foo", "bar"],
+    }
+
+    async with prefetching_paginator:
+        async for item in prefetching_paginator:
+            assert item == "foo"
+            break
+        prefetcher = prefetching_paginator._prefetcher
+        assert prefetcher is not None
+
+    assert prefetcher.cancelled()
+    assert prefetching_paginator._prefetcher is None
+    # bounded queue: 1 page being consumed, 2 queued, 1 blocked on put
+    assert prefetching_paginator.coinbase.call.await_count <= 4  # type: ignore
+
+
+@pytest.mark.asyncio
+async def test_prefetch_break(prefetching_paginator: CoinbasePaginator[str]) -> None:
+    prefetching_paginator.coinbase.call.return_value = {  # type: ignore
+        "pagination": {"next_uri": "x", "cursor": ["x", "abcdef"]},
+        "data": ["foo", "bar"],
+    }
+
+    async for _ in prefetching_paginator:
+        prefetcher = prefetching_paginator._prefetcher
+        break
+    assert prefetcher is not None
+    # asyncio closes the dropped iterator on the next loop iterations
+    for _ in range(3):
+        await asyncio.sleep(0)
+    assert prefetcher.cancelled()
+    assert prefetching_paginator._prefetcher is None
+
+    # iterating again is not stopped by the previous iteration closing late
+    iterator = aiter(prefetching_paginator)
+    assert await anext(iterator) == "foo"
+    del iterator
+    async for _ in prefetching_paginator:
+        for _ in range(3):
+            await asyncio.sleep(0)
+        assert prefetching_paginator._prefetcher is not None
+        assert not prefetching_paginator._prefetcher.done()
+        break
+
+
+@pytest.mark.asyncio
+async def test_prefetch_cancelled_consumer(
+    prefetching_paginator: CoinbasePaginator[str],
+) -> None:
+    started = asyncio.Event()
+
+    async def call(*args: typing.Any, **kwargs: typing.Any) -> typing.Any:
+        if started.is_set():
+            await asyncio.sleep(10)
+        started.set()
+        return {
+            "pagination": {"next_uri": "x", "cursor": ["x", "abcdef"]},
+            "data": [],
+        }
+
+    prefetching_paginator.coinbase.call.side_effect = call  # type: ignore
+
+    async def consume() -> None:
+        async for _ in prefetching_paginator:
+            pass
+
+    task = asyncio.create_task(consume())
+    await started.wait()
+    prefetcher = prefetching_paginator._prefetcher
+    assert prefetcher is not None
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert prefetcher.cancelled()
+
+
+def test_prefetch_invalid() -> None:
+    with pytest.raises(ValueError):
+        CoinbasePaginator(mock.AsyncMock(), "/test", prefetch=-1)
+
+
+@pytest.mark.asyncio
+async def test_chunk_across_pages(paginator: CoinbasePaginator[str]) -> None:
+    paginator.coinbase.call.side_effect = [  # type: ignore
+        {
+            "pagination": {"next_uri": "x", "cursor": ["x", "abcdef"]},
+            "data": ["a", "b", "c"],
+        },
+        {
+            "pagination": {"next_uri": "x", "cursor": ["x", "ghijkl"]},
+            "data": ["d"],
+        },
+        {"pagination": {"next_uri": None}, "data": ["e", "f", "g", "h", "i"]},
+    ]
+
+    chunks = [chunk async for chunk in paginator.chunk(4)]
+    assert chunks == [["a", "b", "c", "d"], ["e", "f", "g", "h"], ["i"]]
+
+
+@pytest.mark.asyncio
+async def test_chunk_invalid_size(paginator: CoinbasePaginator[str]) -> None:
+    with pytest.raises(ValueError):
+        async for _ in paginator.chunk(0):
+            pass  # pragma: no cover
+
+
+@pytest.mark.asyncio
+async def test_pages(paginator: CoinbasePaginator[str]) -> None:
+    first = {"next_uri": "x", "cursor": ["x", "abcdef"]}
+    second = {"next_uri": None}
+    paginator.coinbase.call.side_effect = [  # type: ignore
+        {"pagination": first, "data": ["foo", "bar"]},
+        {"pagination": second, "data": ["baz"]},
+    ]
+
+    pages = [page async for page in paginator.pages()]
+    assert pages == [(["foo", "bar"], first), (["baz"], second)]
+
+
+@pytest.mark.asyncio
+async def test_cursor(paginator: CoinbasePaginator[str]) -> None:
+    paginator.coinbase.call.side_effect = [  # type: ignore
+        {
+            "pagination": {"next_uri": "x", "cursor": ["x", "abcdef"]},
+            "data": ["foo", "bar"],
+        },
+        {"pagination": {"next_uri": None}, "data": ["baz"]},
+    ]
+
+    assert paginator.cursor == {
+        "starting_after": None,
+        "ending_before": None,
+        "exhausted": False,
+    }
+    cursors = []
+    async for _ in paginator:
+        cursors.append(paginator.cursor)
+
+    assert [cursor["starting_after"] for cursor in cursors] == [None, "abcdef", None]
+    assert [cursor["exhausted"] for cursor in cursors] == [False, False, True]
+
+
+@pytest.mark.asyncio
+async def test_cursor_resume(paginator: CoinbasePaginator[str]) -> None:
+    paginator.coinbase.call.return_value = {  # type: ignore
+        "pagination": {"next_uri": None},
+        "data": ["baz"],
+    }
+    cursor = json.loads(
+        json.dumps(
+            {"starting_after": "abcdef", "ending_before": None, "exhausted": False}
+        )
     )
-    assert request.method == "GET"
-    assert request.url == "/test?order=desc&limit=100&starting_after=&ending_before="
+    resumed = CoinbasePaginator[str](paginator.coinbase, "/test", cursor=cursor)
+
+    assert await resumed.all() == ["baz"]
+    assert resumed.cursor["exhausted"]
+    assert_fetched(paginator, "abcdef")
+
+    finished = CoinbasePaginator[str](
+        paginator.coinbase, "/test", cursor=resumed.cursor
+    )
+    assert await finished.all() == []
+    paginator.coinbase.call.assert_awaited_once()  # type: ignore
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("select", [False, True])
+async def test_cursor_mid_page(
+    paginator: CoinbasePaginator[typing.Any], select: bool
+) -> None:
+    items = [{"id": "a"}, {"id": "b"}, {"id": "c"}]
+    paginator.coinbase.call.return_value = {  # type: ignore
+        "pagination": {"next_uri": "x", "cursor": ["a", "c"]},
+        "data": items,
+    }
+    # select drops the id, the cursor still comes from the api's items
+    iterated = paginator.select("code") if select else paginator
+    async for _ in iterated:
+        if iterated.cursor["starting_after"] == "b":
+            break
+    saved = json.loads(json.dumps(iterated.cursor))
+    assert saved == {"starting_after": "b", "ending_before": None, "exhausted": False}
+
+    paginator.coinbase.call.return_value = {  # type: ignore
+        "pagination": {"next_uri": None, "cursor": ["c", "c"]},
+        "data": items[2:],
+    }
+    resumed = CoinbasePaginator[typing.Any](paginator.coinbase, "/test", cursor=saved)
+    assert [item["id"] async for item in resumed] == ["c"]
+    assert_fetched(resumed, "b")
+    assert resumed.cursor["exhausted"]
+
+
+@pytest.mark.asyncio
+async def test_cursor_pages(paginator: CoinbasePaginator[str]) -> None:
+    paginator.coinbase.call.side_effect = [  # type: ignore
+        {
+            "pagination": {"next_uri": "x", "cursor": ["x", "abcdef"]},
+            "data": ["foo", "bar"],
+        },
+        {"pagination": {"next_uri": None}, "data": ["baz"]},
+    ]
+
+    cursors = [paginator.cursor async for _ in paginator.pages()]
+    assert [cursor["starting_after"] for cursor in cursors] == ["abcdef", None]
+
+
+@pytest.mark.asyncio
+async def test_select(paginator: CoinbasePaginator[typing.Any]) -> None:
+    paginator.coinbase.call.return_value = {  # type: ignore
+        "pagination": {"next_uri": None},
+        "data": [
+            {"id": "a", "code": "A", "payments": [], "pricing": {}},
+            {"id": "b", "pricing": {}},
+        ],
+    }
+
+    selected = paginator.select("id", "code")
+    assert await selected.all() == [{"id": "a", "code": "A"}, {"id": "b"}]
+    assert selected.url == paginator.url
+
+
+class CountingList(list[int]):
+    """Counts the items copied out of it, by slicing or iterating."""
+
+    copied = 0
+
+    def __getitem__(self, index: typing.Any) -> typing.Any:
+        item = super().__getitem__(index)
+        CountingList.copied += len(item) if isinstance(index, slice) else 1
+        return item
+
+    def __iter__(self) -> typing.Iterator[int]:
+        CountingList.copied += len(self)
+        return super().__iter__()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("consume", ["anext", "all", "chunk"])
+async def test_linear_copies(consume: str) -> None:
+    # pages large enough that popping from the front of a list or re-slicing
+    # leftovers would copy every item many times
+    pages = 5
+    page = CountingList(range(10_000))
+    coinbase = mock.AsyncMock()
+    coinbase.call.side_effect = [
+        {
+            "pagination": {"next_uri": None if last else "x", "cursor": [None, "x"]},
+            "data": page,
+        }
+        for last in [False] * (pages - 1) + [True]
+    ]
+    paginator: CoinbasePaginator[int] = CoinbasePaginator(coinbase, "/test")
+    CountingList.copied = 0
+    count = 0
+    if consume == "anext":
+        async for _ in paginator:
+            count += 1
+        assert isinstance(paginator._pending, collections.deque)
+    elif consume == "all":
+        count = len(await paginator.all())
+    else:
+        async for chunk in paginator.chunk(3_000):
+            count += len(chunk)
+    assert count == pages * len(page)
+    assert CountingList.copied <= count
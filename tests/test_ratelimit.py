@@ -0,0 +1,59 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from async_commerce_coinbase import RateLimiter, TokenBucket
+from tests.conftest import MockCoinbase
+
+
+@pytest.mark.asyncio
+async def test_token_bucket() -> None:
+    bucket = TokenBucket(100, capacity=5)
+    start = time.monotonic()
+    await asyncio.gather(*(bucket.acquire() for _ in range(15)))
+    # 5 tokens burst, the other 10 are refilled at 100/s
+    assert 0.08 <= time.monotonic() - start < 0.5
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_cancel_refunds() -> None:
+    bucket = TokenBucket(1, capacity=1)
+    await bucket.acquire()
+    task = asyncio.create_task(bucket.acquire())
+    await asyncio.sleep(0)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert bucket._tokens > -0.5
+
+
+def test_token_bucket_invalid() -> None:
+    with pytest.raises(ValueError):
+        TokenBucket(0)
+
+
+def test_rate_limiter_rules() -> None:
+    default, get, charge, create = (TokenBucket(1) for _ in range(4))
+    limiter = RateLimiter(
+        default,
+        rules={"GET": get, "/charges/{code}": charge, "POST /charges": create},
+    )
+    assert limiter.get_bucket(httpx.Request("GET", "/checkouts")) is get
+    assert limiter.get_bucket(httpx.Request("GET", "/charges/abc")) is charge
+    assert limiter.get_bucket(httpx.Request("POST", "/charges")) is create
+    assert limiter.get_bucket(httpx.Request("DELETE", "/checkouts/abc")) is default
+    assert RateLimiter().get_bucket(httpx.Request("GET", "/charges")) is None
+
+
+@pytest.mark.asyncio
+async def test_shared_rate_limiter(mock_coinbase: MockCoinbase) -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json={"data": {"resource": "charge"}})
+
+    limiter = RateLimiter(TokenBucket(50, capacity=2))
+    clients = [mock_coinbase(handler, rate_limiter=limiter) for _ in range(2)]
+    start = time.monotonic()
+    await asyncio.gather(*(client.get_charge("test") for client in clients * 3))
+    assert time.monotonic() - start >= 0.07
@@ -0,0 +1,115 @@
+import httpx
+import pytest
+
+from async_commerce_coinbase import CoinbaseHTTPStatusError, RetryPolicy
+from async_commerce_coinbase.retry import parse_retry_after
+from tests.conftest import Handler, MockCoinbase
+
+
+def replaying(responses: list[httpx.Response | Exception]) -> Handler:
+    def handler(request: httpx.Request) -> httpx.Response:
+        response = responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    return handler
+
+
+def ok() -> httpx.Response:
+    return httpx.Response(200, json={"data": {"resource": "charge"}})
+
+
+def error(status_code: int, **headers: str) -> httpx.Response:
+    return httpx.Response(
+        status_code,
+        json={"error": {"type": "test", "message": "test error"}},
+        headers=headers,
+    )
+
+
+@pytest.mark.asyncio
+async def test_retry_status(mock_coinbase: MockCoinbase) -> None:
+    calls: list[tuple[str, int, float]] = []
+
+    def on_retry(request: httpx.Request, attempt: int, delay: float) -> None:
+        calls.append((request.url.path, attempt, delay))
+
+    retry = RetryPolicy(backoff=0.001, on_retry=on_retry)
+    coinbase = mock_coinbase(replaying([error(503), error(429), ok()]), retry=retry)
+
+    assert (await coinbase.get_charge("test"))["resource"] == "charge"
+    assert len(mock_coinbase.requests) == 3
+    assert retry.retries == 2
+    assert [(path, attempt) for path, attempt, _ in calls] == [
+        ("/charges/test", 1),
+        ("/charges/test", 2),
+    ]
+    assert all(0 <= delay <= 0.002 for _, _, delay in calls)
+
+
+@pytest.mark.asyncio
+async def test_retry_transport_error(mock_coinbase: MockCoinbase) -> None:
+    retry = RetryPolicy(backoff=0.001)
+    coinbase = mock_coinbase(replaying([httpx.ConnectError("test"), ok()]), retry=retry)
+
+    assert (await coinbase.cancel_charge("test"))["resource"] == "charge"
+    assert len(mock_coinbase.requests) == 2
+
+
+@pytest.mark.asyncio
+async def test_retry_gives_up(mock_coinbase: MockCoinbase) -> None:
+    retry = RetryPolicy(max_attempts=2, backoff=0.001)
+    coinbase = mock_coinbase(replaying([error(500), error(502)]), retry=retry)
+    with pytest.raises(CoinbaseHTTPStatusError, match="test: test error"):
+        await coinbase.get_charge("test")
+    assert len(mock_coinbase.requests) == 2
+
+    mock_coinbase.requests.clear()
+    errors: list[httpx.Response | Exception] = [httpx.ConnectError("test")] * 2
+    coinbase = mock_coinbase(replaying(errors), retry=retry)
+    with pytest.raises(httpx.ConnectError):
+        await coinbase.get_charge("test")
+    assert len(mock_coinbase.requests) == 2
+
+
+@pytest.mark.asyncio
+async def test_retry_not_idempotent(mock_coinbase: MockCoinbase) -> None:
+    retry = RetryPolicy(backoff=0.001)
+    coinbase = mock_coinbase(replaying([error(503)]), retry=retry)
+    with pytest.raises(CoinbaseHTTPStatusError):
+        await coinbase.create_charge(
+            "name", "description", "no_price", {"amount": 1, "currency": "EUR"}, "", ""
+        )
+    assert len(mock_coinbase.requests) == 1
+    assert retry.retries == 0
+
+
+@pytest.mark.asyncio
+async def test_retry_deadline(mock_coinbase: MockCoinbase) -> None:
+    retry = RetryPolicy(deadline=1)
+    coinbase = mock_coinbase(
+        replaying([error(429, **{"Retry-After": "5"})]), retry=retry
+    )
+    with pytest.raises(CoinbaseHTTPStatusError):
+        await coinbase.get_charge("test")
+    assert len(mock_coinbase.requests) == 1
+
+
+@pytest.mark.parametrize(
+    "headers,expected",
+    [
+        ({}, None),
+        ({"Retry-After": "3"}, 3.0),
+        ({"Retry-After": "-3"}, 0.0),
+        ({"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"}, 0.0),
+        ({"Retry-After": "soon"}, None),
+    ],
+)
+def test_parse_retry_after(headers: dict[str, str], expected: float | None) -> None:
+    assert parse_retry_after(httpx.Response(429, headers=headers)) == expected
+
+
+def test_retry_policy_invalid() -> None:
+    with pytest.raises(ValueError):
+        RetryPolicy(max_attempts=0)
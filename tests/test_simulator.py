@@ -0,0 +1,241 @@
+import asyncio
+import typing
+
+import httpx
+import pytest
+
+from async_commerce_coinbase import Coinbase, CoinbaseHTTPStatusError, RetryPolicy
+from async_commerce_coinbase.mirror import Mirror
+from async_commerce_coinbase.simulator import CoinbaseSimulator
+
+
+async def failed_response(awaitable: typing.Awaitable[typing.Any]) -> httpx.Response:
+    try:
+        await awaitable
+    except CoinbaseHTTPStatusError as error:
+        return error.response
+    raise AssertionError("no error raised")
+
+
+async def create_charge(coinbase: Coinbase, name: str = "charge") -> str:
+    charge = await coinbase.create_charge(
+        name=name,
+        description="description",
+        pricing_type="fixed_price",
+        local_price={"amount": 10.0, "currency": "EUR"},
+        redirect_url="https://example.com/success",
+        cancel_url="https://example.com/cancel",
+        metadata={"user_id": name},
+    )
+    return charge["code"]
+
+
+@pytest.mark.asyncio
+async def test_charges() -> None:
+    simulator = CoinbaseSimulator(seed=1)
+    coinbase = Coinbase("test", transport=simulator)
+
+    code = await create_charge(coinbase)
+    charge = await coinbase.get_charge(code)
+    assert charge["pricing"]["local"] == {"amount": 10.0, "currency": "EUR"}
+    assert (await coinbase.get_charge(charge["id"]))["code"] == code
+
+    cancelled = await coinbase.cancel_charge(code)
+    assert cancelled["timeline"][-1]["status"] == "CANCELED"
+    with pytest.raises(CoinbaseHTTPStatusError, match="invalid_request"):
+        await coinbase.cancel_charge(code)
+    with pytest.raises(CoinbaseHTTPStatusError, match="not_found"):
+        await coinbase.get_charge("MISSING")
+
+    other = await create_charge(coinbase)
+    simulator.set_charge_status(other, "UNRESOLVED")
+    resolved = await coinbase.resolve_charge(other)
+    assert resolved["timeline"][-1]["status"] == "RESOLVED"
+
+    events = await coinbase.list_events().all()
+    assert [event["type"] for event in events] == [
+        "charge:resolved",
+        "charge:failed",
+        "charge:created",
+        "charge:created",
+    ]
+    # events keep the resource as it was at the time
+    assert events[-1]["data"]["timeline"] == [
+        {"time": events[-1]["data"]["timeline"][0]["time"], "status": "NEW"}
+    ]
+    assert (await coinbase.get_event(events[0]["id"]))["type"] == "charge:resolved"
+
+
+@pytest.mark.asyncio
+async def test_pagination() -> None:
+    coinbase = Coinbase("test", transport=CoinbaseSimulator())
+    codes = [await create_charge(coinbase, str(index)) for index in range(250)]
+
+    charges = await coinbase.list_charges().all()
+    assert [charge["code"] for charge in charges] == codes[::-1]
+
+    paginator = coinbase.list_charges()
+    paginator.order = "asc"
+    pages = [len(page) async for page, _ in paginator.pages()]
+    assert pages == [100, 100, 50]
+    assert paginator.cursor["exhausted"]
+
+    response = await coinbase.call(
+        "GET",
+        "/charges",
+        params={
+            "order": "asc",
+            "limit": 10,
+            "starting_after": charges[-3]["id"],
+            "ending_before": charges[-6]["id"],
+        },
+    )
+    assert [charge["code"] for charge in response["data"]] == codes[3:5]
+    assert response["pagination"]["next_uri"] is None
+
+    with pytest.raises(CoinbaseHTTPStatusError, match="Unknown cursor"):
+        await coinbase.call("GET", "/charges", params={"starting_after": "x"})
+    for limit in ("ten", "0"):
+        with pytest.raises(CoinbaseHTTPStatusError, match="limit must be"):
+            await coinbase.call("GET", "/charges", params={"limit": limit})
+
+
+@pytest.mark.asyncio
+async def test_pagination_skips_deleted() -> None:
+    simulator = CoinbaseSimulator()
+    coinbase = Coinbase("test", transport=simulator)
+    ids = []
+    for index in range(6):
+        checkout = await coinbase.create_checkout(
+            name=str(index),
+            description="description",
+            requested_info=[],
+            pricing_type="no_price",
+            local_price={"amount": 1.0, "currency": "EUR"},
+        )
+        ids.append(checkout["id"])
+    for id in ids[1:4]:
+        await coinbase.delete_checkout(id)
+    with pytest.raises(CoinbaseHTTPStatusError, match="not_found"):
+        await coinbase.get_checkout(ids[1])
+    assert all(ids[1] not in codes for codes in simulator._codes.values())
+
+    response = await coinbase.call("GET", "/checkouts", params={"limit": 1})
+    assert [checkout["id"] for checkout in response["data"]] == [ids[5]]
+    response = await coinbase.call(
+        "GET", "/checkouts", params={"limit": 1, "starting_after": ids[4]}
+    )
+    assert [checkout["id"] for checkout in response["data"]] == [ids[0]]
+    assert response["pagination"]["next_uri"] is None
+    response = await coinbase.call(
+        "GET", "/checkouts", params={"order": "asc", "limit": 1}
+    )
+    assert response["pagination"]["next_uri"] is not None
+    paginator = coinbase.list_checkouts()
+    paginator.limit = 1
+    assert [checkout["id"] for checkout in await paginator.all()] == [
+        ids[5],
+        ids[4],
+        ids[0],
+    ]
+
+
+@pytest.mark.asyncio
+async def test_checkouts_and_invoices() -> None:
+    simulator = CoinbaseSimulator()
+    coinbase = Coinbase("test", transport=simulator)
+
+    checkout = await coinbase.create_checkout(
+        name="name",
+        description="description",
+        requested_info=["email"],
+        pricing_type="no_price",
+        local_price={"amount": 1.0, "currency": "EUR"},
+    )
+    updated = await coinbase.update_checkout(checkout["id"], name="renamed")
+    assert updated["name"] == "renamed"
+    assert (await coinbase.get_checkout(checkout["id"]))["name"] == "renamed"
+    await coinbase.delete_checkout(checkout["id"])
+    assert await coinbase.list_checkouts().all() == []
+
+    invoice = await coinbase.create_invoice(
+        business_name="business",
+        customer_email="test@example.com",
+        local_price={"amount": 1.0, "currency": "EUR"},
+    )
+    assert invoice["status"] == "OPEN"
+    assert (await coinbase.void_invoice(invoice["code"]))["status"] == "VOID"
+    with pytest.raises(CoinbaseHTTPStatusError):
+        await coinbase.void_invoice(invoice["code"])
+
+    simulator.set_invoice_status(invoice["id"], "UNRESOLVED")
+    await coinbase.resolve_invoice(invoice["id"])
+    assert simulator.find("invoices", invoice["code"])["status"] == "RESOLVED"
+    events = await coinbase.list_events().all()
+    assert [event["type"] for event in events] == [
+        "invoice:unresolved",
+        "invoice:voided",
+        "invoice:created",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_failures() -> None:
+    coinbase = Coinbase("test", transport=CoinbaseSimulator(api_key="other"))
+    response = await failed_response(coinbase.list_charges().all())
+    assert response.status_code == 401
+
+    coinbase = Coinbase("test", transport=CoinbaseSimulator())
+    with pytest.raises(CoinbaseHTTPStatusError, match="not_found"):
+        await coinbase.call("GET", "/unknown")
+    with pytest.raises(CoinbaseHTTPStatusError, match="invalid_request"):
+        await coinbase.call("POST", "/charges")
+
+    simulator = CoinbaseSimulator(throttle_rate=1, retry_after=2.5)
+    coinbase = Coinbase("test", transport=simulator)
+    response = await failed_response(coinbase.get_charge("CODE"))
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "2.5"
+
+
+@pytest.mark.asyncio
+async def test_load_with_retries() -> None:
+    simulator = CoinbaseSimulator(latency=0.001, error_rate=0.2, seed=2)
+    retry = RetryPolicy(max_attempts=20, backoff=0.001)
+    coinbase = Coinbase("test", transport=simulator, retry=retry)
+    simulator.error_rate = 0
+    codes = [await create_charge(coinbase) for _ in range(20)]
+    simulator.error_rate = 0.2
+
+    results = await asyncio.gather(*(coinbase.get_charge(code) for code in codes * 10))
+    assert [charge["code"] for charge in results] == codes * 10
+    assert retry.retries > 0
+    assert simulator.requests == 200 + 20 + retry.retries
+
+
+@pytest.mark.asyncio
+async def test_mirror() -> None:
+    simulator = CoinbaseSimulator()
+    coinbase = Coinbase("test", transport=simulator)
+    first = await create_charge(coinbase, "1")
+    mirror = Mirror()
+    await mirror.sync(coinbase)
+
+    second = await create_charge(coinbase, "2")
+    simulator.set_charge_status(first, "COMPLETED")
+    await mirror.sync(coinbase)
+    assert [c["code"] for c in mirror.find_by_status("charges", "COMPLETED")] == [first]
+    assert mirror.find_by_metadata("charges", "user_id", "2")[0]["code"] == second
+
+    # cancelling sends no event, open charges are fetched again
+    await coinbase.cancel_charge(second)
+    await mirror.sync(coinbase)
+    assert mirror.find_by_status("charges", "NEW") == []
+    assert [c["code"] for c in mirror.find_by_status("charges", "CANCELED")] == [second]
+
+
+def test_transport_option() -> None:
+    simulator = CoinbaseSimulator()
+    coinbase = Coinbase("test", transport=simulator)
+    assert coinbase.client._transport is simulator
+    assert isinstance(simulator, httpx.AsyncBaseTransport)
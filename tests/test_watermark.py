@@ -0,0 +1,27 @@
+from pathlib import Path
+
+import pytest
+
+from async_commerce_coinbase.watermark import FileWatermarkStore, MemoryWatermarkStore
+
+
+@pytest.mark.asyncio
+async def test_memory_store() -> None:
+    store = MemoryWatermarkStore()
+    assert await store.get("events") is None
+    await store.set("events", "abc")
+    assert await store.get("events") == "abc"
+
+
+@pytest.mark.asyncio
+async def test_file_store(tmp_path: Path) -> None:
+    path = tmp_path / "watermarks.json"
+    store = FileWatermarkStore(path)
+    assert await store.get("events") is None
+    await store.set("events", "abc")
+    await store.set("other", "def")
+
+    store = FileWatermarkStore(path)
+    assert await store.get("events") == "abc"
+    assert await store.get("other") == "def"
+    assert [file.name for file in tmp_path.iterdir()] == ["watermarks.json"]
@@ -1,6 +1,7 @@
 import hmac
 import json
 import typing
+from unittest import mock
 
 import pytest
 
@@ -26,3 +27,112 @@ def test_verify() -> None:
 def test_verify_invalid_signature() -> None:
     with pytest.raises(SignatureVerificationError, match="signature mismatch"):
         assert webhook.verify_signature(b"", b"", b"")
+
+
+def sign(body: bytes, secret: str) -> str:
+    return hmac.digest(secret.encode(), body, "sha256").hex()
+
+
+def test_verifier() -> None:
+    event: typing.Any = {"id": "test", "type": "charge:confirmed"}
+    body = json.dumps({"id": 10, "event": event}).encode()
+    verifier = webhook.WebhookVerifier("old secret", b"new secret")
+
+    for secret in ("old secret", "new secret"):
+        signature = sign(body, secret)
+        assert verifier.verify(body, signature) == event
+        assert verifier.verify(body.decode(), bytes.fromhex(signature)) == event
+        assert verifier.verify(memoryview(body), signature) == event
+        assert verifier.verify(bytearray(body), signature) == event
+        # the precomputed state is not consumed by a verification
+        assert verifier.is_valid(body, signature)
+
+    assert not verifier.is_valid(body, sign(body, "other secret"))
+    assert not verifier.is_valid(body, "not hex")
+    with pytest.raises(SignatureVerificationError, match="signature mismatch"):
+        verifier.verify(body + b" ", sign(body, "old secret"))
+
+
+def test_verifier_without_secret() -> None:
+    with pytest.raises(ValueError):
+        webhook.WebhookVerifier()
+
+
+def test_lazy_event() -> None:
+    data = {"id": "charge", "resource": "charge"}
+    event = {
+        "id": "test",
+        "resource": "event",
+        "type": "charge:confirmed",
+        "created_at": "2022-01-01T00:00:00Z",
+        "data": data,
+    }
+    body = json.dumps({"id": 10, "tags": ["a"], "event": event}).encode()
+    verifier = webhook.WebhookVerifier("secret")
+
+    with mock.patch.object(webhook, "loads") as loads:
+        lazy = verifier.verify_lazy(body, sign(body, "secret"))
+        assert (lazy.id, lazy.type) == ("test", "charge:confirmed")
+        assert lazy.created_at == "2022-01-01T00:00:00Z"
+        assert repr(lazy) == "LazyEvent(id='test', type='charge:confirmed')"
+        loads.assert_not_called()
+    assert lazy.data == data
+    assert lazy.event == event
+
+    with pytest.raises(SignatureVerificationError):
+        verifier.verify_lazy(body.decode(), sign(b"", "secret"))
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        # data first, or object before the event: decoded fully
+        {"event": {"data": {}, "id": "test", "type": "t", "created_at": "c"}},
+        {"meta": {}, "event": {"id": "test", "type": "t", "created_at": "c"}},
+        {"event": {"id": "test", "type": "t", "created_at": "c", "data": {}}},
+    ],
+)
+@pytest.mark.parametrize("indent", [None, 2])
+def test_lazy_event_layouts(body: typing.Any, indent: int | None) -> None:
+    lazy = webhook.LazyEvent(json.dumps(body, indent=indent).encode())
+    assert (lazy.id, lazy.type, lazy.created_at) == ("test", "t", "c")
+
+
+def test_lazy_event_without_created_at() -> None:
+    body = {"event": {"id": "test", "type": "t", "data": {"id": "charge"}}}
+    lazy = webhook.LazyEvent(json.dumps(body).encode())
+    assert (lazy.id, lazy.type, lazy.created_at) == ("test", "t", None)
+    assert lazy.data == {"id": "charge"}
+
+
+@pytest.mark.parametrize(
+    "body", [{"id": 1}, {"event": {"type": "t", "data": {}}}, {"event": []}]
+)
+def test_lazy_event_not_an_event(body: typing.Any) -> None:
+    with pytest.raises(SignatureVerificationError):
+        webhook.LazyEvent(json.dumps(body).encode())
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        b'{"event": 5}',
+        b'{"event": "x"}',
+        b"{not json",
+        b'{"event": {"id": "unterminated',
+        b'{"event": {"id": 1e}',
+        b"\xff\xfe",
+        b"",
+    ],
+)
+def test_lazy_event_invalid_json(body: bytes) -> None:
+    with pytest.raises(SignatureVerificationError):
+        webhook.LazyEvent(body)
+
+
+def test_scan_envelope_unusual() -> None:
+    assert webhook._scan_envelope('{"event": {"id": "x"}}') is None
+    assert webhook._scan_envelope('{"event": {"id": ') is None
+    assert webhook._scan_envelope('{"\\u0065vent": {}}') is None
+    assert webhook._scan_envelope("[]") is None
+    assert webhook._scan_envelope('{"event": {"id": "x') is None